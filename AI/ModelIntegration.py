@@ -1,222 +1,543 @@
-#%% 1. INITIAL SETUP
-import pandas as pd
-import numpy as np
-import seaborn as sns
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
-from sklearn.impute import SimpleImputer
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-import joblib
-from datetime import datetime
-import locale
-import matplotlib.pyplot as plt
-
-locale.setlocale(locale.LC_ALL, 'en_GB.UTF-8')
-sns.set(style="whitegrid")
-
-file_path = "C:/Users/Avneet Singh/OneDrive/Documents/Forward/Bath/Academics/Semester 2/Coursework/Entrepreneurship Coursework/Part 2/ML Model/EDA/cleaned_data.csv"
-model_path = "C:/Users/Avneet Singh/OneDrive/Documents/Forward/Bath/Academics/Semester 2/Coursework/Entrepreneurship Coursework/Part 2/ML Model/Output - TrainHevy/trained_pipeline.pkl"
-
-#%% 2. LOAD CLEANED DATA
-def load_cleaned_data(file_path):
-    df = pd.read_csv(file_path,
-                     dtype={'postcode': 'category', 'borough': 'category',
-                            'propertytype': 'category', 'duration': 'category'},
-                     parse_dates=['dateoftransfer'])
-    df['dateoftransfer'] = pd.to_datetime(df['dateoftransfer'], errors='coerce')
-    df['sale_year'] = df['dateoftransfer'].dt.year
-    df.replace([np.inf, -np.inf], np.nan, inplace=True)
-    return df
-
-cleaned_df = load_cleaned_data(file_path)
-postcode_borough_map = cleaned_df.drop_duplicates('postcode').set_index('postcode')['borough'].to_dict()
-
-#%% 3. PRECOMPUTE HISTORICAL METRICS (Borough-level temporal trends)
-def calculate_borough_growth_rates(df, base_year=2024, lookback_years=5):
-    """Calculate borough-level growth rates based on historical data"""
-    borough_growth = {}
-    
-    # Calculate price per sqm for all properties
-    df['price_per_sqm'] = df['price'] / df['tfarea'].replace(0, np.nan)
-    
-    for borough in df['borough'].unique():
-        borough_data = df[df['borough'] == borough]
-        recent_data = borough_data[borough_data['sale_year'] >= (base_year - lookback_years)]
-        
-        if len(recent_data) >= 10:
-            # Use median price per sqm for more robust growth calculation
-            borough_prices = recent_data.groupby('sale_year')['price_per_sqm'].median().reset_index()
-            if len(borough_prices) >= 2:
-                start_price = borough_prices.iloc[0]['price_per_sqm']
-                end_price = borough_prices.iloc[-1]['price_per_sqm']
-                n_years = borough_prices.iloc[-1]['sale_year'] - borough_prices.iloc[0]['sale_year']
-                cagr = (end_price / start_price) ** (1/n_years) - 1 if n_years > 0 else 0.02
-                borough_growth[borough] = max(min(cagr, 0.1), -0.05)  # Cap growth between -5% and +10%
-            else:
-                borough_growth[borough] = 0.02  # Default growth
-        else:
-            borough_growth[borough] = 0.02  # Default growth
-    
-    return borough_growth
-
-borough_growth_rates = calculate_borough_growth_rates(cleaned_df)
-
-#%% 4. USER INPUT
-def get_user_input(postcode_borough_map):
-    print("\nEnter the following details to predict the house price:")
-    while True:
-        postcode = input("Enter postcode (e.g., SW1A 0AA): ").strip().upper()
-        outward_code = postcode.split()[0] if ' ' in postcode else postcode[:-3]
-        matches = {pc: b for pc, b in postcode_borough_map.items() if outward_code in pc}
-        if matches:
-            borough = max(set(matches.values()), key=list(matches.values()).count)
-            print(f"Detected borough: {borough}")
-            break
-        print(f"No borough found for postcode {postcode}. Try again.")
-
-    def get_valid_input(prompt, options=None, cast=str, cond=lambda x: True, err="Invalid input"):
-        while True:
-            try:
-                val = cast(input(prompt).strip().title())
-                if options and val not in options:
-                    raise ValueError
-                if not cond(val):
-                    raise ValueError
-                return val
-            except:
-                print(err)
-
-    house_type = get_valid_input("Enter property type (Detached/Semi-Detached/Terraced/Flats): ",
-                                 options=['Detached', 'Semi-Detached', 'Terraced', 'Flats'],
-                                 err="Invalid property type.")
-    duration = get_valid_input("Enter duration (Freehold/Leasehold): ",
-                               options=['Freehold', 'Leasehold'],
-                               err="Invalid duration.")
-    numberrooms = get_valid_input("Enter number of rooms: ", cast=float, cond=lambda x: x > 0)
-    tfarea = get_valid_input("Enter total floor area in sqm: ", cast=float, cond=lambda x: x > 0)
-    property_age = get_valid_input("Enter property age (years): ", cast=int, cond=lambda x: x >= 0)
-
-    return {
-        'postcode': postcode,
-        'propertytype': house_type,
-        'duration': duration,
-        'numberrooms': numberrooms,
-        'tfarea': tfarea,
-        'property_age': property_age,
-        'borough': borough,
-        'dateoftransfer': datetime.now()
-    }
-
-#%% 5. FEATURE ENGINEERING
-def engineer_features(user_input, prediction_year, prediction_month, borough_growth_rates):
-    """Create features for prediction with proper temporal adjustments"""
-    # Create base dataframe
-    df = pd.DataFrame([user_input])
-    
-    # Temporal features
-    df['sale_year'] = prediction_year
-    df['sale_month'] = prediction_month
-    df['sale_quarter'] = (prediction_month - 1) // 3 + 1
-    
-    # Property age features
-    construction_year = prediction_year - df['property_age']
-    df['CONSTRUCTION_AGE_BAND'] = np.select(
-        [
-            (construction_year < 1900),
-            (construction_year >= 1900) & (construction_year <= 1950),
-            (construction_year > 1950) & (construction_year <= 2000),
-            (construction_year > 2000)
-        ],
-        ["pre1900", "1900-1950", "1951-2000", "2001+"],
-        default="2001+"
-    )
-    
-    # Size features
-    df['tfarea'] = df['tfarea'].replace(0, np.nan)
-    df['room_size'] = df['tfarea'] / df['numberrooms'].replace(0, np.nan)
-    
-    # Calculate borough-level price metrics
-    borough = user_input['borough']
-    growth_rate = borough_growth_rates.get(borough, 0.02)
-    
-    # Calculate adjusted price per sqm based on growth rate
-    base_price_per_sqm = (user_input.get('price', 8000) / user_input['tfarea'] if 'price' in user_input else 8000)
-    year_offset = prediction_year - 2024
-    adjusted_price_per_sqm = base_price_per_sqm * ((1 + growth_rate) ** year_offset)
-    
-    # Set borough-level features
-    df['borough_mean_price'] = adjusted_price_per_sqm
-    df['price_to_borough_mean'] = 1.0  # Default ratio
-    
-    return df, adjusted_price_per_sqm
-
-#%% 6. MAIN PREDICTION LOOP
-if __name__ == "__main__":
-    # Load the trained model
-    model_pipeline = joblib.load(model_path)
-    
-    # Get user input
-    num_years = int(input("Enter number of years to predict prices for (1-5): "))
-    user_input = get_user_input(postcode_borough_map)
-    prediction_month = datetime.now().month
-    current_year = datetime.now().year
-    
-    # Store results
-    results = []
-    
-    print("\nPredicted Prices:")
-    for year_offset in range(1, num_years + 1):
-        prediction_year = current_year + year_offset
-        
-        # Prepare features
-        features_df, adjusted_price_per_sqm = engineer_features(
-            user_input, 
-            prediction_year, 
-            prediction_month,
-            borough_growth_rates
-        )
-        
-        # Get model prediction
-        try:
-            # Get the model's raw prediction
-            predicted_price = model_pipeline.predict(features_df)[0]
-            
-            # Blend model prediction with trend projection (70% model, 30% trend)
-            # Trend projection is adjusted_price_per_sqm * area
-            trend_projection = adjusted_price_per_sqm * user_input['tfarea']
-            blended_price = 0.7 * predicted_price + 0.3 * trend_projection
-            
-            # Format and display results
-            formatted_price = locale.currency(blended_price, grouping=True)
-            growth_rate = borough_growth_rates.get(user_input['borough'], 0.02) * 100
-            print(f"{prediction_year}: {formatted_price} (Estimated growth: {growth_rate:.1f}%)")
-            
-            results.append({
-                'Year': prediction_year,
-                'Predicted Price': blended_price,
-                'Price per sqm': blended_price / user_input['tfarea'],
-                'Growth Rate (%)': growth_rate,
-                'Borough': user_input['borough'],
-                'Property Type': user_input['propertytype'],
-                'Rooms': user_input['numberrooms'],
-                'Area (sqm)': user_input['tfarea']
-            })
-            
-        except Exception as e:
-            print(f"Error predicting for {prediction_year}: {str(e)}")
-    
-    # Save and optionally plot results
-    results_df = pd.DataFrame(results)
-    results_df.to_csv("multi_year_predictions.csv", index=False)
-    print("\nPredictions saved to multi_year_predictions.csv")
-    
-    # Plot the predictions
-    if not results_df.empty:
-        plt.figure(figsize=(10, 6))
-        plt.plot(results_df['Year'], results_df['Predicted Price'], marker='o')
-        plt.title(f"Price Prediction Trend for {user_input['postcode']}")
-        plt.xlabel('Year')
-        plt.ylabel('Predicted Price (£)')
-        plt.grid(True)
-        plt.tight_layout()
-        plt.show()
+#%% 1. INITIAL SETUP
+import pandas as pd
+import numpy as np
+import joblib
+from datetime import datetime
+from collections import OrderedDict
+from functools import lru_cache
+import argparse
+import locale
+import os
+import sys
+import threading
+import time
+
+# Paths default to files next to this script; override with the environment
+# variables below or the matching command-line flags.
+AI_DIR = os.path.dirname(os.path.abspath(__file__))
+file_path = os.environ.get("CLEANED_DATA_PATH", os.path.join(AI_DIR, "cleaned_data.csv"))
+model_path = os.environ.get("MODEL_PATH", os.path.join(AI_DIR, "trained_pipeline.pkl"))
+# Postcode map and growth rates precomputed from cleaned_data.csv by
+# `python ModelIntegration.py --build-artifact`, so predictions never read the CSV.
+artifact_path = os.environ.get("LOOKUP_ARTIFACT_PATH", os.path.join(AI_DIR, "lookup_tables.joblib"))
+ARTIFACT_VERSION = 2
+
+#%% 2. LOAD CLEANED DATA
+def load_cleaned_data(file_path):
+    df = pd.read_csv(file_path,
+                     dtype={'postcode': 'category', 'borough': 'category',
+                            'propertytype': 'category', 'duration': 'category'},
+                     parse_dates=['dateoftransfer'])
+    df['dateoftransfer'] = pd.to_datetime(df['dateoftransfer'], errors='coerce')
+    df['sale_year'] = df['dateoftransfer'].dt.year
+    df.replace([np.inf, -np.inf], np.nan, inplace=True)
+    return df
+
+#%% 3. PRECOMPUTE HISTORICAL METRICS (Borough-level temporal trends)
+DEFAULT_GROWTH = 0.02
+MIN_GROWTH, MAX_GROWTH = -0.05, 0.1
+
+def borough_year_medians(df, min_year=None):
+    """One groupby over (borough, sale_year): sale count and median price per sqm,
+    sorted by borough then year. A year's median does not depend on the base year
+    or lookback, so one table serves any number of growth-rate calculations;
+    years before min_year are dropped up front."""
+    if min_year is not None:
+        df = df[df['sale_year'] >= min_year]
+    price_per_sqm = df['price'] / df['tfarea'].replace(0, np.nan)
+    grouped = (pd.DataFrame({'borough': df['borough'], 'sale_year': df['sale_year'],
+                             'price_per_sqm': price_per_sqm})
+               .groupby(['borough', 'sale_year'], observed=True, sort=True)['price_per_sqm'])
+    return pd.DataFrame({'sales': grouped.size(), 'median': grouped.median()}).reset_index()
+
+def growth_rates_from_medians(yearly, boroughs, base_year=2024, lookback_years=5):
+    """Capped CAGR per borough between its first and last year of median price per
+    sqm since base_year - lookback_years. Boroughs with fewer than 10 sales or
+    2 years of data in that window get the default growth."""
+    recent = yearly[yearly['sale_year'] >= (base_year - lookback_years)]
+    by_borough = recent.groupby('borough', observed=True, sort=False)
+    first = by_borough.head(1).set_index('borough')
+    last = by_borough.tail(1).set_index('borough')
+    n_years = last['sale_year'] - first['sale_year']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = (last['median'] / first['median']).to_numpy()
+        exponent = (1 / n_years).to_numpy()
+        # One scalar power per borough: numpy's SIMD array power can differ in the
+        # last bits, and the rates should match the per-borough calculation exactly.
+        growth = [r ** e for r, e in zip(ratio, exponent)]
+    cagr = pd.Series(growth, index=last.index, dtype=float) - 1
+    cagr = cagr.clip(MIN_GROWTH, MAX_GROWTH)  # Cap growth between -5% and +10%
+    eligible = (by_borough['sales'].sum() >= 10) & (by_borough.size() >= 2)
+    rates = cagr[eligible].to_dict()
+    return {borough: rates.get(borough, DEFAULT_GROWTH) for borough in boroughs}
+
+def calculate_borough_growth_rates(df, base_year=2024, lookback_years=5):
+    """Calculate borough-level growth rates based on historical data"""
+    yearly = borough_year_medians(df, min_year=base_year - lookback_years)
+    return growth_rates_from_medians(yearly, df['borough'].unique(), base_year, lookback_years)
+
+def sweep_borough_growth_rates(df, base_years=(2024,), lookback_years=(5,)):
+    """Growth rates for every (base_year, lookback_years) pair, grouping the data once"""
+    yearly = borough_year_medians(df, min_year=min(base_years) - max(lookback_years))
+    boroughs = df['borough'].unique()
+    return {(base_year, lookback): growth_rates_from_medians(yearly, boroughs, base_year, lookback)
+            for base_year in base_years for lookback in lookback_years}
+
+#%% 3b. POSTCODE -> BOROUGH INDEX
+def split_postcode(postcode):
+    """'sw1a0aa' / 'SW1A 0AA' -> ('SW1A', '0AA'); an outward code on its own -> ('SW1A', '')"""
+    compact = ''.join(str(postcode).split()).upper()
+    if len(compact) >= 5:  # full postcodes are 5-7 characters without the space
+        return compact[:-3], compact[-3:]
+    return compact, ''
+
+def majority_borough(keys, boroughs):
+    """{key: most common borough among its postcodes}; ties go to the first name alphabetically"""
+    counts = (pd.DataFrame({'key': keys, 'borough': boroughs.astype(str)})
+              .groupby(['key', 'borough']).size().reset_index(name='postcodes')
+              .sort_values(['key', 'postcodes', 'borough'], ascending=[True, False, True]))
+    return counts.drop_duplicates('key').set_index('key')['borough'].to_dict()
+
+def build_postcode_index(df):
+    """Exact postcode, sector ('SW1A 0') and outward code ('SW1A') -> borough,
+    so resolving a postcode is a few dict lookups instead of a scan"""
+    postcodes = df[['postcode', 'borough']].dropna().drop_duplicates('postcode')
+    compact = postcodes['postcode'].astype(str).str.replace(r'\s+', '', regex=True).str.upper()
+    full = compact.str.len() >= 5
+    outward = compact.where(~full, compact.str[:-3])
+    inward = compact.str[-3:].where(full, '')
+    boroughs = postcodes['borough'].astype(str)
+    canonical = (outward + ' ' + inward).where(full, outward)
+    return {
+        'postcode_borough_map': dict(zip(canonical, boroughs)),
+        'sector_borough': majority_borough((outward + ' ' + inward.str[:1])[full], boroughs[full]),
+        'outward_borough': majority_borough(outward, boroughs),
+    }
+
+def resolve_borough(postcode, tables=None):
+    """Borough of a full postcode or outward code: exact match, then the majority
+    borough of its sector, then of its outward code. None if unknown."""
+    tables = tables or load_lookup_tables()
+    outward, inward = split_postcode(postcode)
+    if inward:
+        borough = (tables['postcode_borough_map'].get(f"{outward} {inward}")
+                   or tables['sector_borough'].get(f"{outward} {inward[0]}"))
+        if borough:
+            return borough
+    return tables['outward_borough'].get(outward)
+
+#%% 3c. LOOKUP ARTIFACT (build once, load lazily)
+def build_lookup_tables(df):
+    """Postcode -> borough index and borough growth rates from the cleaned data"""
+    tables = {'version': ARTIFACT_VERSION}
+    tables.update(build_postcode_index(df))
+    tables['borough_growth_rates'] = {
+        str(b): float(r) for b, r in calculate_borough_growth_rates(df).items()
+    }
+    return tables
+
+def build_artifact(data_path=None, out_path=None):
+    """Read the cleaned CSV once and save the lookup tables as a compressed artifact"""
+    data_path = data_path or file_path
+    out_path = out_path or artifact_path
+    tables = build_lookup_tables(load_cleaned_data(data_path))
+    joblib.dump(tables, out_path, compress=3)
+    load_lookup_tables.cache_clear()
+    return tables
+
+@lru_cache(maxsize=None)
+def load_lookup_tables(path=None):
+    """Lookup tables from the artifact, loaded on first use and kept in memory.
+    Falls back to building them from the cleaned CSV if no artifact exists yet
+    (logging to stderr, which keeps stdout clean for PredictionServer)."""
+    path = path or artifact_path
+    if os.path.exists(path):
+        tables = joblib.load(path)
+        if tables.get('version') == ARTIFACT_VERSION:
+            return tables
+        print(f"Lookup artifact {path} is outdated, rebuilding from {file_path}", file=sys.stderr)
+    else:
+        print(f"No lookup artifact at {path}, building it from {file_path}", file=sys.stderr)
+    return build_artifact(file_path, path)
+
+def __getattr__(name):
+    # Keeps `ModelIntegration.postcode_borough_map` / `.borough_growth_rates`
+    # working for importers without loading anything at import time.
+    if name in ('postcode_borough_map', 'borough_growth_rates'):
+        return load_lookup_tables()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+#%% 4. USER INPUT
+def get_user_input(lookup_tables=None):
+    print("\nEnter the following details to predict the house price:")
+    while True:
+        postcode = input("Enter postcode (e.g., SW1A 0AA): ").strip().upper()
+        borough = resolve_borough(postcode, lookup_tables)
+        if borough:
+            print(f"Detected borough: {borough}")
+            break
+        print(f"No borough found for postcode {postcode}. Try again.")
+
+    def get_valid_input(prompt, options=None, cast=str, cond=lambda x: True, err="Invalid input"):
+        while True:
+            try:
+                val = cast(input(prompt).strip().title())
+                if options and val not in options:
+                    raise ValueError
+                if not cond(val):
+                    raise ValueError
+                return val
+            except:
+                print(err)
+
+    house_type = get_valid_input("Enter property type (Detached/Semi-Detached/Terraced/Flats): ",
+                                 options=['Detached', 'Semi-Detached', 'Terraced', 'Flats'],
+                                 err="Invalid property type.")
+    duration = get_valid_input("Enter duration (Freehold/Leasehold): ",
+                               options=['Freehold', 'Leasehold'],
+                               err="Invalid duration.")
+    numberrooms = get_valid_input("Enter number of rooms: ", cast=float, cond=lambda x: x > 0)
+    tfarea = get_valid_input("Enter total floor area in sqm: ", cast=float, cond=lambda x: x > 0)
+    property_age = get_valid_input("Enter property age (years): ", cast=int, cond=lambda x: x >= 0)
+
+    return {
+        'postcode': postcode,
+        'propertytype': house_type,
+        'duration': duration,
+        'numberrooms': numberrooms,
+        'tfarea': tfarea,
+        'property_age': property_age,
+        'borough': borough,
+        'dateoftransfer': datetime.now()
+    }
+
+#%% 5. FEATURE ENGINEERING
+TREND_BASE_YEAR = 2024
+DEFAULT_PRICE_PER_SQM = 8000
+MODEL_WEIGHT = 0.7  # Blend: 70% model prediction, 30% trend projection
+
+def engineer_features_batch(properties, prediction_years, prediction_month, borough_growth_rates):
+    """Features for every property x prediction year in one frame, property-major
+    (all years of the first property, then the next). 'borough_mean_price' holds
+    the growth-adjusted price per sqm used for the trend projection."""
+    years = pd.DataFrame({'sale_year': np.asarray(list(prediction_years), dtype=int)})
+    df = properties.drop(columns=['sale_year'], errors='ignore').reset_index(drop=True).merge(years, how='cross')
+    
+    # Temporal features
+    df['sale_month'] = prediction_month
+    df['sale_quarter'] = (prediction_month - 1) // 3 + 1
+    
+    # Property age features
+    construction_year = df['sale_year'] - df['property_age']
+    df['CONSTRUCTION_AGE_BAND'] = np.select(
+        [
+            (construction_year < 1900),
+            (construction_year >= 1900) & (construction_year <= 1950),
+            (construction_year > 1950) & (construction_year <= 2000),
+            (construction_year > 2000)
+        ],
+        ["pre1900", "1900-1950", "1951-2000", "2001+"],
+        default="2001+"
+    )
+    
+    # Adjusted price per sqm: known price per sqm (or the default) grown at the borough rate
+    if 'price' in df:
+        base_price_per_sqm = (df['price'] / df['tfarea']).where(df['price'].notna(), DEFAULT_PRICE_PER_SQM)
+    else:
+        base_price_per_sqm = DEFAULT_PRICE_PER_SQM
+    rates = {b: borough_growth_rates.get(b, DEFAULT_GROWTH) for b in df['borough'].unique()}
+    growth_rate = df['borough'].map(rates).astype(float)
+    adjusted_price_per_sqm = base_price_per_sqm * (1 + growth_rate) ** (df['sale_year'] - TREND_BASE_YEAR)
+    
+    # Size features
+    df['tfarea'] = df['tfarea'].replace(0, np.nan)
+    df['room_size'] = df['tfarea'] / df['numberrooms'].replace(0, np.nan)
+    
+    # Set borough-level features
+    df['borough_mean_price'] = adjusted_price_per_sqm
+    df['price_to_borough_mean'] = 1.0  # Default ratio
+    
+    return df
+
+def engineer_features(user_input, prediction_year, prediction_month, borough_growth_rates):
+    """Create features for prediction with proper temporal adjustments"""
+    df = engineer_features_batch(pd.DataFrame([user_input]), [prediction_year],
+                                 prediction_month, borough_growth_rates)
+    return df, df['borough_mean_price'].iloc[0]
+
+def model_features(model_pipeline, features):
+    """The columns the model was trained on, in training order. Without
+    feature_names_in_, drops 'price': the training target, which the batch
+    frame carries (NaN where not given) only for the trend projection."""
+    names = getattr(model_pipeline, 'feature_names_in_', None)
+    if names is not None:
+        return features[list(names)]
+    return features.drop(columns=['price'], errors='ignore')
+
+TEXT_FEATURES = ('propertytype', 'duration')
+NUMERIC_FEATURES = ('numberrooms', 'tfarea', 'property_age', 'price')
+
+def _prepare_properties(properties, tables):
+    """Properties as a frame with normalised inputs ('detached ' -> 'Detached',
+    numbers as floats) and boroughs resolved, plus their ids. Raises ValueError
+    if a value is not numeric or a borough cannot be resolved from its postcode."""
+    props = pd.DataFrame(properties).reset_index(drop=True)
+    property_ids = props.pop('property_id') if 'property_id' in props else pd.Series(props.index)
+    for column in TEXT_FEATURES:
+        if column in props:
+            props[column] = props[column].map(
+                lambda value: value if value is None or pd.isna(value) else str(value).strip().title())
+    for column in NUMERIC_FEATURES:
+        if column in props:
+            props[column] = pd.to_numeric(props[column]).astype(float)
+    for column in ('postcode', 'borough'):
+        if column not in props:
+            props[column] = None
+    missing = props['borough'].isna() | (props['borough'] == '')
+    if missing.any():
+        props.loc[missing, 'borough'] = props.loc[missing, 'postcode'].map(
+            lambda postcode: resolve_borough(postcode, tables))
+        unresolved = props['borough'].isna()
+        if unresolved.any():
+            postcodes = ', '.join(repr(pc) for pc in props.loc[unresolved, 'postcode'].unique())
+            raise ValueError(f"No borough found for postcode(s) {postcodes}")
+    if 'dateoftransfer' not in props:
+        props['dateoftransfer'] = datetime.now()
+    return props, property_ids
+
+def predict_batch(model_pipeline, properties, horizons=range(1, 6), current_year=None,
+                  prediction_month=None, lookup_tables=None):
+    """Blended price predictions for many properties over many years with one
+    model call. `properties` is a DataFrame or list of dicts with the fields
+    get_user_input returns; a missing borough is resolved from the postcode
+    (ValueError if it cannot be) and 'property_id' defaults to the row number. Returns one row per property and
+    year: property_id, postcode, borough, year, horizon, model_price, trend_price,
+    predicted_price, price_per_sqm and growth_rate."""
+    now = datetime.now()
+    current_year = current_year or now.year
+    prediction_month = prediction_month or now.month
+    tables = lookup_tables or load_lookup_tables()
+    horizons = list(horizons)
+    props, property_ids = _prepare_properties(properties, tables)
+    
+    growth_rates = tables['borough_growth_rates']
+    features = engineer_features_batch(props, [current_year + h for h in horizons],
+                                       prediction_month, growth_rates)
+    model_price = model_pipeline.predict(model_features(model_pipeline, features))
+    
+    # Trend projection is adjusted price per sqm * area, blended vectorized
+    tfarea = np.repeat(props['tfarea'].to_numpy(dtype=float), len(horizons))
+    trend_price = features['borough_mean_price'].to_numpy(dtype=float) * tfarea
+    predicted_price = MODEL_WEIGHT * model_price + (1 - MODEL_WEIGHT) * trend_price
+    return pd.DataFrame({
+        'property_id': np.repeat(property_ids.to_numpy(), len(horizons)),
+        'postcode': features['postcode'],
+        'borough': features['borough'],
+        'year': features['sale_year'],
+        'horizon': np.tile(horizons, len(props)),
+        'model_price': model_price,
+        'trend_price': trend_price,
+        'predicted_price': predicted_price,
+        'price_per_sqm': predicted_price / tfarea,
+        'growth_rate': features['borough'].map(lambda b: growth_rates.get(b, DEFAULT_GROWTH)),
+    })
+
+#%% 5b. PREDICTION CACHE
+PREDICTION_COLUMNS = ['property_id', 'postcode', 'borough', 'year', 'horizon', 'model_price',
+                      'trend_price', 'predicted_price', 'price_per_sqm', 'growth_rate']
+_CACHED_FIELDS = PREDICTION_COLUMNS[5:]
+
+class PredictionCache:
+    """Bounded LRU memo of predictions with a time-to-live. Thread-safe.
+    maxsize=0 or ttl=0 turns it into a pass-through that only counts misses."""
+
+    def __init__(self, maxsize=10000, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        if not self.maxsize or not self.ttl:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+def _key_value(value):
+    # NaN never equals itself, so missing values must be None in a cache key.
+    return None if value is None or pd.isna(value) else value
+
+def feature_key(prop, prediction_year, prediction_month):
+    """Everything a prediction depends on: the model's inputs (the postcode only
+    through its borough), the optional known price, and the prediction date.
+    `prop` is a row from _prepare_properties, i.e. the exact values the model sees."""
+    return (
+        str(prop['borough']),
+        _key_value(prop['propertytype']),
+        _key_value(prop['duration']),
+        _key_value(prop['numberrooms']),
+        _key_value(prop['tfarea']),
+        _key_value(prop['property_age']),
+        _key_value(prop.get('price')),
+        int(prediction_year),
+        int(prediction_month),
+    )
+
+def predict_cached(model_pipeline, properties, horizons=range(1, 6), current_year=None,
+                   prediction_month=None, lookup_tables=None, cache=None):
+    """predict_batch behind a PredictionCache: only properties with at least one
+    uncached year go to the model (in one batch). Same output as predict_batch."""
+    if cache is None:
+        return predict_batch(model_pipeline, properties, horizons, current_year,
+                             prediction_month, lookup_tables)
+    now = datetime.now()
+    current_year = current_year or now.year
+    prediction_month = prediction_month or now.month
+    tables = lookup_tables or load_lookup_tables()
+    horizons = list(horizons)
+    props, property_ids = _prepare_properties(properties, tables)
+    records = props.to_dict('records')
+    
+    keys = [[feature_key(prop, current_year + h, prediction_month) for h in horizons]
+            for prop in records]
+    values = [[cache.get(key) for key in row] for row in keys]
+    missed = [i for i, row in enumerate(values) if any(value is None for value in row)]
+    if missed:
+        fresh = predict_batch(model_pipeline, props.iloc[missed].assign(property_id=missed),
+                              horizons, current_year, prediction_month, tables)
+        # predict_batch returns each property's horizons in order, so rows map
+        # back by position (repeated horizons included).
+        for n, row in enumerate(fresh.itertuples(index=False)):
+            i, position = missed[n // len(horizons)], n % len(horizons)
+            value = tuple(getattr(row, field) for field in _CACHED_FIELDS)
+            cache.put(keys[i][position], value)
+            values[i][position] = value
+    
+    rows = []
+    for i, prop in enumerate(records):
+        for horizon, value in zip(horizons, values[i]):
+            rows.append((property_ids.iloc[i], prop['postcode'], prop['borough'],
+                         current_year + horizon, horizon) + value)
+    return pd.DataFrame(rows, columns=PREDICTION_COLUMNS)
+
+def format_price(price):
+    try:
+        return locale.currency(price, grouping=True)
+    except ValueError:  # no currency formatting in the C locale
+        return f"£{price:,.2f}"
+
+#%% 6. MAIN PREDICTION LOOP
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Predict house prices over the next 1-5 years.")
+    parser.add_argument("--build-artifact", action="store_true",
+                        help="Precompute the lookup artifact from the cleaned CSV and exit.")
+    parser.add_argument("--data", help="Cleaned CSV path (env CLEANED_DATA_PATH).")
+    parser.add_argument("--model", help="Trained pipeline path (env MODEL_PATH).")
+    parser.add_argument("--artifact", help="Lookup artifact path (env LOOKUP_ARTIFACT_PATH).")
+    args = parser.parse_args()
+    file_path = args.data or file_path
+    model_path = args.model or model_path
+    artifact_path = args.artifact or artifact_path
+
+    if args.build_artifact:
+        tables = build_artifact(file_path, artifact_path)
+        print(f"Wrote {artifact_path}: {len(tables['postcode_borough_map'])} postcodes, "
+              f"{len(tables['borough_growth_rates'])} boroughs")
+        raise SystemExit(0)
+
+    try:
+        locale.setlocale(locale.LC_ALL, 'en_GB.UTF-8')
+    except locale.Error:
+        pass  # format_price falls back to plain formatting
+
+    # Load the trained model and lookup tables
+    model_pipeline = joblib.load(model_path)
+    tables = load_lookup_tables()
+    
+    # Get user input
+    num_years = int(input("Enter number of years to predict prices for (1-5): "))
+    user_input = get_user_input(tables)
+    
+    # Store results
+    results = []
+    
+    print("\nPredicted Prices:")
+    try:
+        predictions = predict_batch(model_pipeline, [user_input], range(1, num_years + 1),
+                                    lookup_tables=tables)
+    except Exception as e:
+        print(f"Error predicting: {str(e)}")
+        predictions = pd.DataFrame()
+    
+    for row in predictions.itertuples(index=False):
+        # Format and display results
+        formatted_price = format_price(row.predicted_price)
+        growth_rate = row.growth_rate * 100
+        print(f"{row.year}: {formatted_price} (Estimated growth: {growth_rate:.1f}%)")
+        
+        results.append({
+            'Year': row.year,
+            'Predicted Price': row.predicted_price,
+            'Price per sqm': row.price_per_sqm,
+            'Growth Rate (%)': growth_rate,
+            'Borough': user_input['borough'],
+            'Property Type': user_input['propertytype'],
+            'Rooms': user_input['numberrooms'],
+            'Area (sqm)': user_input['tfarea']
+        })
+    
+    # Save and optionally plot results
+    results_df = pd.DataFrame(results)
+    results_df.to_csv("multi_year_predictions.csv", index=False)
+    print("\nPredictions saved to multi_year_predictions.csv")
+    
+    # Plot the predictions (plotting libraries are only imported here)
+    if not results_df.empty:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        sns.set(style="whitegrid")
+        plt.figure(figsize=(10, 6))
+        plt.plot(results_df['Year'], results_df['Predicted Price'], marker='o')
+        plt.title(f"Price Prediction Trend for {user_input['postcode']}")
+        plt.xlabel('Year')
+        plt.ylabel('Predicted Price (£)')
+        plt.grid(True)
+        plt.tight_layout()
+        plt.show()
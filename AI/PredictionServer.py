@@ -0,0 +1,244 @@
+# /AI/PredictionServer.py
+# Long-running prediction service: loads the trained pipeline and the lookup
+# artifact once and answers valuation requests from memory, instead of a fresh
+# ModelIntegration.py run (joblib.load, CSV, growth rates) per valuation.
+#
+# Protocol (JSON lines on stdin/stdout, like the scraper daemon):
+#   in:  {"id": "req-1", "properties": [{...}, ...], "horizons": [1, 2, 3]}
+#        {"id": "req-2", "property": {...}, "years": 5}
+#        {"op": "ping"} | {"op": "stats"} | {"op": "shutdown"}
+#   out: {"id": "req-1", "predictions": [{"property_id", "year", ...}], "latency_ms": 4.2}
+#        {"id": ..., "cache": {"hits", "misses", "hit_rate", ...}, "latency_ms": ...}
+#        {"id": ..., "error": "...", "latency_ms": ...}
+#
+# A property has the fields get_user_input collects: postcode, propertytype,
+# duration, numberrooms, tfarea, property_age and optionally borough/price.
+# Requests run concurrently, at most --workers at a time in either mode;
+# responses carry the request id and may arrive out of order. Predictions are
+# memoised per normalised features and year in an LRU cache with a TTL
+# (--cache-size, --cache-ttl). With --http HOST:PORT the
+# same request bodies are accepted as POST /predict (GET /health answers pings,
+# GET /stats the cache statistics) instead of stdin.
+
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import sys
+import threading
+import time
+
+import joblib
+
+import ModelIntegration
+from ModelIntegration import PredictionCache, load_lookup_tables, predict_cached
+
+REQUIRED_FIELDS = ('propertytype', 'duration', 'numberrooms', 'tfarea', 'property_age')
+DEFAULT_HORIZONS = [1, 2, 3, 4, 5]
+
+
+class PredictionService:
+    """Warm model and lookup tables answering prediction requests. Thread-safe."""
+
+    def __init__(self, model_pipeline, lookup_tables, cache=None):
+        self.model_pipeline = model_pipeline
+        self.lookup_tables = lookup_tables
+        self.cache = cache
+
+    @classmethod
+    def load(cls, model_path=None, artifact_path=None, cache=None):
+        start = time.perf_counter()
+        model_pipeline = joblib.load(model_path or ModelIntegration.model_path)
+        lookup_tables = load_lookup_tables(artifact_path or ModelIntegration.artifact_path)
+        service = cls(model_pipeline, lookup_tables, cache)
+        service.load_ms = round((time.perf_counter() - start) * 1000, 1)
+        return service
+
+    @staticmethod
+    def _properties(request):
+        """The request's properties, checked for shape and required fields.
+        Normalisation and borough resolution happen in predict_cached."""
+        properties = request.get('properties')
+        if properties is None and 'property' in request:
+            properties = [request['property']]
+        if not isinstance(properties, list) or not properties:
+            raise ValueError("Request needs 'properties' (a non-empty list) or 'property'.")
+        for index, prop in enumerate(properties):
+            if not isinstance(prop, dict):
+                raise ValueError(f"Property {index} is not an object.")
+            missing = [field for field in REQUIRED_FIELDS if prop.get(field) is None]
+            if missing:
+                raise ValueError(f"Property {index} is missing {', '.join(missing)}.")
+        return properties
+
+    @staticmethod
+    def _horizons(request):
+        if 'horizons' in request:
+            horizons = [int(h) for h in request['horizons']]
+        elif 'years' in request:
+            horizons = list(range(1, int(request['years']) + 1))
+        else:
+            horizons = DEFAULT_HORIZONS
+        if not horizons or min(horizons) < 0:
+            raise ValueError("Horizons must be a non-empty list of years from now.")
+        return horizons
+
+    def predict(self, request):
+        """Predictions for one request, as a list of JSON-ready rows."""
+        predictions = predict_cached(
+            self.model_pipeline,
+            self._properties(request),
+            self._horizons(request),
+            current_year=request.get('current_year'),
+            prediction_month=request.get('month'),
+            lookup_tables=self.lookup_tables,
+            cache=self.cache,
+        )
+        return predictions.to_dict(orient='records')
+
+    def handle(self, request):
+        """Answers one decoded request with its id and latency_ms."""
+        start = time.perf_counter()
+        response = {'id': request.get('id')}
+        op = request.get('op', 'predict')
+        try:
+            if op == 'ping':
+                response['status'] = 'pong'
+            elif op == 'stats':
+                response['cache'] = self.cache.stats() if self.cache else None
+            elif op == 'predict':
+                response['predictions'] = self.predict(request)
+            else:
+                response['error'] = f"Unknown op: {op}"
+        except (KeyError, TypeError, ValueError) as e:
+            response['error'] = f"Bad request: {e}"
+        except Exception as e:
+            response['error'] = f"Prediction failed: {type(e).__name__} - {e}"
+        response['latency_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return response
+
+
+def _decode(line):
+    request = json.loads(line)
+    if not isinstance(request, dict):
+        raise ValueError("expected a JSON object")
+    return request
+
+
+def _dumps(response):
+    # default=str covers timestamps and any other non-JSON value in a row.
+    return json.dumps(response, default=str)
+
+
+def serve_stdin(service, workers):
+    write_lock = threading.Lock()
+
+    def write(response):
+        with write_lock:
+            sys.stdout.write(_dumps(response) + "\n")
+            sys.stdout.flush()
+
+    def run(request):
+        write(service.handle(request))
+
+    print("Prediction server reading requests from stdin.", file=sys.stderr)
+    write({'status': 'ready', 'load_ms': service.load_ms})
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            try:
+                request = _decode(line)
+            except ValueError as e:
+                write({'error': f"Invalid request line: {e}"})
+                continue
+            if request.get('op') == 'shutdown':
+                break
+            executor.submit(run, request)
+
+
+def serve_http(service, host, port, workers):
+    # One thread per connection, but at most `workers` requests at the model.
+    slots = threading.BoundedSemaphore(workers)
+
+    class PredictionHandler(BaseHTTPRequestHandler):
+        def _reply(self, status, response):
+            body = _dumps(response).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._reply(200, service.handle({'op': 'ping'}))
+            elif self.path == '/stats':
+                self._reply(200, service.handle({'op': 'stats'}))
+            else:
+                self._reply(404, {'error': f"Not found: {self.path}"})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._reply(404, {'error': f"Not found: {self.path}"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = _decode(self.rfile.read(length))
+            except ValueError as e:
+                self._reply(400, {'error': f"Invalid request body: {e}"})
+                return
+            request.setdefault('op', 'predict')
+            with slots:
+                response = service.handle(request)
+            self._reply(400 if 'error' in response else 200, response)
+
+        def log_message(self, format, *args):
+            print(f"[http] {format % args}", file=sys.stderr)
+
+    with ThreadingHTTPServer((host, port), PredictionHandler) as server:
+        server.daemon_threads = True
+        print(f"Prediction server listening on http://{host}:{port}.", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve house price predictions from a warm model over JSON lines or HTTP."
+    )
+    parser.add_argument("--model", help="Trained pipeline path (env MODEL_PATH).")
+    parser.add_argument("--artifact", help="Lookup artifact path (env LOOKUP_ARTIFACT_PATH).")
+    parser.add_argument("--data", help="Cleaned CSV, only used if the artifact must be built.")
+    parser.add_argument(
+        "--workers", type=int, default=4, help="Requests handled at once (stdin and HTTP)."
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=10000, help="Predictions kept in the cache (0 disables it)."
+    )
+    parser.add_argument(
+        "--cache-ttl", type=float, default=3600, help="Seconds a cached prediction stays valid."
+    )
+    parser.add_argument(
+        "--http", metavar="HOST:PORT", help="Serve HTTP instead of stdin (e.g. 127.0.0.1:8766)."
+    )
+    args = parser.parse_args()
+    if args.data:
+        ModelIntegration.file_path = args.data
+
+    try:
+        cache = PredictionCache(args.cache_size, args.cache_ttl) if args.cache_size > 0 else None
+        service = PredictionService.load(args.model, args.artifact, cache)
+    except Exception as e:
+        print(_dumps({'error': f"Failed to load model: {e}"}), flush=True)
+        sys.exit(1)
+    print(f"Model and lookup tables loaded in {service.load_ms} ms.", file=sys.stderr)
+
+    if args.http:
+        host, _, port = args.http.rpartition(":")
+        serve_http(service, host or "127.0.0.1", int(port), args.workers)
+    else:
+        serve_stdin(service, args.workers)
+    print("Prediction server stopped.", file=sys.stderr)
@@ -0,0 +1,136 @@
+# Benchmark of the borough growth-rate calculation: the original per-borough
+# loop against the single-groupby version in ModelIntegration, on the cleaned
+# CSV or on synthetic price-paid data. Exits non-zero if the rates differ.
+#
+#   python bench_growth_rates.py                      # synthetic, 1M rows
+#   python bench_growth_rates.py --data cleaned_data.csv
+#   python bench_growth_rates.py --base-years 2020 2022 2024 --lookbacks 3 5 10
+
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from ModelIntegration import (
+    calculate_borough_growth_rates,
+    load_cleaned_data,
+    sweep_borough_growth_rates,
+)
+
+
+def legacy_borough_growth_rates(df, base_year=2024, lookback_years=5):
+    """The original O(boroughs x rows) loop, kept as the reference"""
+    borough_growth = {}
+    df['price_per_sqm'] = df['price'] / df['tfarea'].replace(0, np.nan)
+    for borough in df['borough'].unique():
+        borough_data = df[df['borough'] == borough]
+        recent_data = borough_data[borough_data['sale_year'] >= (base_year - lookback_years)]
+        if len(recent_data) >= 10:
+            borough_prices = recent_data.groupby('sale_year')['price_per_sqm'].median().reset_index()
+            if len(borough_prices) >= 2:
+                start_price = borough_prices.iloc[0]['price_per_sqm']
+                end_price = borough_prices.iloc[-1]['price_per_sqm']
+                n_years = borough_prices.iloc[-1]['sale_year'] - borough_prices.iloc[0]['sale_year']
+                cagr = (end_price / start_price) ** (1/n_years) - 1 if n_years > 0 else 0.02
+                borough_growth[borough] = max(min(cagr, 0.1), -0.05)
+            else:
+                borough_growth[borough] = 0.02
+        else:
+            borough_growth[borough] = 0.02
+    return borough_growth
+
+
+def synthetic_data(rows, boroughs=33, seed=0):
+    """Price-paid-like rows: a few sparse boroughs, zero areas and missing prices included"""
+    rng = np.random.default_rng(seed)
+    names = [f"Borough {i}" for i in range(boroughs)]
+    weights = rng.pareto(1.5, boroughs) + 0.01
+    borough = rng.choice(names, rows, p=weights / weights.sum())
+    year = rng.integers(1995, 2025, rows)
+    growth = 1 + rng.uniform(-0.03, 0.08, boroughs)[[names.index(b) for b in names]]
+    growth_by_row = pd.Series(growth, index=names)[borough].to_numpy()
+    price = rng.lognormal(12.5, 0.5, rows) * growth_by_row ** (year - 1995)
+    price[rng.random(rows) < 0.001] = np.nan
+    tfarea = rng.uniform(30, 250, rows)
+    tfarea[rng.random(rows) < 0.01] = 0
+    df = pd.DataFrame({
+        'borough': pd.Categorical(borough),
+        'price': price,
+        'tfarea': tfarea,
+        'sale_year': year.astype(float),
+    })
+    # A borough with only a handful of sales gets the default rate.
+    df.loc[df.index[:5], 'borough'] = names[-1]
+    return df
+
+
+def same_rates(expected, actual):
+    if list(expected) != list(actual):
+        return False
+    for borough, rate in expected.items():
+        other = actual[borough]
+        if isinstance(rate, float) and math.isnan(rate):
+            if not (isinstance(other, float) and math.isnan(other)):
+                return False
+        elif rate != other:
+            return False
+    return True
+
+
+def best_of(repeat, fn, *args):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark borough growth-rate calculation.")
+    parser.add_argument("--data", help="Cleaned CSV to use instead of synthetic data.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic row count.")
+    parser.add_argument("--base-years", type=int, nargs="+", default=[2024])
+    parser.add_argument("--lookbacks", type=int, nargs="+", default=[5])
+    parser.add_argument("-n", "--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    df = load_cleaned_data(args.data) if args.data else synthetic_data(args.rows)
+    print(f"{len(df)} rows, {df['borough'].nunique()} boroughs")
+    pairs = [(b, l) for b in args.base_years for l in args.lookbacks]
+    failures = 0
+
+    legacy_total = grouped_total = 0.0
+    for base_year, lookback in pairs:
+        # The legacy loop adds a price_per_sqm column; give it its own copy.
+        legacy_s, legacy = best_of(args.repeat, legacy_borough_growth_rates,
+                                   df.copy(), base_year, lookback)
+        grouped_s, grouped = best_of(args.repeat, calculate_borough_growth_rates,
+                                     df, base_year, lookback)
+        legacy_total += legacy_s
+        grouped_total += grouped_s
+        ok = same_rates(legacy, grouped)
+        failures += not ok
+        print(f"base {base_year} lookback {lookback:2d}: loop {legacy_s * 1000:8.1f} ms  "
+              f"groupby {grouped_s * 1000:7.1f} ms  ({legacy_s / grouped_s:5.1f}x)"
+              f"{'' if ok else '  MISMATCH'}")
+
+    if len(pairs) > 1:
+        sweep_s, sweep = best_of(args.repeat, sweep_borough_growth_rates,
+                                 df, args.base_years, args.lookbacks)
+        for pair in pairs:
+            if not same_rates(legacy_borough_growth_rates(df.copy(), *pair), sweep[pair]):
+                failures += 1
+                print(f"sweep {pair}: MISMATCH")
+        print(f"sweep of {len(pairs)}: loop {legacy_total * 1000:8.1f} ms  "
+              f"one groupby {sweep_s * 1000:7.1f} ms  ({legacy_total / sweep_s:5.1f}x)")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
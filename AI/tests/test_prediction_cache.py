@@ -0,0 +1,47 @@
+# /AI/tests/test_prediction_cache.py
+# LRU eviction and TTL expiry of ModelIntegration.PredictionCache.
+#
+#   python -m unittest discover AI/tests
+
+from unittest import mock
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ModelIntegration import PredictionCache  # noqa: E402
+
+
+class PredictionCacheTest(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = PredictionCache(maxsize=2, ttl=60)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)  # 'b' is now least recently used
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.get('a'), cache.get('c')), (1, 3))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl_expiry(self):
+        cache = PredictionCache(maxsize=10, ttl=60)
+        with mock.patch('ModelIntegration.time.monotonic', return_value=1000.0):
+            cache.put('a', 1)
+        with mock.patch('ModelIntegration.time.monotonic', return_value=1059.0):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('ModelIntegration.time.monotonic', return_value=1060.0):
+            self.assertIsNone(cache.get('a'))
+        stats = cache.stats()
+        self.assertEqual((stats['size'], stats['expirations']), (0, 1))
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_rate']), (1, 1, 0.5))
+
+    def test_disabled_cache_only_counts_misses(self):
+        cache = PredictionCache(maxsize=0)
+        cache.put('a', 1)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['misses'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
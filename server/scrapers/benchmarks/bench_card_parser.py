@@ -0,0 +1,88 @@
+# /server/scrapers/benchmarks/bench_card_parser.py
+# Micro-benchmark: single-pass lxml card parser vs the original
+# index-aligned BeautifulSoup parser, over saved results pages.
+#
+#   python bench_card_parser.py                      # bundled fixtures
+#   python bench_card_parser.py saved/*.html -n 50   # your own saved pages
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors import extract_list_cards, extract_list_cards_bs4  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+COMPARED_FIELDS = ("id", "price", "address", "description", "bedrooms", "bathrooms")
+
+
+def time_parser(parser, page_source, repeat):
+    """Best-of-`repeat` wall time for one parse, plus the parsed records."""
+    best = float("inf")
+    records = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        records = parser(page_source)
+        best = min(best, time.perf_counter() - start)
+    return best, records
+
+
+def field_disagreements(records_a, records_b):
+    """Counts per field where the two parsers disagree on the same card position."""
+    counts = {field: 0 for field in COMPARED_FIELDS}
+    for a, b in zip(records_a, records_b):
+        for field in COMPARED_FIELDS:
+            if a.get(field) != b.get(field):
+                counts[field] += 1
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the lxml card parser against the BeautifulSoup one."
+    )
+    parser.add_argument(
+        "pages",
+        nargs="*",
+        help="Saved results-page HTML files (default: fixtures/results_page*.html).",
+    )
+    parser.add_argument("-n", "--repeat", type=int, default=20, help="Runs per page.")
+    args = parser.parse_args(argv)
+
+    pages = args.pages or sorted(glob.glob(os.path.join(FIXTURES_DIR, "results_page*.html")))
+    if not pages:
+        print("No results pages to benchmark.", file=sys.stderr)
+        return 1
+
+    totals = {"lxml": 0.0, "bs4": 0.0}
+    for path in pages:
+        with open(path, encoding="utf-8") as f:
+            page_source = f.read()
+        lxml_time, lxml_records = time_parser(extract_list_cards, page_source, args.repeat)
+        bs4_time, bs4_records = time_parser(extract_list_cards_bs4, page_source, args.repeat)
+        totals["lxml"] += lxml_time
+        totals["bs4"] += bs4_time
+
+        print(f"{os.path.basename(path)} ({len(page_source) / 1024:.0f} KiB)")
+        print(
+            f"  lxml single-pass: {lxml_time * 1000:8.2f} ms  {len(lxml_records):3d} cards  "
+            f"{len(lxml_records) / lxml_time:10.0f} cards/s"
+        )
+        print(
+            f"  bs4 index-zip:    {bs4_time * 1000:8.2f} ms  {len(bs4_records):3d} cards  "
+            f"{len(bs4_records) / bs4_time:10.0f} cards/s"
+        )
+        disagreements = field_disagreements(lxml_records, bs4_records)
+        differing = {f: n for f, n in disagreements.items() if n}
+        print(f"  field disagreements: {differing or 'none'}")
+
+    if totals["lxml"] > 0:
+        print(f"\nSpeed-up: {totals['bs4'] / totals['lxml']:.1f}x over {len(pages)} page(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+# /server/scrapers/benchmarks/bench_scraper.py
+# Offline benchmark suite over recorded pages: no browser, no network.
+#
+#   parse          RightmoveScraper.parse on a results page, detail pages
+#                  served by a fixture HTTP session (driver is a stub)
+#   cards          extract_list_cards on the results page
+#   coordinates    the coordinate regex on every detail page
+#   detail_fields  sq ft + property type (+ coordinates) from detail pages
+#
+# Every case reports records/s and tracemalloc peak and is checked against
+# fixtures/expected.json. Exits non-zero when output differs from the
+# expected records, or a case is slower (or hungrier) than baseline.json
+# by more than the tolerance. Baselines are machine-specific:
+#
+#   python bench_scraper.py                    # check against baseline
+#   python bench_scraper.py --update-baseline  # re-record on this machine
+#   python bench_scraper.py --write-expected   # after an intended output change
+
+import argparse
+import contextlib
+import gc
+import glob
+import io
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detail_fetcher import HttpDetailFetcher  # noqa: E402
+from extractors import (  # noqa: E402
+    extract_coordinates,
+    extract_detail_fields,
+    extract_list_cards,
+)
+from scrape import RightmoveScraper, sse_output  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+EXPECTED_PATH = os.path.join(FIXTURES_DIR, "expected.json")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+RECORD_FIELDS = (
+    "id",
+    "price",
+    "address",
+    "bedrooms",
+    "bathrooms",
+    "latitude",
+    "longitude",
+    "square_footage",
+    "property_type",
+)
+PROPERTY_ID_RE = re.compile(r"/properties/(\d+)")
+
+
+class _FixtureResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+class FixtureSession:
+    """Stands in for requests.Session: serves a recorded detail page per property id."""
+
+    def __init__(self, detail_pages):
+        self.detail_pages = detail_pages
+
+    def get(self, url, timeout=None):
+        match = PROPERTY_ID_RE.search(url)
+        index = int(match.group(1)) if match else 0
+        return _FixtureResponse(self.detail_pages[index % len(self.detail_pages)])
+
+    def close(self):
+        pass
+
+
+def load_fixtures():
+    with open(os.path.join(FIXTURES_DIR, "results_page.html"), encoding="utf-8") as f:
+        results_page = f.read()
+    detail_paths = sorted(glob.glob(os.path.join(FIXTURES_DIR, "detail_page_*.html")))
+    detail_pages = []
+    for path in detail_paths:
+        with open(path, encoding="utf-8") as f:
+            detail_pages.append(f.read())
+    return results_page, detail_pages
+
+
+def run_parse(results_page, detail_pages):
+    """One RightmoveScraper.parse over the results page; returns the emitted records."""
+    out = io.StringIO()
+    # The scraper's progress log is kept (it is part of the real cost) but not shown.
+    with sse_output(stream=out), contextlib.redirect_stderr(io.StringIO()):
+        scraper = RightmoveScraper(
+            postcode="TS178BT",
+            driver=object(),  # parse never touches the driver with the HTTP engine
+            detail_engine="http",
+            extraction="dom",
+            metric_events=False,
+        )
+        # No pacer: the suite measures parsing, not politeness delays.
+        scraper.http_fetcher = HttpDetailFetcher(
+            max_workers=4, session=FixtureSession(detail_pages)
+        )
+        try:
+            scraper.parse(results_page)
+        finally:
+            scraper.http_fetcher.close()
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    records = [r for r in records if "id" in r]
+    records.sort(key=lambda r: r["id"])
+    return [{field: r.get(field) for field in RECORD_FIELDS} for r in records]
+
+
+def run_cards(results_page, detail_pages):
+    return [
+        {field: r.get(field) for field in RECORD_FIELDS[:5]}
+        for r in extract_list_cards(results_page)
+    ]
+
+
+def run_coordinates(results_page, detail_pages):
+    return [list(extract_coordinates(page) or ()) for page in detail_pages]
+
+
+def run_detail_fields(results_page, detail_pages):
+    return [extract_detail_fields(page) for page in detail_pages]
+
+
+CASES = {
+    "parse": run_parse,
+    "cards": run_cards,
+    "coordinates": run_coordinates,
+    "detail_fields": run_detail_fields,
+}
+
+
+def measure(case, fixtures, repeat, min_time):
+    """Best time over at least `repeat` runs and `min_time` seconds, then one
+    extra run under tracemalloc for the peak."""
+    best = float("inf")
+    output = None
+    runs = 0
+    deadline = time.perf_counter() + min_time
+    # Like timeit: keep collector pauses out of the timings.
+    gc.collect()
+    gc.disable()
+    try:
+        while runs < repeat or time.perf_counter() < deadline:
+            start = time.perf_counter()
+            output = case(*fixtures)
+            best = min(best, time.perf_counter() - start)
+            runs += 1
+    finally:
+        gc.enable()
+    tracemalloc.start()
+    try:
+        case(*fixtures)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak, output
+
+
+def load_json(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def count_mismatches(expected, actual):
+    if len(expected) != len(actual):
+        return max(len(expected), len(actual))
+    return sum(1 for e, a in zip(expected, actual) if e != a)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Offline benchmark of the scraper's parsing and extraction."
+    )
+    parser.add_argument(
+        "cases", nargs="*", help=f"Cases to run (default: all of {', '.join(CASES)})."
+    )
+    parser.add_argument("-n", "--repeat", type=int, default=10, help="Minimum timed runs per case.")
+    parser.add_argument(
+        "--min-time", type=float, default=1.0, help="Minimum seconds spent timing each case."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.4,
+        help="Allowed slowdown vs baseline, as a fraction (0.4 = 40%% fewer records/s).",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed growth of peak memory vs baseline, as a fraction.",
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Record timings as the new baseline."
+    )
+    parser.add_argument(
+        "--write-expected",
+        action="store_true",
+        help="Record outputs as the new expected results.",
+    )
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+
+    fixtures = load_fixtures()
+    if not fixtures[1]:
+        print("No detail-page fixtures found.", file=sys.stderr)
+        return 1
+    expected = load_json(EXPECTED_PATH)
+    baseline = load_json(BASELINE_PATH)
+    failures = []
+
+    for name in args.cases or CASES:
+        seconds, peak, output = measure(CASES[name], fixtures, args.repeat, args.min_time)
+        records = len(output)
+        rate = records / seconds if seconds > 0 else float("inf")
+        line = (
+            f"{name:<14} {records:3d} records  {seconds * 1000:8.2f} ms  "
+            f"{rate:10.0f} records/s  peak {peak / 1024:8.0f} KiB"
+        )
+
+        if args.write_expected:
+            expected[name] = output
+        elif name not in expected:
+            failures.append(f"{name}: no expected output recorded")
+        else:
+            mismatches = count_mismatches(expected[name], output)
+            if mismatches:
+                failures.append(f"{name}: {mismatches} record(s) differ from expected output")
+
+        if args.update_baseline:
+            baseline[name] = {"records_per_second": round(rate, 1), "peak_bytes": peak}
+        elif name in baseline:
+            base = baseline[name]
+            line += f"  ({rate / base['records_per_second']:.2f}x baseline speed)"
+            if rate < base["records_per_second"] * (1 - args.tolerance):
+                failures.append(
+                    f"{name}: {rate:.0f} records/s is below baseline {base['records_per_second']:.0f}"
+                )
+            if peak > base["peak_bytes"] * (1 + args.memory_tolerance):
+                failures.append(
+                    f"{name}: peak {peak / 1024:.0f} KiB is above baseline {base['peak_bytes'] / 1024:.0f} KiB"
+                )
+        print(line)
+
+    if args.write_expected:
+        write_json(EXPECTED_PATH, expected)
+        print(f"Wrote {EXPECTED_PATH}")
+    if args.update_baseline:
+        write_json(BASELINE_PATH, baseline)
+        print(f"Wrote {BASELINE_PATH}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
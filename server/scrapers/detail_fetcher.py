@@ -0,0 +1,124 @@
+# /server/scrapers/detail_fetcher.py
+# Browserless detail-page engine: fetches property pages over a pooled,
+# keep-alive HTTP session and runs the extractors on the raw HTML.
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from extractors import extract_detail_fields
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from driver_pool import USER_AGENT
+import requests
+import sys
+import time
+
+
+class HttpDetailFetcher:
+    """Fetches detail pages with at most ``max_workers`` requests in flight.
+
+    One ``requests.Session`` is shared by all workers; its connection pool is
+    sized to the concurrency so every worker reuses a warm keep-alive socket.
+    """
+
+    def __init__(self, max_workers=8, timeout=15, session=None, pacer=None, metrics=None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        # Optional AdaptiveRateLimiter shared with the rest of the scraper run.
+        self.pacer = pacer
+        # Optional RunMetrics: times the download and the extraction separately.
+        self.metrics = metrics
+        self.session = session or self._build_session(max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="detail-http"
+        )
+
+    @staticmethod
+    def _build_session(max_workers):
+        session = requests.Session()
+        retry = Retry(
+            total=2,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=max_workers, max_retries=retry
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(
+            {
+                "User-Agent": USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "en-GB,en;q=0.9",
+            }
+        )
+        return session
+
+    def fetch_html(self, url):
+        if self.pacer is None:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return response.text
+
+        self.pacer.acquire()
+        start = time.time()
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException:
+            self.pacer.record(time.time() - start, error=True)
+            raise
+        self.pacer.record(time.time() - start)
+        return response.text
+
+    def fetch_details(self, property_data):
+        """Fills detail fields of one property record in place.
+
+        Returns a short error string (stored as "fetch_error" by the caller)
+        or None on success. Never raises: one bad page must not stop the rest.
+        """
+        fetch_start = time.perf_counter()
+        try:
+            html = self.fetch_html(property_data["detail_url"])
+        except requests.RequestException as e:
+            self._observe("detail_http_fetch", fetch_start, False, property_data)
+            print(
+                f"   Error during HTTP detail fetch for {property_data['id']}: {type(e).__name__} - {e}",
+                file=sys.stderr,
+            )
+            return f"Fetch error: {type(e).__name__}"
+        self._observe("detail_http_fetch", fetch_start, True, property_data)
+        extract_start = time.perf_counter()
+        try:
+            property_data.update(extract_detail_fields(html))
+        except Exception as e:
+            self._observe("detail_extraction", extract_start, False, property_data)
+            print(
+                f"    Error extracting details for {property_data['id']}: {e}",
+                file=sys.stderr,
+            )
+            return f"Extract error: {type(e).__name__}"
+        self._observe("detail_extraction", extract_start, True, property_data)
+        return None
+
+    def _observe(self, phase, start, ok, property_data):
+        if self.metrics is not None:
+            self.metrics.observe(
+                phase, time.perf_counter() - start, ok=ok, property_id=property_data["id"]
+            )
+
+    def submit(self, property_data):
+        """Schedules fetch_details; the future resolves to (property_data, error)."""
+        return self._executor.submit(
+            lambda: (property_data, self.fetch_details(property_data))
+        )
+
+    def fetch_all(self, properties):
+        """Yields (property_data, error) pairs in completion order."""
+        futures = [self.submit(p) for p in properties]
+        for future in as_completed(futures):
+            yield future.result()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()
@@ -0,0 +1,478 @@
+# /server/scrapers/driver_pool.py
+# Chrome WebDriver construction shared by the one-shot scraper and the
+# long-lived daemon, a pool of pre-warmed sessions for the latter, and a
+# supervisor that swaps in a fresh session when one crashes mid-run.
+
+from selenium.common.exceptions import (
+    NoSuchWindowException,
+    SessionNotCreatedException,
+    WebDriverException,
+)
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+# selenium.webdriver (~0.2s) and webdriver_manager (~0.1s, plus network on
+# install()) are only imported once a driver is actually built; see
+# load_webdriver() and resolve_driver_path().
+webdriver = None
+Service = None
+Options = None
+
+# --- Constants ---
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36"
+PAGE_LOAD_TIMEOUT = 45
+
+# Lean browsing: we only read the DOM and page_source, so images, fonts,
+# media and third-party ad/analytics hosts are dead weight.
+LEAN_BLOCKED_URL_PATTERNS = [
+    "*.jpg",
+    "*.jpeg",
+    "*.png",
+    "*.gif",
+    "*.webp",
+    "*.avif",
+    "*.svg",
+    "*.ico",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*.mp4",
+    "*.webm",
+]
+LEAN_BLOCKED_HOSTS = [
+    "*.doubleclick.net",
+    "*.googletagmanager.com",
+    "*.google-analytics.com",
+    "*.googlesyndication.com",
+    "*.googleadservices.com",
+    "*.adnxs.com",
+    "*.amazon-adsystem.com",
+    "*.criteo.com",
+    "*.facebook.net",
+    "*.hotjar.com",
+    "*.scorecardresearch.com",
+    "*.taboola.com",
+]
+
+# Transfer size and DOM-ready time of the current page, from the Navigation
+# and Resource Timing APIs.
+PAGE_WEIGHT_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = nav ? (nav.transferSize || 0) : 0;
+for (const r of resources) { bytes += r.transferSize || 0; }
+return {
+    bytes: bytes,
+    requests: resources.length + 1,
+    seconds: nav && nav.domContentLoadedEventEnd > 0
+        ? (nav.domContentLoadedEventEnd - nav.startTime) / 1000 : null
+};
+"""
+
+# chromedriver location, remembered across processes so a normal start
+# skips ChromeDriverManager's network and version checks. CHROMEDRIVER_PATH
+# overrides it entirely.
+DRIVER_PATH_CACHE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "chromedriver_path.json"
+)
+DRIVER_PATH_TTL = 7 * 24 * 60 * 60
+
+_driver_path = None
+_driver_path_source = None
+_driver_path_lock = threading.Lock()
+_webdriver_lock = threading.Lock()
+
+
+def load_webdriver():
+    """Imports selenium.webdriver and the Chrome service/options classes on first use."""
+    global webdriver, Service, Options
+    with _webdriver_lock:
+        if webdriver is None:
+            from selenium import webdriver as webdriver_module
+            from selenium.webdriver.chrome.options import Options as options_class
+            from selenium.webdriver.chrome.service import Service as service_class
+
+            webdriver, Service, Options = webdriver_module, service_class, options_class
+
+
+def build_chrome_options(lean=False):
+    """Headless Chrome options used for every scraper session.
+
+    lean=True adds an eager page-load strategy (return at DOMContentLoaded),
+    disables images and resolves ad/analytics hosts to nothing, browser-wide.
+    """
+    load_webdriver()
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option("useAutomationExtension", False)
+    if lean:
+        chrome_options.page_load_strategy = "eager"
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_argument(
+            "--host-resolver-rules="
+            + ", ".join(f"MAP {host} ~NOTFOUND" for host in LEAN_BLOCKED_HOSTS)
+        )
+        chrome_options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
+    return chrome_options
+
+
+def apply_resource_blocking(driver, block_stylesheets=False):
+    """Blocks heavy resource URLs via DevTools for the driver's current tab.
+
+    Stylesheets are only blocked on request: sessions that click through the
+    search form need them for visibility checks, detail-only workers do not.
+    The patterns are remembered on the driver so new tabs can get the same
+    blocking through block_resources_in_tab().
+    """
+    patterns = list(LEAN_BLOCKED_URL_PATTERNS)
+    if block_stylesheets:
+        patterns.append("*.css")
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    driver.blocked_url_patterns = patterns
+
+
+def block_resources_in_tab(driver):
+    """Applies the driver's resource blocking to the tab it is switched to.
+
+    DevTools URL blocking is per tab, so every tab opened with window.open needs
+    it again. Returns False if the driver has no blocking configured.
+    """
+    patterns = getattr(driver, "blocked_url_patterns", None)
+    if not patterns:
+        return False
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except WebDriverException as e:
+        print(f"Warning: DevTools resource blocking failed for new tab: {e}", file=sys.stderr)
+        return False
+    return True
+
+
+def measure_page_weight(driver):
+    """Returns {"bytes", "requests", "seconds"} for the page currently shown, or None."""
+    try:
+        return driver.execute_script(PAGE_WEIGHT_SCRIPT)
+    except Exception:
+        return None
+
+
+def _read_cached_driver_path(now=None):
+    now = time.time() if now is None else now
+    try:
+        with open(DRIVER_PATH_CACHE, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    path = cached.get("path")
+    if not path or not os.access(path, os.X_OK):
+        return None
+    if now - cached.get("resolved_at", 0) > DRIVER_PATH_TTL:
+        return None
+    return path
+
+
+def _write_cached_driver_path(path):
+    try:
+        os.makedirs(os.path.dirname(DRIVER_PATH_CACHE), exist_ok=True)
+        tmp_path = f"{DRIVER_PATH_CACHE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"path": path, "resolved_at": time.time()}, f)
+        os.replace(tmp_path, DRIVER_PATH_CACHE)
+    except OSError as e:
+        print(f"Warning: Could not cache chromedriver path: {e}", file=sys.stderr)
+
+
+def resolve_driver_path(refresh=False):
+    """Returns the chromedriver path: $CHROMEDRIVER_PATH, then the on-disk cache,
+    then ChromeDriverManager().install() (whose result is cached). Memoized per process.
+    """
+    global _driver_path, _driver_path_source
+    with _driver_path_lock:
+        if _driver_path is not None and not refresh:
+            return _driver_path
+        env_path = os.environ.get("CHROMEDRIVER_PATH")
+        if env_path:
+            _driver_path, _driver_path_source = env_path, "env"
+            return _driver_path
+        cached = None if refresh else _read_cached_driver_path()
+        if cached:
+            _driver_path, _driver_path_source = cached, "disk cache"
+            return _driver_path
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        _driver_path = ChromeDriverManager().install()
+        _driver_path_source = "webdriver_manager"
+        _write_cached_driver_path(_driver_path)
+        return _driver_path
+
+
+def driver_path_source():
+    """Where the current chromedriver path came from ("env", "disk cache", ...), or None."""
+    return _driver_path_source
+
+
+def create_driver(lean=False, block_stylesheets=False):
+    """Starts a new headless Chrome session. Raises WebDriverException on failure."""
+    load_webdriver()
+    options = build_chrome_options(lean)
+    try:
+        driver = webdriver.Chrome(service=Service(resolve_driver_path()), options=options)
+    except SessionNotCreatedException:
+        # Usually Chrome auto-updated past the cached chromedriver: resolve again.
+        if driver_path_source() != "disk cache":
+            raise
+        print("Cached chromedriver rejected; resolving it again.", file=sys.stderr)
+        driver = webdriver.Chrome(
+            service=Service(resolve_driver_path(refresh=True)), options=options
+        )
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    if lean:
+        try:
+            apply_resource_blocking(driver, block_stylesheets=block_stylesheets)
+        except WebDriverException as e:
+            print(f"Warning: DevTools resource blocking unavailable: {e}", file=sys.stderr)
+    return driver
+
+
+def reset_windows(driver):
+    """Closes every tab except the first and switches back to it."""
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        try:
+            driver.switch_to.window(handle)
+            driver.close()
+        except (NoSuchWindowException, WebDriverException):
+            pass
+    if handles:
+        try:
+            driver.switch_to.window(handles[0])
+        except (NoSuchWindowException, WebDriverException):
+            pass
+
+
+def quit_driver(driver):
+    """Closes all windows and quits, logging (not raising) any errors."""
+    try:
+        print("Closing WebDriver.", file=sys.stderr)
+        reset_windows(driver)
+        driver.quit()
+    except WebDriverException as qe:
+        if "invalid session id" in str(qe) or "session deleted" in str(qe):
+            print(
+                "Warning: WebDriver session already invalid or closed during quit.",
+                file=sys.stderr,
+            )
+        else:
+            # Log warning to stderr, don't send to stdout as it might interfere with SSE
+            print(f"Warning: Error closing WebDriver: {str(qe)}", file=sys.stderr)
+    except Exception as e:
+        print(
+            f"Warning: Unexpected error closing WebDriver: {str(e)}",
+            file=sys.stderr,
+        )
+
+
+def is_session_dead_error(exc):
+    """True for WebDriver errors that mean the browser session itself is gone."""
+    message = str(exc).lower()
+    return isinstance(exc, WebDriverException) and (
+        "invalid session id" in message
+        or "session deleted" in message
+        or "unable to connect" in message
+    )
+
+
+def is_driver_alive(driver):
+    """Cheap round trip to the browser; False if the session is gone or hung."""
+    try:
+        return driver.execute_script("return 1;") == 1 and bool(driver.window_handles)
+    except Exception:
+        return False
+
+
+class PooledSession:
+    """A pooled WebDriver plus the bookkeeping needed to decide when to recycle it."""
+
+    __slots__ = ("session_no", "driver", "jobs_done", "created_at")
+
+    def __init__(self, session_no, driver):
+        self.session_no = session_no
+        self.driver = driver
+        self.jobs_done = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """Fixed-size pool of pre-warmed Chrome sessions.
+
+    Sessions are health-checked when checked out and recycled (quit and
+    replaced) once they have served ``max_jobs_per_session`` jobs (None means
+    no limit) or were returned unhealthy.
+    """
+
+    def __init__(self, size=2, max_jobs_per_session=20, lean=False, block_stylesheets=False):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.size = size
+        self.max_jobs_per_session = max_jobs_per_session
+        self.lean = lean
+        self.block_stylesheets = block_stylesheets
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._next_session_no = 0
+        self._closed = False
+
+    def _new_session(self):
+        with self._lock:
+            self._next_session_no += 1
+            session_no = self._next_session_no
+        start = time.time()
+        driver = create_driver(lean=self.lean, block_stylesheets=self.block_stylesheets)
+        print(
+            f"Pool session {session_no} started in {time.time() - start:.2f}s.",
+            file=sys.stderr,
+        )
+        return PooledSession(session_no, driver)
+
+    def start(self):
+        """Warms up every session in parallel; raises if none could be started."""
+        errors = []
+
+        def warm():
+            try:
+                self._idle.put(self._new_session())
+            except Exception as e:
+                errors.append(e)
+                print(f"Warning: Failed to warm pool session: {e}", file=sys.stderr)
+
+        threads = [threading.Thread(target=warm) for _ in range(self.size)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if self._idle.qsize() == 0:
+            raise WebDriverException(f"No pool sessions could be started: {errors}")
+        # Keep the pool at full strength even if some warm-ups failed.
+        for _ in range(self.size - self._idle.qsize()):
+            self._idle.put(None)
+        print(f"Driver pool ready with {self.size} session(s).", file=sys.stderr)
+
+    def acquire(self, timeout=None):
+        """Checks out a healthy session, replacing dead or placeholder slots."""
+        session = self._idle.get(timeout=timeout)
+        if session is not None and is_driver_alive(session.driver):
+            return session
+        if session is not None:
+            print(
+                f"Pool session {session.session_no} failed health check; replacing.",
+                file=sys.stderr,
+            )
+            quit_driver(session.driver)
+        try:
+            return self._new_session()
+        except Exception:
+            self._idle.put(None)  # Give the slot back so the pool does not shrink
+            raise
+
+    def release(self, session, healthy=True):
+        """Returns a session; recycles it if unhealthy or past its job budget."""
+        session.jobs_done += 1
+        if self._closed:
+            quit_driver(session.driver)
+            return
+        worn_out = (
+            self.max_jobs_per_session is not None
+            and session.jobs_done >= self.max_jobs_per_session
+        )
+        if not healthy or worn_out:
+            reason = "unhealthy" if not healthy else f"{session.jobs_done} jobs served"
+            print(
+                f"Recycling pool session {session.session_no} ({reason}).",
+                file=sys.stderr,
+            )
+            quit_driver(session.driver)
+            # Replace lazily on the next acquire so release stays fast.
+            self._idle.put(None)
+            return
+        try:
+            reset_windows(session.driver)
+        except Exception:
+            pass
+        self._idle.put(session)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if session is not None:
+                quit_driver(session.driver)
+
+
+class DriverSupervisor:
+    """Replaces a scraper's dead WebDriver session so the run can carry on.
+
+    The replacement Chrome is started on a background thread while the dead
+    session is being torn down. After a first failure a warm spare is kept,
+    so a further crash costs only the time to re-open the results page.
+    """
+
+    def __init__(self, lean=False, max_recoveries=3, keep_spare=True):
+        self.lean = lean
+        self.max_recoveries = max_recoveries
+        self.keep_spare = keep_spare
+        self.recoveries = 0
+        self._spare = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="driver-spare")
+
+    def can_recover(self):
+        return self.recoveries < self.max_recoveries
+
+    def replace(self, dead_driver):
+        """Returns a fresh driver for `dead_driver`. Raises WebDriverException if none can be started."""
+        if not self.can_recover():
+            raise WebDriverException(
+                f"Gave up after {self.recoveries} WebDriver recoveries."
+            )
+        self.recoveries += 1
+        future, self._spare = self._spare, None
+        if future is None:
+            future = self._executor.submit(create_driver, self.lean)
+        if dead_driver is not None:
+            quit_driver(dead_driver)
+        try:
+            driver = future.result()
+        except Exception:
+            # A spare that died while waiting (or failed to start): one direct try.
+            driver = create_driver(self.lean)
+        if self.keep_spare and self.can_recover():
+            self._spare = self._executor.submit(create_driver, self.lean)
+        return driver
+
+    def close(self):
+        spare, self._spare = self._spare, None
+        self._executor.shutdown(wait=True)
+        if spare is not None:
+            try:
+                quit_driver(spare.result())
+            except Exception:
+                pass
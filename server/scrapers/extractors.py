@@ -0,0 +1,385 @@
+# /server/scrapers/extractors.py
+# Field extraction that works on raw HTML, so the same rules can be applied
+# to Selenium's page_source and to pages fetched over plain HTTP: results-page
+# cards, detail-page fields, and whole listing records from the results
+# page's embedded JSON.
+
+from lxml import etree
+from lxml import html as lxml_html
+import json
+import re
+
+RIGHTMOVE_BASE_URL = "https://www.rightmove.co.uk"
+
+COORDINATES_RE = re.compile(
+    r'"latitude"\s*:\s*([0-9.]+)\s*,\s*"longitude"\s*:\s*(-?[0-9.]+)'
+)
+SQFT_RE = re.compile(r"([\d,]+)\s*sq\s*ft", re.IGNORECASE)
+SQM_RE = re.compile(r"([\d.,]+)\s*m²", re.IGNORECASE)
+
+# Results pages embed the search state either as Next.js data or, on older
+# templates, as a `window.jsonModel = {...}` assignment.
+NEXT_DATA_RE = re.compile(
+    r'<script[^>]+id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.DOTALL
+)
+JSON_MODEL_RE = re.compile(r"window\.jsonModel\s*=\s*")
+
+# Any element whose own text mentions a floor area (scripts/styles excluded,
+# since they are not visible text in the browser either).
+SQFT_XPATH = (
+    "//*[not(self::script or self::style)]"
+    "[contains(text(), 'sq ft') or contains(text(), 'sq. ft.') "
+    "or contains(text(), 'sqm') or contains(text(), 'm²')]"
+)
+PROPERTY_TYPE_CLASS = "_1hV1kqpVceE9m-QrX_hWDN"
+PROPERTY_TYPE_XPATH = (
+    f"//p[contains(concat(' ', normalize-space(@class), ' '), ' {PROPERTY_TYPE_CLASS} ')]"
+)
+
+KNOWN_PROPERTY_TYPES = [
+    "flat",
+    "apartment",
+    "house",
+    "bungalow",
+    "studio",
+    "maisonette",
+    "duplex",
+    "terraced",
+    "semi-detached",
+    "detached",
+    "end of terrace",
+    "cottage",
+    "townhouse",
+    "mews",
+    "mobile home",
+    "park home",
+    "land",
+    "farmhouse",
+    "barn conversion",
+    "retirement property",
+    "houseboat",
+    "block of apartments",
+    "penthouse",
+    "link-detached",
+]
+_KNOWN_TYPE_PATTERNS = [
+    (ktype, re.compile(r"\b" + re.escape(ktype) + r"\b")) for ktype in KNOWN_PROPERTY_TYPES
+]
+
+
+def extract_coordinates(page_source):
+    """Returns (latitude, longitude) as strings, or None if not present."""
+    match = COORDINATES_RE.search(page_source)
+    if match:
+        return match.group(1), match.group(2)
+    return None
+
+
+def format_square_footage(sqft_text):
+    """Normalises a floor-area snippet to the '<n> sq ft' display string."""
+    match_sqft = SQFT_RE.search(sqft_text)
+    match_sqm = SQM_RE.search(sqft_text)
+    if match_sqft:
+        return match_sqft.group(1).replace(",", "") + " sq ft"
+    if match_sqm:
+        sqm_val = float(match_sqm.group(1).replace(",", ""))
+        sqft_val = round(sqm_val * 10.764)
+        return f"{sqft_val} sq ft (from {match_sqm.group(1)} m²)"
+    return sqft_text
+
+
+def match_known_property_type(text):
+    """Returns the first known property type mentioned in a short text, capitalised."""
+    text = text.strip().lower()
+    if not 0 < len(text) < 100:
+        return None
+    for ktype, pattern in _KNOWN_TYPE_PATTERNS:
+        if pattern.search(text):
+            return ktype.capitalize()
+    return None
+
+
+def extract_detail_fields(page_source):
+    """Extracts coordinates, square footage and property type from raw detail-page HTML.
+
+    Only fields that were found are returned, keyed like the scraper's
+    property records ("latitude", "longitude", "square_footage", "property_type").
+    """
+    fields = {}
+    coords = extract_coordinates(page_source)
+    if coords:
+        fields["latitude"], fields["longitude"] = coords
+
+    tree = lxml_html.fromstring(page_source)
+
+    sqft_elements = tree.xpath(SQFT_XPATH)
+    if sqft_elements:
+        fields["square_footage"] = format_square_footage(
+            sqft_elements[0].text_content().strip()
+        )
+
+    type_elements = tree.xpath(PROPERTY_TYPE_XPATH)
+    if type_elements:
+        fields["property_type"] = type_elements[0].text_content().strip()
+    else:
+        for tag_name in ["h1", "h2", "div", "p"]:
+            for elem in tree.iter(tag_name):
+                found = match_known_property_type(elem.text_content())
+                if found:
+                    fields["property_type"] = found
+                    return fields
+    return fields
+
+
+def _load_search_state(page_source):
+    """Returns the decoded embedded search state of a results page, or None."""
+    match = NEXT_DATA_RE.search(page_source)
+    if match:
+        try:
+            return json.loads(match.group(1))
+        except ValueError:
+            pass
+    match = JSON_MODEL_RE.search(page_source)
+    if match:
+        try:
+            state, _ = json.JSONDecoder().raw_decode(page_source, match.end())
+            return state
+        except ValueError:
+            pass
+    return None
+
+
+def _find_property_list(node, depth=0):
+    """Finds the list of listing objects ({"id", "location", ...}) in the state tree."""
+    if depth > 12:
+        return None
+    if isinstance(node, dict):
+        properties = node.get("properties")
+        if (
+            isinstance(properties, list)
+            and properties
+            and all(isinstance(p, dict) and "id" in p for p in properties)
+            and any("location" in p for p in properties)
+        ):
+            return properties
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    else:
+        return None
+    for child in children:
+        if isinstance(child, (dict, list)):
+            found = _find_property_list(child, depth + 1)
+            if found is not None:
+                return found
+    return None
+
+
+def _display_or_na(value):
+    if value is None or value == "":
+        return "N/A"
+    return str(value).strip()
+
+
+def property_from_json_model(listing):
+    """Maps one embedded listing object to the scraper's property record format."""
+    location = listing.get("location") or {}
+    price = listing.get("price") or {}
+    display_prices = price.get("displayPrices") or []
+    property_url = listing.get("propertyUrl") or ""
+    display_size = (listing.get("displaySize") or "").strip()
+
+    return {
+        "id": f"rm_{listing['id']}",
+        "price": _display_or_na(
+            display_prices[0].get("displayPrice") if display_prices else None
+        ),
+        "address": _display_or_na(listing.get("displayAddress")),
+        "description": _display_or_na(listing.get("summary")),
+        "bedrooms": _display_or_na(listing.get("bedrooms")),
+        "bathrooms": _display_or_na(listing.get("bathrooms")),
+        "square_footage": format_square_footage(display_size) if display_size else "N/A",
+        "property_type": _display_or_na(listing.get("propertySubType")),
+        "latitude": _display_or_na(location.get("latitude")),
+        "longitude": _display_or_na(location.get("longitude")),
+        "detail_url": (
+            RIGHTMOVE_BASE_URL + property_url
+            if property_url.startswith("/properties/")
+            else "N/A"
+        ),
+        "source": "Rightmove",
+    }
+
+
+def extract_json_model_cards(page_source):
+    """Builds property records from the results page's embedded JSON model.
+
+    Returns None when the page has no usable model, so callers can fall
+    back to parsing the rendered cards.
+    """
+    state = _load_search_state(page_source)
+    if state is None:
+        return None
+    listings = _find_property_list(state)
+    if listings is None:
+        return None
+    records = []
+    for listing in listings:
+        try:
+            records.append(property_from_json_model(listing))
+        except (KeyError, TypeError, AttributeError, IndexError):
+            continue
+    return records
+
+
+# --- Results-page cards ---
+def _class_test(class_name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+PRICE_CLASS = "PropertyPrice_price__VL65t"
+ADDRESS_CLASS = "PropertyAddress_address__LYRPq"
+SUMMARY_CLASS = "PropertyCardSummary_summary__oIv57"
+BEDROOMS_CLASS = "PropertyInformation_bedroomsCount___2b5R"
+
+# Compiled once; the per-card ones are evaluated relative to the card element.
+CARD_LINKS_XPATH = etree.XPath(f"//a[{_class_test('propertyCard-link')}]")
+CARD_CONTAINER_XPATH = etree.XPath(f"ancestor::*[.//div[{_class_test(PRICE_CLASS)}]][1]")
+CARD_PRICE_XPATH = etree.XPath(f".//div[{_class_test(PRICE_CLASS)}]")
+CARD_ADDRESS_XPATH = etree.XPath(f".//address[{_class_test(ADDRESS_CLASS)}]")
+CARD_SUMMARY_XPATH = etree.XPath(f".//p[{_class_test(SUMMARY_CLASS)}]")
+CARD_BEDROOMS_XPATH = etree.XPath(f".//span[{_class_test(BEDROOMS_CLASS)}]")
+CARD_ARIA_SPANS_XPATH = etree.XPath(".//span[@aria-label]")
+
+PROPERTY_ID_RE = re.compile(r"/properties/(\d+)")
+BATHROOM_RE = re.compile(r"(\d+)\s+bathroom", re.IGNORECASE)
+DIGITS_RE = re.compile(r"\d+")
+
+
+def blank_property_record(index):
+    """A property record with every field unset, as emitted for a card."""
+    return {
+        "id": f"rm_temp_{index}",
+        "price": "N/A",
+        "address": "N/A",
+        "description": "N/A",
+        "bedrooms": "N/A",
+        "bathrooms": "N/A",
+        "square_footage": "N/A",
+        "property_type": "N/A",
+        "latitude": "N/A",
+        "longitude": "N/A",
+        "detail_url": "N/A",
+        "source": "Rightmove",
+    }
+
+
+def _bathrooms_from_aria_label(aria_label):
+    aria_label = aria_label.lower()
+    words = aria_label.split()
+    if "bathroom" in aria_label or (
+        "in property" in aria_label and words and words[0].isdigit()
+    ):
+        match_bath = BATHROOM_RE.search(aria_label)
+        if match_bath:
+            return match_bath.group(1)
+        if words and words[0].isdigit():
+            return words[0]
+    return None
+
+
+def _apply_card_link(property_data, href):
+    if href and href.startswith("/properties/"):
+        property_data["detail_url"] = RIGHTMOVE_BASE_URL + href
+        match_id = PROPERTY_ID_RE.search(href)
+        if match_id:
+            property_data["id"] = f"rm_{match_id.group(1)}"
+
+
+def _joined_text(element):
+    # Same result as BeautifulSoup's get_text(strip=True).
+    return "".join(piece.strip() for piece in element.itertext())
+
+
+def extract_list_cards(page_source):
+    """Single pass over the results page, one record per property card.
+
+    Each ``a.propertyCard-link`` is resolved to its card container and every
+    field is read from inside that container, so a card with no summary or
+    bathroom count cannot shift fields onto its neighbours. Cards with an
+    unusable link keep detail_url "N/A".
+    """
+    tree = lxml_html.fromstring(page_source)
+    records = []
+    seen_containers = set()
+    for link in CARD_LINKS_XPATH(tree):
+        containers = CARD_CONTAINER_XPATH(link)
+        card = containers[0] if containers else link
+        # Image and title links of one card share a container.
+        if card in seen_containers:
+            continue
+        seen_containers.add(card)
+
+        property_data = blank_property_record(len(records))
+        price = CARD_PRICE_XPATH(card)
+        if price:
+            property_data["price"] = _joined_text(price[0])
+        address = CARD_ADDRESS_XPATH(card)
+        if address:
+            property_data["address"] = _joined_text(address[0])
+        summary = CARD_SUMMARY_XPATH(card)
+        if summary:
+            property_data["description"] = _joined_text(summary[0])
+        bedrooms = CARD_BEDROOMS_XPATH(card)
+        if bedrooms:
+            match_bed = DIGITS_RE.search(_joined_text(bedrooms[0]))
+            if match_bed:
+                property_data["bedrooms"] = match_bed.group(0)
+        for span in CARD_ARIA_SPANS_XPATH(card):
+            bathrooms = _bathrooms_from_aria_label(span.get("aria-label", ""))
+            if bathrooms:
+                property_data["bathrooms"] = bathrooms
+                break
+
+        _apply_card_link(property_data, link.get("href"))
+        records.append(property_data)
+    return records
+
+
+def extract_list_cards_bs4(page_source):
+    """The original index-aligned BeautifulSoup parser, kept for comparison.
+
+    Runs five full-tree scans and zips them by position, so a card missing
+    one element shifts that field for every later card.
+    """
+    from bs4 import BeautifulSoup  # Only this legacy path needs bs4.
+
+    soup = BeautifulSoup(page_source, "lxml")
+
+    prices = soup.find_all("div", class_=PRICE_CLASS)
+    addresses = soup.find_all("address", class_=ADDRESS_CLASS)
+    descriptions = soup.find_all("p", class_=SUMMARY_CLASS)
+    bedrooms = soup.find_all("span", class_=BEDROOMS_CLASS)
+    all_spans = soup.find_all("span", {"aria-label": True})
+    links = soup.select("a.propertyCard-link")
+
+    records = []
+    for i in range(len(links)):
+        property_data = blank_property_record(i)
+        if i < len(prices):
+            property_data["price"] = prices[i].get_text(strip=True)
+        if i < len(addresses):
+            property_data["address"] = addresses[i].get_text(strip=True)
+        if i < len(descriptions):
+            property_data["description"] = descriptions[i].get_text(strip=True)
+        if i < len(bedrooms):
+            match_bed = DIGITS_RE.search(bedrooms[i].get_text(strip=True))
+            if match_bed:
+                property_data["bedrooms"] = match_bed.group(0)
+        if i < len(all_spans):  # Bathroom logic (same potential unreliability)
+            bathrooms = _bathrooms_from_aria_label(all_spans[i].get("aria-label", ""))
+            if bathrooms:
+                property_data["bathrooms"] = bathrooms
+        _apply_card_link(property_data, links[i].get("href"))
+        records.append(property_data)
+    return records
@@ -0,0 +1,328 @@
+# /server/scrapers/listing_cache.py
+# On-disk caches for the scraper: detail-page fields keyed by Rightmove
+# property id ("rm_<id>"), so repeat runs can skip detail fetches entirely,
+# and search term -> locationIdentifier, so they can skip the search form.
+# The same file also keeps running page-weight averages for lean browsing
+# and the per-search-term listing snapshots behind incremental runs.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "listings.sqlite3"
+)
+
+DAY = 24 * 60 * 60
+# Seconds each detail field stays fresh. Coordinates and property type are
+# effectively fixed for a listing; floor area occasionally gets corrected.
+DEFAULT_FIELD_TTLS = {
+    "latitude": 30 * DAY,
+    "longitude": 30 * DAY,
+    "property_type": 30 * DAY,
+    "square_footage": 7 * DAY,
+}
+
+
+class ListingCache:
+    """SQLite-backed cache of detail fields with a TTL per field.
+
+    A lookup is a hit only when every field in ``field_ttls`` is present and
+    fresh; otherwise the caller fetches the detail page and stores the result.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, field_ttls=None):
+        self.path = path
+        self.field_ttls = dict(field_ttls or DEFAULT_FIELD_TTLS)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS listing_details (
+                property_id TEXT NOT NULL,
+                field TEXT NOT NULL,
+                value TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (property_id, field)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, property_id, now=None):
+        """Returns {field: value} if all fields are fresh, else None. Counts hit/miss."""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT field, value, fetched_at FROM listing_details WHERE property_id = ?",
+                (property_id,),
+            ).fetchall()
+            fresh = {
+                field: value
+                for field, value, fetched_at in rows
+                if field in self.field_ttls and now - fetched_at < self.field_ttls[field]
+            }
+            if len(fresh) == len(self.field_ttls):
+                self.hits += 1
+                return fresh
+            self.misses += 1
+            return None
+
+    def store(self, property_data, now=None):
+        """Saves the detail fields of a freshly fetched property record.
+
+        Coordinates are only stored when found, so a page that failed to
+        yield them is fetched again next time.
+        """
+        property_id = property_data.get("id", "")
+        if not property_id.startswith("rm_") or property_id.startswith("rm_temp_"):
+            return
+        now = time.time() if now is None else now
+        rows = []
+        for field in self.field_ttls:
+            value = property_data.get(field)
+            if value is None:
+                continue
+            if field in ("latitude", "longitude") and value == "N/A":
+                continue
+            rows.append((property_id, field, str(value), now))
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO listing_details (property_id, field, value, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"Detail cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class LocationCache:
+    """Maps a search term (e.g. "TS1") to Rightmove's locationIdentifier.
+
+    Lives in the same SQLite file as ListingCache. With a cached identifier the
+    scraper can open the results URL directly instead of driving the homepage
+    search form.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=90 * DAY):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_locations (
+                search_term TEXT PRIMARY KEY,
+                location_identifier TEXT NOT NULL,
+                resolved_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _key(search_term):
+        return search_term.strip().upper()
+
+    def get(self, search_term, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT location_identifier, resolved_at FROM search_locations WHERE search_term = ?",
+                (self._key(search_term),),
+            ).fetchone()
+        if row and now - row[1] < self.ttl:
+            return row[0]
+        return None
+
+    def store(self, search_term, location_identifier, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_locations (search_term, location_identifier, resolved_at) "
+                "VALUES (?, ?, ?)",
+                (self._key(search_term), location_identifier, now),
+            )
+            self._conn.commit()
+
+    def forget(self, search_term):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM search_locations WHERE search_term = ?",
+                (self._key(search_term),),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PageWeightLog:
+    """Running per-page averages of bytes and DOM-ready time, by page kind and mode.
+
+    Normal-mode pages form the baseline that lean-mode pages are compared
+    against, so "saved" figures stay meaningful across runs.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS page_weights (
+                kind TEXT NOT NULL,
+                lean INTEGER NOT NULL,
+                pages INTEGER NOT NULL,
+                total_bytes REAL NOT NULL,
+                total_seconds REAL NOT NULL,
+                PRIMARY KEY (kind, lean)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def record(self, kind, lean, page_bytes, seconds):
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO page_weights (kind, lean, pages, total_bytes, total_seconds)
+                VALUES (?, ?, 1, ?, ?)
+                ON CONFLICT (kind, lean) DO UPDATE SET
+                    pages = pages + 1,
+                    total_bytes = total_bytes + excluded.total_bytes,
+                    total_seconds = total_seconds + excluded.total_seconds
+                """,
+                (kind, int(lean), page_bytes, seconds),
+            )
+            self._conn.commit()
+
+    def average(self, kind, lean):
+        """Returns (avg_bytes, avg_seconds, pages) or None if nothing was recorded."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT pages, total_bytes, total_seconds FROM page_weights WHERE kind = ? AND lean = ?",
+                (kind, int(lean)),
+            ).fetchone()
+        if not row or not row[0]:
+            return None
+        pages, total_bytes, total_seconds = row
+        return total_bytes / pages, total_seconds / pages, pages
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SnapshotStore:
+    """Last seen content hash and price of every listing, per search term.
+
+    Backs incremental runs: a listing whose hash is unchanged is neither
+    fetched nor emitted again, and listings missing from a complete crawl
+    are reported as removed.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS listing_snapshots (
+                search_term TEXT NOT NULL,
+                property_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                price TEXT,
+                seen_at REAL NOT NULL,
+                PRIMARY KEY (search_term, property_id)
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _key(search_term):
+        return search_term.strip().upper()
+
+    def load(self, search_term):
+        """Returns {property_id: (content_hash, price)} for a search term."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT property_id, content_hash, price FROM listing_snapshots WHERE search_term = ?",
+                (self._key(search_term),),
+            ).fetchall()
+        return {property_id: (content_hash, price) for property_id, content_hash, price in rows}
+
+    def store(self, search_term, property_id, content_hash, price, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO listing_snapshots "
+                "(search_term, property_id, content_hash, price, seen_at) VALUES (?, ?, ?, ?, ?)",
+                (self._key(search_term), property_id, content_hash, price, now),
+            )
+            self._conn.commit()
+
+    def touch(self, search_term, property_ids, now=None):
+        """Marks unchanged listings as seen without rewriting their hashes."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE listing_snapshots SET seen_at = ? WHERE search_term = ? AND property_id = ?",
+                [(now, self._key(search_term), property_id) for property_id in property_ids],
+            )
+            self._conn.commit()
+
+    def remove(self, search_term, property_ids):
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM listing_snapshots WHERE search_term = ? AND property_id = ?",
+                [(self._key(search_term), property_id) for property_id in property_ids],
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Card-level fields, present whichever way the results page was read, so a
+# switch between JSON-model and DOM extraction does not look like a change.
+SNAPSHOT_FIELDS = ("price", "address", "description", "bedrooms", "bathrooms")
+
+
+def listing_content_hash(property_data):
+    payload = json.dumps([property_data.get(field) for field in SNAPSHOT_FIELDS])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,136 @@
+# /server/scrapers/metrics.py
+# Per-phase timings for scraper runs: driver startup, homepage, cookies,
+# autocomplete, results load and the three steps of a detail fetch. Each
+# observation feeds a histogram and, optionally, a structured metric event;
+# the histograms can be dumped in Prometheus text exposition format.
+
+from collections import deque
+from contextlib import contextmanager
+import sys
+import threading
+import time
+
+# Upper bounds (seconds) of the histogram buckets; +Inf is implicit.
+PHASE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+METRIC_PREFIX = "rightmove_scraper"
+
+
+class PhaseStats:
+    __slots__ = ("count", "total", "min", "max", "errors", "bucket_counts")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.errors = 0
+        self.bucket_counts = [0] * len(PHASE_BUCKETS)
+
+    def add(self, seconds, ok=True):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        if not ok:
+            self.errors += 1
+        for index, bound in enumerate(PHASE_BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[index] += 1
+                break
+
+
+class RunMetrics:
+    """Collects phase timings of one scraper run. Thread-safe.
+
+    Worker threads (HTTP fetches, pooled drivers) only record; metric events
+    are queued and handed out by ``drain_events()`` so the thread that owns
+    the output stream can write them in order with the listings.
+    """
+
+    def __init__(self, emit_events=True):
+        self.emit_events = emit_events
+        self.phases = {}
+        self._events = deque()
+        self._lock = threading.Lock()
+        self.started_at = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name, **fields):
+        """Times the enclosed block as phase `name`; extra fields go into its event."""
+        start = time.perf_counter()
+        ok = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, ok=ok, **fields)
+
+    def observe(self, name, seconds, ok=True, **fields):
+        with self._lock:
+            stats = self.phases.get(name)
+            if stats is None:
+                stats = self.phases[name] = PhaseStats()
+            stats.add(seconds, ok)
+            if self.emit_events:
+                event = {"metric": name, "seconds": round(seconds, 4)}
+                if not ok:
+                    event["ok"] = False
+                event.update(fields)
+                self._events.append(event)
+
+    def drain_events(self):
+        """Returns and forgets the metric events queued so far."""
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+    def summary(self):
+        with self._lock:
+            lines = [
+                f"  {name:<22} n={stats.count:<5} total={stats.total:8.2f}s "
+                f"avg={stats.total / stats.count:6.3f}s max={stats.max:6.3f}s"
+                + (f" errors={stats.errors}" if stats.errors else "")
+                for name, stats in sorted(
+                    self.phases.items(), key=lambda item: -item[1].total
+                )
+            ]
+        return "Phase timings:\n" + ("\n".join(lines) if lines else "  (none)")
+
+    def prometheus_text(self, labels=None):
+        """Histograms of every phase in Prometheus text exposition format."""
+        base_labels = "".join(f',{key}="{value}"' for key, value in (labels or {}).items())
+        name = f"{METRIC_PREFIX}_phase_seconds"
+        out = [
+            f"# HELP {name} Duration of scraper phases.",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            phases = sorted(self.phases.items())
+            for phase, stats in phases:
+                cumulative = 0
+                for bound, count in zip(PHASE_BUCKETS, stats.bucket_counts):
+                    cumulative += count
+                    out.append(
+                        f'{name}_bucket{{phase="{phase}"{base_labels},le="{bound:g}"}} {cumulative}'
+                    )
+                out.append(f'{name}_bucket{{phase="{phase}"{base_labels},le="+Inf"}} {stats.count}')
+                out.append(f'{name}_sum{{phase="{phase}"{base_labels}}} {stats.total:.6f}')
+                out.append(f'{name}_count{{phase="{phase}"{base_labels}}} {stats.count}')
+            errors = f"{METRIC_PREFIX}_phase_errors_total"
+            out.append(f"# HELP {errors} Phases that ended in an exception.")
+            out.append(f"# TYPE {errors} counter")
+            for phase, stats in phases:
+                out.append(f'{errors}{{phase="{phase}"{base_labels}}} {stats.errors}')
+        return "\n".join(out) + "\n"
+
+    def write_prometheus(self, path, labels=None):
+        """Writes prometheus_text() to `path` ("-" for stderr)."""
+        text = self.prometheus_text(labels)
+        if path == "-":
+            sys.stderr.write(text)
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
@@ -0,0 +1,135 @@
+# /server/scrapers/rate_limiter.py
+# Central request pacing for the scraper: a token bucket with jitter whose
+# rate adapts to how quickly (and how successfully) Rightmove responds.
+
+import random
+import sys
+import threading
+import time
+
+# Throughput/politeness trade-off in one place. Rates are page requests per
+# second; the bucket starts at `rate`, moves within [min_rate, max_rate],
+# and `burst` requests may go out back to back after an idle spell.
+PACING_POLICIES = {
+    "fast": {
+        "rate": 4.0,
+        "min_rate": 0.5,
+        "max_rate": 10.0,
+        "burst": 4,
+        "jitter": 0.1,
+        "slow_response": 8.0,
+    },
+    "balanced": {
+        "rate": 1.5,
+        "min_rate": 0.25,
+        "max_rate": 4.0,
+        "burst": 2,
+        "jitter": 0.3,
+        "slow_response": 6.0,
+    },
+    "polite": {
+        "rate": 0.5,
+        "min_rate": 0.1,
+        "max_rate": 1.0,
+        "burst": 1,
+        "jitter": 0.5,
+        "slow_response": 4.0,
+    },
+}
+DEFAULT_POLICY = "balanced"
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose refill rate follows additive-increase/multiplicative-decrease.
+
+    Call ``acquire()`` before a page request and ``record()`` with its
+    duration afterwards. Fast, successful responses nudge the rate up; errors
+    or slow responses halve it. Waiting only happens once the bucket is
+    empty, so there is no idle time while the site keeps up. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        rate=1.5,
+        min_rate=0.25,
+        max_rate=4.0,
+        burst=2,
+        jitter=0.3,
+        slow_response=6.0,
+        increase_step=0.1,
+    ):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.jitter = jitter
+        self.slow_response = slow_response
+        self.increase_step = increase_step
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.total_wait = 0.0
+        self._first_request_at = None
+        self._last_request_at = None
+
+    @classmethod
+    def from_policy(cls, name=DEFAULT_POLICY):
+        if name not in PACING_POLICIES:
+            raise ValueError(
+                f"Unknown pacing policy '{name}'. Choose from {sorted(PACING_POLICIES)}."
+            )
+        return cls(**PACING_POLICIES[name])
+
+    def acquire(self):
+        """Blocks until the next request may go out; returns the time waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._last_refill) * self.rate
+            )
+            self._last_refill = now
+            # Take a token even if that leaves the bucket in debt; the debt is
+            # this caller's reservation and decides how long it has to wait.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            if wait > 0:
+                wait += random.uniform(0, self.jitter / self.rate)
+            self.requests += 1
+            self.total_wait += wait
+            start = now + wait
+            if self._first_request_at is None:
+                self._first_request_at = start
+            self._last_request_at = max(self._last_request_at or start, start)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record(self, elapsed, error=False):
+        """Feeds back one response: its duration in seconds and whether it failed."""
+        with self._lock:
+            if error or elapsed > self.slow_response:
+                if error:
+                    self.errors += 1
+                self.rate = max(self.min_rate, self.rate * 0.5)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def effective_rate(self):
+        """Requests per second actually sent so far."""
+        with self._lock:
+            if self.requests < 2:
+                return 0.0
+            span = self._last_request_at - self._first_request_at
+            return (self.requests - 1) / span if span > 0 else 0.0
+
+    def summary(self):
+        return (
+            f"Pacing: {self.requests} requests at {self.effective_rate():.2f} req/s effective "
+            f"(target now {self.rate:.2f} req/s, {self.errors} error signals, "
+            f"{self.total_wait:.1f}s spent waiting)"
+        )
+
+    def log_summary(self):
+        print(self.summary(), file=sys.stderr)
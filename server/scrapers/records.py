@@ -0,0 +1,149 @@
+# /server/scrapers/records.py
+# Typed listing records. The scraper's legacy records carry display strings
+# ("£350,000", "850 sq ft (from 79 m²)", "N/A"); ListingRecord parses them once
+# into numbers and nulls so consumers do not have to.
+
+import re
+
+SQFT_PER_SQM = 10.764
+
+_NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+_SQFT_RE = re.compile(r"([\d,]+(?:\.\d+)?)\s*sq\.?\s*ft", re.IGNORECASE)
+_SQM_RE = re.compile(r"([\d,]+(?:\.\d+)?)\s*(?:m²|sq\.?\s*m|sqm)", re.IGNORECASE)
+
+# Legacy fields whose display string is worth keeping next to the parsed value.
+RAW_FIELDS = ("price", "bedrooms", "bathrooms", "square_footage", "latitude", "longitude")
+# Legacy fields that map onto ListingRecord slots; anything else (postcodes,
+# delta, fetch_error, ...) is passed through unchanged.
+_MAPPED_FIELDS = set(RAW_FIELDS) | {
+    "id",
+    "address",
+    "description",
+    "property_type",
+    "detail_url",
+    "source",
+}
+
+
+def _missing(value):
+    return value is None or (isinstance(value, str) and value.strip() in ("", "N/A"))
+
+
+def parse_price(value):
+    """'£350,000' -> 350000; 'Offers over £1,250,000' -> 1250000; 'POA'/'N/A' -> None."""
+    if _missing(value):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = _NUMBER_RE.search(value)
+    if not match:
+        return None
+    return int(float(match.group(0).replace(",", "")))
+
+
+def parse_count(value):
+    """'3' -> 3, 'N/A' -> None. Used for bedrooms and bathrooms."""
+    if _missing(value):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = _NUMBER_RE.search(value)
+    return int(float(match.group(0).replace(",", ""))) if match else None
+
+
+def parse_coordinate(value):
+    if _missing(value):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_floor_area(value):
+    """Returns (sqm, sqft) from a floor-area string; either may be derived from the other."""
+    if _missing(value):
+        return None, None
+    sqft_match = _SQFT_RE.search(value)
+    sqm_match = _SQM_RE.search(value)
+    sqft = float(sqft_match.group(1).replace(",", "")) if sqft_match else None
+    sqm = float(sqm_match.group(1).replace(",", "")) if sqm_match else None
+    if sqft is None and sqm is None:
+        return None, None
+    if sqm is None:
+        sqm = round(sqft / SQFT_PER_SQM, 1)
+    if sqft is None:
+        sqft = round(sqm * SQFT_PER_SQM)
+    return sqm, int(round(sqft))
+
+
+def _text_or_none(value):
+    return None if _missing(value) else value
+
+
+class ListingRecord:
+    """One listing with parsed numeric fields; None wherever a value is missing."""
+
+    __slots__ = (
+        "id",
+        "price",
+        "bedrooms",
+        "bathrooms",
+        "floor_area_sqm",
+        "floor_area_sqft",
+        "latitude",
+        "longitude",
+        "address",
+        "description",
+        "property_type",
+        "detail_url",
+        "source",
+        "raw",
+        "extras",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_legacy(cls, property_data, keep_raw=False):
+        """Builds a record from a legacy display-string dict (as emitted by the scraper)."""
+        sqm, sqft = parse_floor_area(property_data.get("square_footage"))
+        record = cls(
+            id=property_data.get("id"),
+            price=parse_price(property_data.get("price")),
+            bedrooms=parse_count(property_data.get("bedrooms")),
+            bathrooms=parse_count(property_data.get("bathrooms")),
+            floor_area_sqm=sqm,
+            floor_area_sqft=sqft,
+            latitude=parse_coordinate(property_data.get("latitude")),
+            longitude=parse_coordinate(property_data.get("longitude")),
+            address=_text_or_none(property_data.get("address")),
+            description=_text_or_none(property_data.get("description")),
+            property_type=_text_or_none(property_data.get("property_type")),
+            detail_url=_text_or_none(property_data.get("detail_url")),
+            source=property_data.get("source"),
+        )
+        if keep_raw:
+            record.raw = {
+                field: property_data[field]
+                for field in RAW_FIELDS
+                if not _missing(property_data.get(field))
+            }
+        extras = {
+            key: value for key, value in property_data.items() if key not in _MAPPED_FIELDS
+        }
+        if "previous_price" in extras:
+            extras["previous_price"] = parse_price(extras["previous_price"])
+        record.extras = extras or None
+        return record
+
+    def to_dict(self):
+        """JSON-ready dict: typed fields (nulls included), then raw strings and extras if any."""
+        data = {name: getattr(self, name) for name in self.__slots__[:-2]}
+        if self.raw:
+            data["raw"] = self.raw
+        if self.extras:
+            data.update(self.extras)
+        return data
@@ -0,0 +1,205 @@
+# /server/scrapers/run_checkpoint.py
+# Progress of one scraper run on disk, so a run killed by the Node side or by
+# a fatal WebDriverException can be resumed with --resume <run-id> instead of
+# starting over: which results page each search term reached, which listings
+# were already emitted, the last output sequence number and the crawl options
+# the run was started with. Emitted ids are saved in batches (every
+# SAVE_EVERY_RECORDS records or SAVE_INTERVAL seconds, and at every page
+# boundary), so a resume may repeat the last few records of a killed run.
+# Finished runs delete their checkpoint; unfinished ones are pruned after
+# CHECKPOINT_MAX_AGE.
+
+import json
+import os
+import threading
+import time
+import uuid
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "runs"
+)
+CHECKPOINT_MAX_AGE = 7 * 24 * 3600  # seconds
+SAVE_EVERY_RECORDS = 25
+SAVE_INTERVAL = 5.0  # seconds
+# Options that decide what a run crawls and emits (CLI dest / daemon job key
+# names). They are saved with the checkpoint and restored on resume, so the
+# resumed run crawls the same pages in the same way.
+RESUME_OPTIONS = (
+    "max_pages",
+    "max_results",
+    "extraction",
+    "incremental",
+    "record_format",
+    "keep_raw",
+    "tiles",
+)
+
+
+def new_run_id():
+    """Sortable, collision-safe id, e.g. '20240518-142233-3f9c1a'."""
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+
+def prune_checkpoints(directory=DEFAULT_CHECKPOINT_DIR, max_age=CHECKPOINT_MAX_AGE, now=None):
+    """Deletes checkpoints (and stray temp files) not written for `max_age` seconds.
+    Returns how many were removed."""
+    now = time.time() if now is None else now
+    removed = 0
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return 0
+    for name in names:
+        if not (name.endswith(".json") or name.endswith(".tmp")):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            if now - os.path.getmtime(path) > max_age:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+class RunCheckpoint:
+    """Checkpoint of one run, rewritten atomically in batches.
+
+    ``target`` is what was asked for ({"postcode": ...} or {"postcodes": [...]})
+    and ``options`` the RESUME_OPTIONS it was crawled with, so a resume does not
+    need either repeated. Per search term it keeps the page being worked on and
+    the ids already emitted; ``seq`` numbers every output line of the run and
+    carries on across resumes. ``mark_emitted`` only saves every ``save_every``
+    records or ``save_interval`` seconds; page and term changes save at once and
+    ``flush`` writes whatever is pending. Completing the run deletes the file.
+    """
+
+    def __init__(
+        self,
+        run_id=None,
+        directory=DEFAULT_CHECKPOINT_DIR,
+        target=None,
+        options=None,
+        save_every=SAVE_EVERY_RECORDS,
+        save_interval=SAVE_INTERVAL,
+    ):
+        self.run_id = run_id or new_run_id()
+        self.directory = directory
+        self.target = target or {}
+        self.options = {
+            key: value for key, value in (options or {}).items() if key in RESUME_OPTIONS
+        }
+        self.seq = 0
+        self.terms = {}  # search term -> {"page": int, "emitted": [ids], "done": bool}
+        self.completed = False
+        self.resumed = False
+        self.save_every = save_every
+        self.save_interval = save_interval
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f"{self.run_id}.json")
+
+    @classmethod
+    def load(cls, run_id, directory=DEFAULT_CHECKPOINT_DIR):
+        """Reads a saved checkpoint. Raises FileNotFoundError / ValueError."""
+        checkpoint = cls(run_id, directory)
+        with open(checkpoint.path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("run_id") != run_id:
+            raise ValueError(f"Checkpoint file {checkpoint.path} belongs to another run.")
+        checkpoint.target = state.get("target", {})
+        checkpoint.options = state.get("options", {})
+        checkpoint.seq = state.get("seq", 0)
+        checkpoint.terms = state.get("terms", {})
+        checkpoint.completed = state.get("completed", False)
+        checkpoint.resumed = True
+        return checkpoint
+
+    def next_seq(self):
+        with self._lock:
+            self.seq += 1
+            return self.seq
+
+    def _term(self, search_term):
+        return self.terms.setdefault(search_term, {"page": 1, "emitted": [], "done": False})
+
+    def emitted_ids(self, search_term):
+        with self._lock:
+            return set(self.terms.get(search_term, {}).get("emitted", ()))
+
+    def resume_page(self, search_term):
+        with self._lock:
+            return self.terms.get(search_term, {}).get("page", 1)
+
+    def term_done(self, search_term):
+        with self._lock:
+            return self.terms.get(search_term, {}).get("done", False)
+
+    def mark_page(self, search_term, page):
+        with self._lock:
+            self._term(search_term)["page"] = page
+            self._save_locked()
+
+    def mark_emitted(self, search_term, property_id, page):
+        with self._lock:
+            term = self._term(search_term)
+            term["page"] = page
+            term["emitted"].append(property_id)
+            self._unsaved += 1
+            if (
+                self._unsaved >= self.save_every
+                or time.monotonic() - self._saved_at >= self.save_interval
+            ):
+                self._save_locked()
+
+    def mark_term_done(self, search_term):
+        with self._lock:
+            self._term(search_term)["done"] = True
+            self._save_locked()
+
+    def mark_completed(self):
+        """Marks the run finished and deletes its checkpoint file."""
+        with self._lock:
+            self.completed = True
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def save(self):
+        with self._lock:
+            self._save_locked()
+
+    def flush(self):
+        """Saves records emitted since the last save, if any."""
+        with self._lock:
+            if self._unsaved:
+                self._save_locked()
+
+    def _save_locked(self):
+        if self.completed:
+            return  # Finished runs keep no checkpoint.
+        # Write to a temp file and rename over the old one so a kill mid-write
+        # never leaves a truncated checkpoint behind.
+        os.makedirs(self.directory, exist_ok=True)
+        state = {
+            "run_id": self.run_id,
+            "target": self.target,
+            "options": self.options,
+            "seq": self.seq,
+            "terms": self.terms,
+            "completed": self.completed,
+            "updated_at": time.time(),
+        }
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
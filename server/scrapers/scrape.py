@@ -742,13 +742,11 @@
 # /server/scrapers/scrape.py
 # MODIFIED FOR SSE STREAMING OUTPUT
 
-from selenium import webdriver
+import time
+
+_startup_began = time.perf_counter()
+
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import (
     TimeoutException,
     NoSuchElementException,
@@ -756,66 +754,337 @@ from selenium.common.exceptions import (
     InvalidSelectorException,
     NoSuchWindowException,
     ElementClickInterceptedException,
+    ElementNotInteractableException,
+)
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from listing_cache import (
+    DEFAULT_CACHE_PATH,
+    ListingCache,
+    LocationCache,
+    PageWeightLog,
+    SnapshotStore,
+    listing_content_hash,
+)
+from rate_limiter import DEFAULT_POLICY, PACING_POLICIES, AdaptiveRateLimiter
+from run_checkpoint import (
+    DEFAULT_CHECKPOINT_DIR,
+    RESUME_OPTIONS,
+    RunCheckpoint,
+    prune_checkpoints,
+)
+from metrics import RunMetrics
+from records import ListingRecord, parse_price
+from spatial_index import SpatialIndex
+from driver_pool import (
+    DriverPool,
+    DriverSupervisor,
+    create_driver,
+    block_resources_in_tab,
+    driver_path_source,
+    is_driver_alive,
+    is_session_dead_error,
+    load_webdriver,
+    measure_page_weight,
+    quit_driver,
+    reset_windows,
+    resolve_driver_path,
+)
+from extractors import (
+    PROPERTY_TYPE_CLASS,
+    SQFT_XPATH,
+    extract_coordinates,
+    extract_json_model_cards,
+    extract_list_cards,
+    format_square_footage,
+    match_known_property_type,
 )
-from bs4 import BeautifulSoup
 import json
-import time
-import random
-import re
 import argparse
 import sys
+import threading
 import traceback
+from urllib.parse import parse_qs, quote, urlparse
+
+# Heavy modules imported on first use (load_selenium_support(),
+# load_http_fetcher()) rather than before the first line of work.
+WebDriverWait = None
+EC = None
+HttpDetailFetcher = None
+
+# Seconds spent getting to work, reported with the first emitted record.
+STARTUP_TIMINGS = {"module_imports": time.perf_counter() - _startup_began}
+
+
+def load_selenium_support():
+    """Imports WebDriverWait / expected_conditions (which pull in selenium.webdriver)."""
+    global WebDriverWait, EC
+    if WebDriverWait is None:
+        from selenium.webdriver.support import expected_conditions
+        from selenium.webdriver.support.ui import WebDriverWait as wait_class
+
+        WebDriverWait, EC = wait_class, expected_conditions
+
+
+def load_http_fetcher():
+    """Imports HttpDetailFetcher (and with it requests) for the HTTP detail engine."""
+    global HttpDetailFetcher
+    if HttpDetailFetcher is None:
+        from detail_fetcher import HttpDetailFetcher as fetcher_class
+
+        HttpDetailFetcher = fetcher_class
 
 # --- Constants ---
-USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36"
+RESULTS_URL_TEMPLATE = (
+    "https://www.rightmove.co.uk/property-for-sale/find.html?locationIdentifier={}"
+)
+
+
+def search_term_for(postcode):
+    """The term typed into Rightmove's search box for a postcode (its first three characters)."""
+    return postcode.strip().upper()[:3].strip()
+
+
+def group_postcodes_by_search_term(postcodes):
+    """Collapses postcodes to their unique search terms, keeping first-seen order.
+
+    Returns {search_term: [postcode, ...]}.
+    """
+    groups = {}
+    for postcode in postcodes:
+        postcode = postcode.strip().upper()
+        if not postcode:
+            continue
+        members = groups.setdefault(search_term_for(postcode), [])
+        if postcode not in members:
+            members.append(postcode)
+    return groups
+
+
+def location_identifier_from_url(url):
+    """Pulls locationIdentifier (e.g. 'OUTCODE^2520') out of a results URL."""
+    values = parse_qs(urlparse(url).query).get("locationIdentifier")
+    return values[0] if values else None
+
+
+# --- SSE output routing ---
+# The one-shot CLI writes to stdout. The daemon runs several jobs at once, so
+# each worker thread can redirect its output and tag it with a job id. With a
+# RunCheckpoint every line also carries the run id and a sequence number.
+_sse_local = threading.local()
+_sse_write_lock = threading.Lock()
+
+
+@contextmanager
+def sse_output(stream=None, job_id=None, checkpoint=None):
+    """Routes print_sse_json output of the current thread to `stream`, tagged with `job_id`.
+
+    `checkpoint` numbers the lines and is flushed to disk on exit.
+    """
+    previous = (
+        getattr(_sse_local, "stream", None),
+        getattr(_sse_local, "job_id", None),
+        getattr(_sse_local, "checkpoint", None),
+    )
+    _sse_local.stream = stream
+    _sse_local.job_id = job_id
+    _sse_local.checkpoint = checkpoint
+    try:
+        yield
+    finally:
+        _sse_local.stream, _sse_local.job_id, _sse_local.checkpoint = previous
+        if checkpoint is not None:
+            # Batched emitted ids must reach disk before the run's output ends.
+            try:
+                checkpoint.flush()
+            except Exception as e_checkpoint:
+                print(f"Warning: Checkpoint write failed: {e_checkpoint}", file=sys.stderr)
 
 
 # --- Helper to print JSON output for SSE ---
 def print_sse_json(data):
-    """Prints JSON data to stdout and flushes the buffer."""
+    """Prints JSON data to stdout (or the thread's sse_output stream) and flushes the buffer."""
+    stream = getattr(_sse_local, "stream", None) or sys.stdout
+    job_id = getattr(_sse_local, "job_id", None)
+    checkpoint = getattr(_sse_local, "checkpoint", None)
+    if checkpoint is not None and isinstance(data, dict):
+        data = {"run_id": checkpoint.run_id, "seq": checkpoint.next_seq(), **data}
+    if job_id is not None and isinstance(data, dict):
+        data = {"job_id": job_id, **data}
     try:
-        print(json.dumps(data), flush=True)
+        line = json.dumps(data)
     except Exception as e:
         # Fallback if data cannot be JSON serialized
-        print(
-            json.dumps(
-                {
-                    "error": f"Failed to serialize data for SSE: {e}",
-                    "original_data_type": str(type(data)),
-                }
-            ),
-            flush=True,
+        line = json.dumps(
+            {
+                "error": f"Failed to serialize data for SSE: {e}",
+                "original_data_type": str(type(data)),
+                **({"job_id": job_id} if job_id is not None else {}),
+            }
         )
+    with _sse_write_lock:
+        try:
+            print(line, file=stream, flush=True)
+        except (BrokenPipeError, OSError, ValueError) as e:
+            # Reader went away (e.g. daemon client disconnected); nothing to send to.
+            print(f"Warning: Could not write SSE line: {e}", file=sys.stderr)
+
+
+class PendingPage:
+    """A results page whose detail fetches may still be in flight."""
+
+    __slots__ = ("cards", "num_cards", "processed_count", "futures")
+
+    def __init__(self, cards, num_cards, processed_count):
+        self.cards = cards
+        self.num_cards = num_cards
+        self.processed_count = processed_count
+        self.futures = None  # {future: card_index} for background engines
 
 
 class RightmoveScraper:
     # --- __init__, close_driver, robust_click, search_by_postcode ---
     # --- remain EXACTLY the same as the previous version          ---
-    def __init__(self, postcode="TS178BT"):
+    def __init__(
+        self,
+        postcode="TS178BT",
+        driver=None,
+        detail_engine="selenium",
+        http_workers=8,
+        detail_workers=0,
+        detail_cache=None,
+        extraction="auto",
+        location_cache=None,
+        pace=DEFAULT_POLICY,
+        max_pages=1,
+        max_results=None,
+        postcodes=None,
+        lean_browsing=False,
+        measure_page_weights=False,
+        page_weight_log=None,
+        checkpoint=None,
+        metrics=None,
+        metric_events=True,
+        snapshots=None,
+        max_recoveries=3,
+        record_format="legacy",
+        keep_raw=False,
+        tile_precision=None,
+        spatial_index=None,
+        shared_index=None,
+    ):
         # self.results = [] # No longer needed to store all results here
         self.postcode = postcode
-        self.search_postcode = postcode[:3]
+        self.search_postcode = search_term_for(postcode)
+        # Batch runs: every input postcode this search answers; each emitted
+        # record is tagged with them.
+        self.postcodes = postcodes
         self.processed_properties_count = 0  # Track if any properties were processed
+        # "selenium" opens each detail page in a tab; "http" fetches the raw
+        # HTML over a pooled keep-alive session (Selenium then only navigates search).
+        self.detail_engine = detail_engine
+        self.http_workers = http_workers
+        self.http_fetcher = None
+        # With detail_workers > 0 the Selenium engine fans detail pages out to
+        # that many extra Chrome sessions instead of tabs of the main driver.
+        self.detail_workers = detail_workers
+        self.detail_pool = None
+        self.detail_executor = None
+        # Optional ListingCache; cards with fresh cached details skip the fetch.
+        self.detail_cache = detail_cache
+        # "auto" reads listings from the results page's embedded JSON model and
+        # falls back to rendered cards + detail pages; "dom" always does the latter.
+        self.extraction = extraction
+        # Optional LocationCache: search term -> locationIdentifier for direct URLs.
+        self.location_cache = location_cache
+        # One pacer for every page request of this run (main driver, worker
+        # drivers and HTTP fetches alike); replaces the old fixed random sleeps.
+        self.pacer = AdaptiveRateLimiter.from_policy(pace)
+        self.max_pages = max_pages
+        self.max_results = max_results
+        self.scheduled_count = 0  # Cards emitted or with a detail fetch under way
+        # Lean browsing: eager page loads, no images/fonts/trackers (and no CSS
+        # on detail-only worker sessions). Page weights are logged whenever
+        # lean browsing is on, or on request to build a normal-mode baseline.
+        self.lean_browsing = lean_browsing
+        self.measure_page_weights = lean_browsing or measure_page_weights
+        self.page_weight_log = page_weight_log  # Optional PageWeightLog
+        self.page_weight_totals = {}  # kind -> [pages, bytes, seconds]
+        self._page_weight_lock = threading.Lock()
+        # Optional RunCheckpoint: emitted ids and the current page are saved
+        # after every record; on resume those listings are not fetched again.
+        self.checkpoint = checkpoint
+        # Phase timings. A RunMetrics handed in (batch runs, the CLI) is
+        # summarised by its owner; otherwise this scraper prints its own.
+        self._owns_metrics = metrics is None
+        self.metrics = metrics or RunMetrics(emit_events=metric_events)
+        # Incremental mode (a SnapshotStore is given): only new or changed
+        # listings are fetched and emitted, tagged with "delta"; after a
+        # complete crawl, listings no longer listed are emitted as removed.
+        self.snapshots = snapshots
+        self._previous_snapshot = None
+        self._seen_ids = set()
+        self._reached_last_page = False
+        self._skipped_pages = False
+        self.delta_counts = {"new": 0, "price_changed": 0, "changed": 0, "unchanged": 0}
+        # Dead main-driver sessions are replaced (up to max_recoveries times)
+        # and the run re-enters the last results page instead of aborting.
+        self.supervisor = (
+            DriverSupervisor(lean=lean_browsing, max_recoveries=max_recoveries)
+            if max_recoveries > 0
+            else None
+        )
+        self.recovery_seconds = 0.0
+        self._results_url = None
+        # "legacy" emits display strings as before; "typed" emits ListingRecord
+        # dicts (numbers and nulls), with the display strings under "raw" if keep_raw.
+        self.record_format = record_format
+        self.keep_raw = keep_raw
+        # With tile_precision set, emitted listings go into a SpatialIndex (one
+        # shared across a batch) and the run ends with a {"tiles": [...]} record
+        # of per-geohash-cell counts and median prices. shared_index is fed
+        # too, e.g. the daemon's index that answers radius/bbox/grid queries.
+        self.tile_precision = tile_precision
+        self.spatial_index = spatial_index
+        if self.spatial_index is None and tile_precision:
+            self.spatial_index = SpatialIndex()
+        self.shared_index = shared_index
+        self._created_at = time.perf_counter()
+        self._first_record_reported = False
+        self.current_page = 1
+        self._already_emitted = set()
+        if checkpoint is not None:
+            self._already_emitted = checkpoint.emitted_ids(self.search_postcode)
+            # Listings emitted before the resume are still listed: never report
+            # them as removed just because they are skipped this time.
+            self._seen_ids.update(self._already_emitted)
+            self.processed_properties_count = len(self._already_emitted)
+            self.scheduled_count = len(self._already_emitted)
         print(
             f"Initializing scraper for postcode: {postcode}, using search term: {self.search_postcode}",
             file=sys.stderr,
         )
-        # ... rest of __init__ is the same ...
-        chrome_options = Options()
-        chrome_options.add_argument("--headless=new")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument(f"user-agent={USER_AGENT}")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option("useAutomationExtension", False)
+        # A driver handed in (e.g. from the daemon's pool) is borrowed: we tidy
+        # its windows when done but never quit it.
+        self._owns_driver = driver is None
+        started = time.perf_counter()
+        with self.metrics.phase("selenium_imports"):
+            load_selenium_support()
+            load_webdriver()
+        STARTUP_TIMINGS.setdefault("selenium_imports", time.perf_counter() - started)
+        if driver is not None:
+            self.driver = driver
+            return
 
         try:
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.set_page_load_timeout(45)
+            started = time.perf_counter()
+            with self.metrics.phase("driver_path"):
+                resolve_driver_path()
+            STARTUP_TIMINGS.setdefault("driver_path", time.perf_counter() - started)
+            started = time.perf_counter()
+            with self.metrics.phase("driver_startup"):
+                self.driver = create_driver(lean=lean_browsing)
+            STARTUP_TIMINGS.setdefault("driver_startup", time.perf_counter() - started)
             print("WebDriver initialized successfully.", file=sys.stderr)
         except WebDriverException as e:
             # Print fatal error to stdout for SSE handling
@@ -830,39 +1099,18 @@ class RightmoveScraper:
             sys.exit(1)
 
     def close_driver(self):
-        if hasattr(self, "driver") and self.driver:
-            # ... same logic as before ...
-            try:
-                print("Closing WebDriver.", file=sys.stderr)
-                handles = self.driver.window_handles
-                for handle in handles[1:]:
-                    try:
-                        self.driver.switch_to.window(handle)
-                        self.driver.close()
-                    except (NoSuchWindowException, WebDriverException):
-                        pass
-                if handles:
-                    try:
-                        self.driver.switch_to.window(handles[0])
-                    except (NoSuchWindowException, WebDriverException):
-                        pass
-                self.driver.quit()
-            except WebDriverException as qe:
-                if "invalid session id" in str(qe) or "session deleted" in str(qe):
-                    print(
-                        "Warning: WebDriver session already invalid or closed during quit.",
-                        file=sys.stderr,
-                    )
-                else:
-                    # Log warning to stderr, don't send to stdout as it might interfere with SSE
-                    print(
-                        f"Warning: Error closing WebDriver: {str(qe)}", file=sys.stderr
-                    )
-            except Exception as e:
-                print(
-                    f"Warning: Unexpected error closing WebDriver: {str(e)}",
-                    file=sys.stderr,
-                )
+        if not (hasattr(self, "driver") and self.driver):
+            return
+        if self._owns_driver:
+            quit_driver(self.driver)
+            return
+        try:
+            reset_windows(self.driver)
+        except Exception as e:
+            print(
+                f"Warning: Could not reset borrowed WebDriver windows: {e}",
+                file=sys.stderr,
+            )
 
     def robust_click(self, element_locator, timeout=10):
         # ... same logic as before ...
@@ -906,125 +1154,306 @@ class RightmoveScraper:
             print(f"  Error clicking element {element_locator}: {e}", file=sys.stderr)
             return False
 
-    def search_by_postcode(self):
-        print(
-            f"Navigating to Rightmove homepage and searching for postcode: {self.search_postcode}",
-            file=sys.stderr,
-        )
+    @contextmanager
+    def paced_request(self):
+        """Waits for the pacer, then reports the wrapped request's duration and outcome."""
+        self.pacer.acquire()
+        start = time.time()
         try:
-            self.driver.get("https://www.rightmove.co.uk/")
-
-            # Wait for a key element like the search box to confirm basic page load
-            search_box_locator = (
-                By.CSS_SELECTOR,
-                "input.dsrm_inputText.ta_userInput#ta_searchInput",
+            yield
+        except Exception:
+            self.pacer.record(time.time() - start, error=True)
+            raise
+        self.pacer.record(time.time() - start)
+
+    def accept_cookies(self):
+        """Clicks the cookie banner's accept button if it is showing. Never raises."""
+        with self.metrics.phase("cookies"):
+            self._click_cookie_banner()
+
+    def _click_cookie_banner(self):
+        # --- Optimized Cookie Handling ---
+        print("Checking for cookie banner...", file=sys.stderr)
+        accept_locator_xpath = '//button[contains(text(), "Accept") or contains(text(), "ACCEPT ALL")]'  # Flexible XPath
+        try:
+            # Use find_elements for a non-blocking check. Returns empty list if not found.
+            accept_buttons = self.driver.find_elements(
+                By.XPATH, accept_locator_xpath
             )
-            try:
-                WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_element_located(search_box_locator)
-                )
-                print("Homepage basic structure loaded.", file=sys.stderr)
-            except TimeoutException:
-                raise Exception(
-                    "Homepage did not load correctly (search box not found)."
-                )
-
-            # --- Optimized Cookie Handling ---
-            print("Checking for cookie banner...", file=sys.stderr)
-            accept_locator_xpath = '//button[contains(text(), "Accept") or contains(text(), "ACCEPT ALL")]'  # Flexible XPath
-            try:
-                # Use find_elements for a non-blocking check. Returns empty list if not found.
-                accept_buttons = self.driver.find_elements(
-                    By.XPATH, accept_locator_xpath
-                )
 
-                if accept_buttons:
-                    # Found potential button(s). Try to click the first one.
-                    button_to_click = accept_buttons[0]
-                    # Check if it's actually visible/interactable before clicking
-                    if button_to_click.is_displayed() and button_to_click.is_enabled():
+            if accept_buttons:
+                # Found potential button(s). Try to click the first one.
+                button_to_click = accept_buttons[0]
+                # Check if it's actually visible/interactable before clicking
+                if button_to_click.is_displayed() and button_to_click.is_enabled():
+                    try:
+                        print(
+                            "Cookie banner found. Attempting to click...",
+                            file=sys.stderr,
+                        )
+                        button_to_click.click()
+                        print("Clicked cookie accept button.", file=sys.stderr)
+                    except ElementNotInteractableException:
+                        # Fallback if click is intercepted or element obscured
                         try:
                             print(
-                                "Cookie banner found. Attempting to click...",
+                                "Cookie button not directly interactable, trying JS click...",
                                 file=sys.stderr,
                             )
-                            button_to_click.click()
-                            print("Clicked cookie accept button.", file=sys.stderr)
-                            time.sleep(
-                                random.uniform(0.2, 0.4)
-                            )  # Minimal pause ONLY after successful click
-                        except ElementNotInteractableException:
-                            # Fallback if click is intercepted or element obscured
-                            try:
-                                print(
-                                    "Cookie button not directly interactable, trying JS click...",
-                                    file=sys.stderr,
-                                )
-                                self.driver.execute_script(
-                                    "arguments[0].click();", button_to_click
-                                )
-                                print(
-                                    "Clicked cookie accept button via JS.",
-                                    file=sys.stderr,
-                                )
-                                time.sleep(
-                                    random.uniform(0.2, 0.4)
-                                )  # Minimal pause ONLY after successful click
-                            except Exception as js_e:
-                                print(
-                                    f"Warning: JS click on cookie button failed: {js_e}",
-                                    file=sys.stderr,
-                                )
-                        except Exception as click_e:
+                            self.driver.execute_script(
+                                "arguments[0].click();", button_to_click
+                            )
+                            print(
+                                "Clicked cookie accept button via JS.",
+                                file=sys.stderr,
+                            )
+                        except Exception as js_e:
                             print(
-                                f"Warning: Error clicking cookie button: {click_e}",
+                                f"Warning: JS click on cookie button failed: {js_e}",
                                 file=sys.stderr,
                             )
-                    else:
-                        # Found in DOM but not visible/enabled. Ignore it.
+                    except Exception as click_e:
                         print(
-                            "Cookie button found but not interactable, proceeding without click.",
+                            f"Warning: Error clicking cookie button: {click_e}",
                             file=sys.stderr,
                         )
                 else:
-                    # Button not found by find_elements - common case if already accepted.
+                    # Found in DOM but not visible/enabled. Ignore it.
                     print(
-                        "Cookie banner button not found (or already handled), proceeding.",
+                        "Cookie button found but not interactable, proceeding without click.",
                         file=sys.stderr,
                     )
+            else:
+                # Button not found by find_elements - common case if already accepted.
+                print(
+                    "Cookie banner button not found (or already handled), proceeding.",
+                    file=sys.stderr,
+                )
 
-            except Exception as cookie_e:
-                # Catch unexpected errors during the check itself (e.g., invalid XPath temporarily)
+        except Exception as cookie_e:
+            # Catch unexpected errors during the check itself (e.g., invalid XPath temporarily)
+            print(
+                f"Warning: Error during cookie banner check logic: {cookie_e}",
+                file=sys.stderr,
+            )
+        # --- End of Optimized Cookie Handling ---
+
+    def search_by_postcode(self):
+        """Gets the driver onto the first results page for self.search_postcode.
+
+        With a cached locationIdentifier this is a single page load; otherwise
+        (cold cache, or the cached URL stopped working) it drives the homepage
+        search form and remembers the identifier from the resulting URL.
+        """
+        if self.location_cache is not None:
+            location_identifier = self.location_cache.get(self.search_postcode)
+            if location_identifier:
+                if self._open_results_directly(location_identifier):
+                    return True
+                self.location_cache.forget(self.search_postcode)
+
+        if not self._search_via_homepage():
+            return False
+        if self.location_cache is not None:
+            location_identifier = location_identifier_from_url(self.driver.current_url)
+            if location_identifier:
+                self.location_cache.store(self.search_postcode, location_identifier)
                 print(
-                    f"Warning: Error during cookie banner check logic: {cookie_e}",
+                    f"Cached location {location_identifier} for {self.search_postcode}.",
                     file=sys.stderr,
                 )
-            # --- End of Optimized Cookie Handling ---
+        return True
+
+    def _remember_results_url(self):
+        try:
+            self._results_url = self.driver.current_url
+        except WebDriverException:
+            pass
+
+    def _recover_driver(self, reason):
+        """Swaps a dead main driver for a fresh one and re-opens the last results page.
+
+        Returns False when recovery is disabled, exhausted or fails.
+        """
+        if self.supervisor is None or not self.supervisor.can_recover():
+            return False
+        print(
+            f"!! WebDriver session died ({reason}); recovering "
+            f"(attempt {self.supervisor.recoveries + 1}/{self.supervisor.max_recoveries})...",
+            file=sys.stderr,
+        )
+        start = time.perf_counter()
+        try:
+            with self.metrics.phase("driver_recovery"):
+                self.driver = self.supervisor.replace(self.driver)
+                self._owns_driver = True  # The replacement is ours to quit.
+                if self._results_url:
+                    with self.paced_request():
+                        self.driver.get(self._results_url)
+                        WebDriverWait(self.driver, 15).until(
+                            EC.presence_of_element_located(
+                                (By.CSS_SELECTOR, ".PropertyPrice_price__VL65t")
+                            )
+                        )
+                    self.accept_cookies()
+        except Exception as e:
+            print(f"!! WebDriver recovery failed: {type(e).__name__} - {e}", file=sys.stderr)
+            traceback.print_exc(file=sys.stderr)
+            return False
+        lost = time.perf_counter() - start
+        self.recovery_seconds += lost
+        print(f"WebDriver recovered in {lost:.1f}s; continuing.", file=sys.stderr)
+        print_sse_json(
+            {
+                "status": "driver_recovered",
+                "recoveries": self.supervisor.recoveries,
+                "seconds_lost": round(lost, 2),
+                "resumed_at": reason,
+            }
+        )
+        return True
 
-            # --- Search Box Interaction (Using previous optimized version) ---
-            search_box = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable(search_box_locator)
+    def _with_recovery(self, action, reason):
+        """Runs `action`; if the session dies and can be recovered, runs it once more."""
+        try:
+            return action()
+        except WebDriverException as e:
+            if not is_session_dead_error(e) or not self._recover_driver(reason):
+                raise
+        return action()
+
+    def recovery_summary(self):
+        recoveries = self.supervisor.recoveries if self.supervisor is not None else 0
+        return f"Driver recoveries: {recoveries} ({self.recovery_seconds:.1f}s lost)"
+
+    def _log_page_weight(self, driver, kind):
+        """Logs transfer size and DOM-ready time of the page `driver` shows.
+
+        In lean mode the figures are compared against the stored normal-mode
+        average for the same kind of page ("results" or "detail").
+        """
+        if not self.measure_page_weights:
+            return
+        weight = measure_page_weight(driver)
+        if not weight or weight.get("seconds") is None:
+            return
+        page_bytes, seconds = weight["bytes"], weight["seconds"]
+        with self._page_weight_lock:
+            totals = self.page_weight_totals.setdefault(kind, [0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += page_bytes
+            totals[2] += seconds
+        line = (
+            f"   Page weight [{kind}{', lean' if self.lean_browsing else ''}]: "
+            f"{page_bytes / 1024:.0f} KiB over {weight['requests']} requests, "
+            f"DOM ready {seconds:.2f}s"
+        )
+        if self.page_weight_log is not None:
+            try:
+                baseline = (
+                    self.page_weight_log.average(kind, lean=False)
+                    if self.lean_browsing
+                    else None
+                )
+                self.page_weight_log.record(kind, self.lean_browsing, page_bytes, seconds)
+            except Exception as e:
+                print(f"   Warning: Could not record page weight: {e}", file=sys.stderr)
+                baseline = None
+            if baseline:
+                base_bytes, base_seconds, base_pages = baseline
+                line += (
+                    f" (saved ~{(base_bytes - page_bytes) / 1024:.0f} KiB, "
+                    f"{base_seconds - seconds:.2f}s vs {base_pages}-page baseline)"
+                )
+        print(line, file=sys.stderr)
+
+    def page_weight_summary(self):
+        with self._page_weight_lock:
+            parts = [
+                f"{kind}: {pages} pages, avg {total_bytes / pages / 1024:.0f} KiB, "
+                f"avg DOM ready {total_seconds / pages:.2f}s"
+                for kind, (pages, total_bytes, total_seconds) in self.page_weight_totals.items()
+            ]
+        mode = "lean" if self.lean_browsing else "normal"
+        return f"Page weight ({mode}): " + ("; ".join(parts) or "no pages measured")
+
+    def _open_results_directly(self, location_identifier):
+        url = RESULTS_URL_TEMPLATE.format(quote(location_identifier, safe=""))
+        print(
+            f"Opening results for {self.search_postcode} directly ({location_identifier})",
+            file=sys.stderr,
+        )
+        try:
+            with self.paced_request(), self.metrics.phase("results_load", source="direct"):
+                self.driver.get(url)
+                results_price_locator = (
+                    By.CSS_SELECTOR,
+                    ".PropertyPrice_price__VL65t",
+                )
+                WebDriverWait(self.driver, 15).until(
+                    EC.presence_of_element_located(results_price_locator)
+                )
+            self.accept_cookies()
+            print("Successfully navigated to search results page", file=sys.stderr)
+            return True
+        except Exception as e:
+            print(
+                f"Direct results URL failed ({type(e).__name__} - {e}); falling back to homepage search.",
+                file=sys.stderr,
             )
-            search_box.clear()
-            search_box.send_keys(self.search_postcode)
+            return False
 
-            # --- Autocomplete ---
-            autocomplete_list_locator = (By.CSS_SELECTOR, "ul.ta_searchResults")
-            autocomplete_first_item_locator = (
+    def _search_via_homepage(self):
+        print(
+            f"Navigating to Rightmove homepage and searching for postcode: {self.search_postcode}",
+            file=sys.stderr,
+        )
+        try:
+            # Wait for a key element like the search box to confirm basic page load
+            search_box_locator = (
                 By.CSS_SELECTOR,
-                "ul.ta_searchResults li.ta_searchResultRow",
+                "input.dsrm_inputText.ta_userInput#ta_searchInput",
             )
-            try:
-                WebDriverWait(self.driver, 7).until(
-                    EC.visibility_of_element_located(autocomplete_list_locator)
+            with self.metrics.phase("homepage"):
+                with self.paced_request():
+                    self.driver.get("https://www.rightmove.co.uk/")
+                try:
+                    WebDriverWait(self.driver, 15).until(
+                        EC.presence_of_element_located(search_box_locator)
+                    )
+                    print("Homepage basic structure loaded.", file=sys.stderr)
+                except TimeoutException:
+                    raise Exception(
+                        "Homepage did not load correctly (search box not found)."
+                    )
+
+            self.accept_cookies()
+
+            with self.metrics.phase("autocomplete"):
+                # --- Search Box Interaction (Using previous optimized version) ---
+                search_box = WebDriverWait(self.driver, 10).until(
+                    EC.element_to_be_clickable(search_box_locator)
                 )
-            except TimeoutException:
-                raise Exception(
-                    "Autocomplete suggestions did not appear after typing postcode."
+                search_box.clear()
+                search_box.send_keys(self.search_postcode)
+
+                # --- Autocomplete ---
+                autocomplete_list_locator = (By.CSS_SELECTOR, "ul.ta_searchResults")
+                autocomplete_first_item_locator = (
+                    By.CSS_SELECTOR,
+                    "ul.ta_searchResults li.ta_searchResultRow",
                 )
+                try:
+                    WebDriverWait(self.driver, 7).until(
+                        EC.visibility_of_element_located(autocomplete_list_locator)
+                    )
+                except TimeoutException:
+                    raise Exception(
+                        "Autocomplete suggestions did not appear after typing postcode."
+                    )
 
-            if not self.robust_click(autocomplete_first_item_locator, timeout=7):
-                raise Exception("Failed to click autocomplete result.")
+                if not self.robust_click(autocomplete_first_item_locator, timeout=7):
+                    raise Exception("Failed to click autocomplete result.")
 
             # --- 'For Sale' Button ---
             for_sale_locator = (
@@ -1042,14 +1471,18 @@ class RightmoveScraper:
             WebDriverWait(self.driver, 7).until(
                 EC.element_to_be_clickable(search_button_locator)
             )
-            if not self.robust_click(search_button_locator, timeout=7):
-                raise Exception("Failed to click 'Search Properties' button.")
-
-            # --- Wait for Results Page ---
-            results_price_locator = (By.CSS_SELECTOR, ".PropertyPrice_price__VL65t")
-            WebDriverWait(self.driver, 15).until(
-                EC.presence_of_element_located(results_price_locator)
-            )
+            with self.paced_request(), self.metrics.phase("results_load", source="search"):
+                if not self.robust_click(search_button_locator, timeout=7):
+                    raise Exception("Failed to click 'Search Properties' button.")
+
+                # --- Wait for Results Page ---
+                results_price_locator = (
+                    By.CSS_SELECTOR,
+                    ".PropertyPrice_price__VL65t",
+                )
+                WebDriverWait(self.driver, 15).until(
+                    EC.presence_of_element_located(results_price_locator)
+                )
             print("Successfully navigated to search results page", file=sys.stderr)
             return True
 
@@ -1066,305 +1499,417 @@ class RightmoveScraper:
 
     # --- Parse method MODIFIED to print each result ---
     def parse(self, html):
+        """Parses one results page and emits all of its properties before returning."""
+        pending = self.start_page(html)
+        if pending is not None:
+            self.finish_page(pending)
+
+    def start_page(self, html):
+        """Parses a results page and starts its detail fetches.
+
+        Cards that need no fetch are emitted right away. With the HTTP engine
+        or worker drivers the fetches run in the background while the caller
+        moves the main driver on; finish_page() waits for them and emits.
+        """
         if not html:
             print("No HTML content to parse.", file=sys.stderr)
-            return
+            return None
 
         print(
-            "Parsing list page HTML and preparing for sequential detail fetch...",
+            f"Parsing list page HTML and preparing for {self.detail_engine} detail fetch...",
             file=sys.stderr,
         )
-        page_processed_count = 0
-        soup = BeautifulSoup(html, "lxml")
+        cards, num_properties_to_process = self.extract_cards(html)
+        cards = self._skip_already_emitted(cards)
+        cards = self._keep_new_or_changed(cards)
+        cards = self._limit_to_max_results(cards)
+        cards, page_processed_count = self._emit_complete_cards(cards)
+        cards, cached_count = self._emit_cached_details(cards)
+        page_processed_count += cached_count
+
+        pending = PendingPage(cards, num_properties_to_process, page_processed_count)
+        if not cards:
+            pass
+        elif self.detail_engine == "http":
+            pending.futures = self._submit_details_http(cards)
+        elif self.detail_workers > 0:
+            pending.futures = self._submit_details_parallel(cards)
+        return pending
+
+    def finish_page(self, pending):
+        """Completes a page from start_page(), emitting each card as its details arrive."""
+        if pending.futures is not None:
+            pending.processed_count += self._drain_detail_futures(pending.futures)
+        elif pending.cards:
+            # Tab-based fetches need the main driver, so they cannot overlap.
+            pending.processed_count += self._fetch_details_sequential(pending.cards)
 
-        prices = soup.find_all("div", class_="PropertyPrice_price__VL65t")
-        addresses = soup.find_all("address", class_="PropertyAddress_address__LYRPq")
-        descriptions = soup.find_all("p", class_="PropertyCardSummary_summary__oIv57")
-        bedrooms = soup.find_all(
-            "span", class_="PropertyInformation_bedroomsCount___2b5R"
+        print(
+            f"Finished parsing page. Processed {pending.processed_count}/{pending.num_cards} properties.",
+            file=sys.stderr,
         )
-        all_spans = soup.find_all("span", {"aria-label": True})
-        links = soup.select("a.propertyCard-link")
-
-        num_properties_to_process = len(links)
-
-        for i in range(num_properties_to_process):
-            property_data = {
-                "id": f"rm_temp_{i}",
-                "price": "N/A",
-                "address": "N/A",
-                "description": "N/A",
-                "bedrooms": "N/A",
-                "bathrooms": "N/A",
-                "square_footage": "N/A",
-                "property_type": "N/A",
-                "latitude": "N/A",
-                "longitude": "N/A",
-                "detail_url": "N/A",
-                "source": "Rightmove",
-            }
-            is_fatal_error = False  # Flag to stop processing if session dies
 
+    def _skip_already_emitted(self, cards):
+        if not self._already_emitted:
+            return cards
+        remaining = [
+            (i, property_data)
+            for i, property_data in cards
+            if property_data["id"] not in self._already_emitted
+        ]
+        if len(remaining) < len(cards):
+            print(
+                f"Resume: skipping {len(cards) - len(remaining)} listings emitted before.",
+                file=sys.stderr,
+            )
+        return remaining
+
+    def _keep_new_or_changed(self, cards):
+        """Incremental mode: drops listings identical to their snapshot, tags the rest with "delta"."""
+        if self.snapshots is None:
+            return cards
+        if self._previous_snapshot is None:
+            self._previous_snapshot = self.snapshots.load(self.search_postcode)
+        remaining = []
+        unchanged_ids = []
+        for i, property_data in cards:
+            property_id = property_data["id"]
+            self._seen_ids.add(property_id)
+            content_hash = listing_content_hash(property_data)
+            property_data["_content_hash"] = content_hash
+            previous = self._previous_snapshot.get(property_id)
+            if previous is None:
+                delta = "new"
+            elif previous[0] == content_hash:
+                unchanged_ids.append(property_id)
+                continue
+            elif previous[1] != property_data["price"]:
+                delta = "price_changed"
+                property_data["previous_price"] = previous[1]
+            else:
+                delta = "changed"
+            property_data["delta"] = delta
+            self.delta_counts[delta] += 1
+            remaining.append((i, property_data))
+        if unchanged_ids:
+            self.delta_counts["unchanged"] += len(unchanged_ids)
             try:
-                # --- Extract basic info (same as before) ---
-                if i < len(prices):
-                    property_data["price"] = prices[i].get_text(strip=True)
-                if i < len(addresses):
-                    property_data["address"] = addresses[i].get_text(strip=True)
-                if i < len(descriptions):
-                    property_data["description"] = descriptions[i].get_text(strip=True)
-                if i < len(bedrooms):
-                    bedroom_text = bedrooms[i].get_text(strip=True)
-                    match_bed = re.search(r"\d+", bedroom_text)
-                    if match_bed:
-                        property_data["bedrooms"] = match_bed.group(0)
-                if i < len(all_spans):  # Bathroom logic (same potential unreliability)
-                    aria_label = all_spans[i].get("aria-label", "").lower()
-                    if "bathroom" in aria_label or (
-                        "in property" in aria_label and aria_label.split()[0].isdigit()
-                    ):
-                        match_bath = re.search(
-                            r"(\d+)\s+bathroom", aria_label, re.IGNORECASE
-                        )
-                        if match_bath:
-                            property_data["bathrooms"] = match_bath.group(1)
-                        elif aria_label.split() and aria_label.split()[0].isdigit():
-                            property_data["bathrooms"] = aria_label.split()[0]
-
-                link_element = links[i]
-                href = link_element.get("href")
-                if href and href.startswith("/properties/"):
-                    property_data["detail_url"] = "https://www.rightmove.co.uk" + href
-                    match_id = re.search(r"/properties/(\d+)", href)
-                    if match_id:
-                        property_data["id"] = f"rm_{match_id.group(1)}"
-                else:
-                    print(
-                        f" Skipping detail fetch for card {i+1}: Invalid link {href}",
-                        file=sys.stderr,
-                    )
-                    # Print basic info even if link bad? Maybe not, could be confusing. Let's skip.
-                    continue
-
-                # --- Fetch details sequentially (same core logic) ---
-                # print(f"  Fetching details for card {i+1}: {property_data['id']}", file=sys.stderr) # Reduce verbosity
-                original_window = self.driver.current_window_handle
-                new_window = None
-                detail_fetch_error = None  # Track non-fatal errors for this property
+                self.snapshots.touch(self.search_postcode, unchanged_ids)
+            except Exception as e_snapshot:
+                print(f"   Warning: Snapshot update failed: {e_snapshot}", file=sys.stderr)
+            print(
+                f"Incremental: {len(unchanged_ids)} unchanged listings skipped.",
+                file=sys.stderr,
+            )
+        return remaining
+
+    def _emit_removed_listings(self):
+        """After a complete crawl, emits listings from the snapshot that were not seen."""
+        removed = [
+            (property_id, price)
+            for property_id, (_, price) in (self._previous_snapshot or {}).items()
+            if property_id not in self._seen_ids
+        ]
+        for property_id, price in removed:
+            removed_record = {
+                "delta": "removed",
+                "id": property_id,
+                "price": parse_price(price) if self.record_format == "typed" else price,
+                "search_term": self.search_postcode,
+            }
+            if self.postcodes:
+                removed_record["postcodes"] = self.postcodes
+            print_sse_json(removed_record)
+        if removed:
+            self.snapshots.remove(self.search_postcode, [pid for pid, _ in removed])
+        return len(removed)
+
+    def _finish_incremental(self, script_error):
+        counts = dict(self.delta_counts)
+        # Pages skipped on resume were not parsed, so their unchanged listings
+        # were never seen: such a crawl cannot tell what was removed either.
+        crawl_complete = (
+            not script_error
+            and self._reached_last_page
+            and not self._skipped_pages
+            and not self._max_results_reached()
+        )
+        if crawl_complete:
+            counts["removed"] = self._emit_removed_listings()
+        elif self._skipped_pages:
+            print(
+                "Incremental: resumed past the first results page; removals not reported.",
+                file=sys.stderr,
+            )
+        else:
+            print(
+                "Incremental: crawl did not reach the last results page; removals not reported.",
+                file=sys.stderr,
+            )
+        print(f"Incremental changes: {counts}", file=sys.stderr)
+        print_sse_json(
+            {
+                "status": "incremental_summary",
+                "search_term": self.search_postcode,
+                "complete_crawl": crawl_complete,
+                **counts,
+            }
+        )
 
-                try:
-                    self.driver.execute_script(
-                        "window.open(arguments[0]);", property_data["detail_url"]
-                    )
-                    WebDriverWait(self.driver, 10).until(
-                        EC.number_of_windows_to_be(len(self.driver.window_handles))
-                    )
-                    new_window_handle = [
-                        w for w in self.driver.window_handles if w != original_window
-                    ]
-                    if not new_window_handle:
-                        raise Exception("New window did not open.")
-                    new_window = new_window_handle[0]
-                    self.driver.switch_to.window(new_window)
-
-                    detail_page_marker_selector = "._2uQQ3SV0eMHL1P6t5ZDo2q"
-                    try:
-                        WebDriverWait(self.driver, 15).until(
-                            EC.presence_of_element_located(
-                                (By.CSS_SELECTOR, detail_page_marker_selector)
-                            )
-                        )
-                    except TimeoutException:
-                        print(
-                            f"   Warning: Detail page marker '{detail_page_marker_selector}' not found for {property_data['id']}.",
-                            file=sys.stderr,
-                        )
-                    time.sleep(random.uniform(0.3, 0.7))
+    def _limit_to_max_results(self, cards):
+        if self.max_results is None:
+            self.scheduled_count += len(cards)
+            return cards
+        room = max(self.max_results - self.scheduled_count, 0)
+        if room < len(cards):
+            print(
+                f"Limiting page to {room} more properties (--max-results {self.max_results}).",
+                file=sys.stderr,
+            )
+            cards = cards[:room]
+        self.scheduled_count += len(cards)
+        return cards
+
+    def _max_results_reached(self):
+        return self.max_results is not None and self.scheduled_count >= self.max_results
+
+    def extract_cards(self, html):
+        """Builds the property records of a results page.
+
+        Uses the embedded JSON model when available (records then usually
+        carry coordinates already), otherwise the rendered cards, which need
+        a detail fetch. Returns ([(card_index, property_data), ...],
+        number_of_cards_on_page). Cards without a usable detail link are skipped.
+        """
+        if self.extraction != "dom":
+            try:
+                json_cards = extract_json_model_cards(html)
+            except Exception as e_json:
+                print(f"Warning: Embedded JSON model unusable: {e_json}", file=sys.stderr)
+                json_cards = None
+            if json_cards:
+                print(
+                    f"Read {len(json_cards)} listings from the embedded JSON model.",
+                    file=sys.stderr,
+                )
+                return [
+                    (i, property_data)
+                    for i, property_data in enumerate(json_cards)
+                    if property_data["detail_url"] != "N/A"
+                ], len(json_cards)
+            print(
+                "No embedded JSON model found; falling back to rendered cards.",
+                file=sys.stderr,
+            )
 
-                    # --- Coordinate Extraction (Primary Goal) ---
-                    try:
-                        page_source = self.driver.page_source
-                        match = re.search(
-                            r'"latitude"\s*:\s*([0-9.]+)\s*,\s*"longitude"\s*:\s*(-?[0-9.]+)',
-                            page_source,
-                        )
-                        if match:
-                            property_data["latitude"] = match.group(1)
-                            property_data["longitude"] = match.group(2)
-                        # else: print(f"    Coordinates regex pattern not found for {property_data['id']}.", file=sys.stderr) # Reduce verbosity
-                    except Exception as e_coords:
-                        print(
-                            f"    Error extracting coordinates: {e_coords}",
-                            file=sys.stderr,
-                        )
-                        detail_fetch_error = (
-                            f"Coord error: {e_coords}"  # Log non-fatal error
-                        )
+        records = extract_list_cards(html)
+        cards = []
+        for i, property_data in enumerate(records):
+            if property_data["detail_url"] == "N/A":
+                print(
+                    f" Skipping detail fetch for card {i+1}: Invalid link",
+                    file=sys.stderr,
+                )
+                # Print basic info even if link bad? Maybe not, could be confusing. Let's skip.
+                continue
+            cards.append((i, property_data))
+        return cards, len(records)
+
+    def _emit_complete_cards(self, cards):
+        """Emits cards that already carry coordinates (from the JSON model).
+
+        Returns (cards_still_needing_a_fetch, number_emitted).
+        """
+        remaining = []
+        emitted = 0
+        for i, property_data in cards:
+            if property_data["latitude"] == "N/A" or property_data["longitude"] == "N/A":
+                remaining.append((i, property_data))
+                continue
+            # Card data, not a detail page: nothing for the detail cache.
+            self._emit_property(i, property_data, None, store=False)
+            emitted += 1
+        return remaining, emitted
+
+    def _emit_cached_details(self, cards):
+        """Emits cards whose details are fresh in the cache.
+
+        Returns (cards_still_needing_a_fetch, number_emitted).
+        """
+        if self.detail_cache is None:
+            return cards, 0
+        remaining = []
+        emitted = 0
+        for i, property_data in cards:
+            try:
+                cached = self.detail_cache.get(property_data["id"])
+            except Exception as e_cache:
+                print(f"   Warning: Detail cache lookup failed: {e_cache}", file=sys.stderr)
+                cached = None
+            if cached is None:
+                remaining.append((i, property_data))
+                continue
+            property_data.update(cached)
+            self._emit_property(i, property_data, None, store=False)
+            emitted += 1
+        return remaining, emitted
+
+    def _emit_property(self, i, property_data, detail_fetch_error, store=True):
+        if self.postcodes:
+            property_data["postcodes"] = self.postcodes
+        content_hash = property_data.pop("_content_hash", None)
+        if content_hash is not None and not detail_fetch_error:
+            # A failed fetch keeps the old snapshot, so the listing is retried next run.
+            try:
+                self.snapshots.store(
+                    self.search_postcode, property_data["id"], content_hash, property_data["price"]
+                )
+            except Exception as e_snapshot:
+                print(f"   Warning: Snapshot store failed: {e_snapshot}", file=sys.stderr)
+        if store and not detail_fetch_error and self.detail_cache is not None:
+            try:
+                self.detail_cache.store(property_data)
+            except Exception as e_cache:
+                print(f"   Warning: Detail cache store failed: {e_cache}", file=sys.stderr)
+
+        # --- Print the processed property data to stdout ---
+        # Include error if one occurred during detail fetch for this property
+        if detail_fetch_error:
+            property_data["fetch_error"] = detail_fetch_error
+            print(
+                f"  Processed card {i+1} ({property_data['id']}) with fetch error.",
+                file=sys.stderr,
+            )
 
-                    # --- SqFt / Type Extraction (Secondary) ---
-                    if (
-                        not detail_fetch_error
-                    ):  # Only attempt if coordinate extraction didn't already fail critically
-                        try:  # SqFt
-                            sqft_element = self.driver.find_element(
-                                By.XPATH,
-                                "//*[contains(text(), 'sq ft') or contains(text(), 'sq. ft.') or contains(text(), 'sqm') or contains(text(), 'm²')]",
-                            )
-                            sqft_text = sqft_element.text.strip()
-                            match_sqft = re.search(
-                                r"([\d,]+)\s*sq\s*ft", sqft_text, re.IGNORECASE
-                            )
-                            match_sqm = re.search(
-                                r"([\d.,]+)\s*m²", sqft_text, re.IGNORECASE
-                            )
-                            if match_sqft:
-                                property_data["square_footage"] = (
-                                    match_sqft.group(1).replace(",", "") + " sq ft"
-                                )
-                            elif match_sqm:
-                                sqm_val = float(match_sqm.group(1).replace(",", ""))
-                                sqft_val = round(sqm_val * 10.764)
-                                property_data["square_footage"] = (
-                                    f"{sqft_val} sq ft (from {match_sqm.group(1)} m²)"
-                                )
-                            else:
-                                property_data["square_footage"] = sqft_text
-                        except NoSuchElementException:
-                            pass
-                        except Exception as e_sqft:
-                            print(
-                                f"    Error extracting sqft: {e_sqft}", file=sys.stderr
-                            )  # Log non-fatal
+        # Send the data (even if details failed but basic info is present)
+        if not self._first_record_reported:
+            self._report_time_to_first_record()
+        self._flush_metric_events()
+        print_sse_json(self._format_record(property_data))
+        for index in (self.spatial_index, self.shared_index):
+            if index is not None:
+                index.add(property_data)
+        self.processed_properties_count += 1  # Increment global counter
+        if self.checkpoint is not None:
+            try:
+                self.checkpoint.mark_emitted(
+                    self.search_postcode, property_data["id"], self.current_page
+                )
+            except Exception as e_checkpoint:
+                print(f"   Warning: Checkpoint write failed: {e_checkpoint}", file=sys.stderr)
+
+    def emit_tiles(self):
+        emit_tiles(self.spatial_index, self.tile_precision, search_term=self.search_postcode)
+
+    def _format_record(self, property_data):
+        if self.record_format != "typed":
+            return property_data
+        return ListingRecord.from_legacy(property_data, keep_raw=self.keep_raw).to_dict()
+
+    def _report_time_to_first_record(self):
+        self._first_record_reported = True
+        since_scraper = time.perf_counter() - self._created_at
+        self.metrics.observe("time_to_first_record", since_scraper)
+        parts = [f"{name.replace('_', ' ')} {seconds:.2f}s" for name, seconds in STARTUP_TIMINGS.items()]
+        if driver_path_source():
+            parts.append(f"driver path from {driver_path_source()}")
+        if "first_record" not in STARTUP_TIMINGS:
+            # Process-wide: from the first line of scrape.py to the first record.
+            STARTUP_TIMINGS["first_record"] = time.perf_counter() - _startup_began
+            parts.append(f"first record after {STARTUP_TIMINGS['first_record']:.2f}s")
+        print(
+            f"Startup: {', '.join(parts)}; first record {since_scraper:.2f}s after scraper start.",
+            file=sys.stderr,
+        )
 
-                        try:  # Type
-                            try:
-                                prop_elem = self.driver.find_element(
-                                    By.CSS_SELECTOR, "p._1hV1kqpVceE9m-QrX_hWDN"
-                                )
-                                property_data["property_type"] = prop_elem.text.strip()
-                            except NoSuchElementException:
-                                found_type = False
-                                known_types = [
-                                    "flat",
-                                    "apartment",
-                                    "house",
-                                    "bungalow",
-                                    "studio",
-                                    "maisonette",
-                                    "duplex",
-                                    "terraced",
-                                    "semi-detached",
-                                    "detached",
-                                    "end of terrace",
-                                    "cottage",
-                                    "townhouse",
-                                    "mews",
-                                    "mobile home",
-                                    "park home",
-                                    "land",
-                                    "farmhouse",
-                                    "barn conversion",
-                                    "retirement property",
-                                    "houseboat",
-                                    "block of apartments",
-                                    "penthouse",
-                                    "link-detached",
-                                ]
-                                for tag_name in ["h1", "h2", "div", "p"]:
-                                    elements = self.driver.find_elements(
-                                        By.TAG_NAME, tag_name
-                                    )
-                                    for elem in elements:
-                                        try:
-                                            text = elem.text.strip().lower()
-                                            if 0 < len(text) < 100:
-                                                for ktype in known_types:
-                                                    if re.search(
-                                                        r"\b"
-                                                        + re.escape(ktype)
-                                                        + r"\b",
-                                                        text,
-                                                    ):
-                                                        property_data[
-                                                            "property_type"
-                                                        ] = ktype.capitalize()
-                                                        found_type = True
-                                                        break
-                                        except Exception:
-                                            continue
-                                        if found_type:
-                                            break
-                                    if found_type:
-                                        break
-                        except Exception as e_prop:
-                            print(
-                                f"    Error extracting property type: {e_prop}",
-                                file=sys.stderr,
-                            )  # Log non-fatal
-
-                except (
-                    TimeoutException,
-                    NoSuchWindowException,
-                    WebDriverException,
-                    Exception,
-                ) as e_detail:
-                    # Handle potentially fatal errors during tab management/loading
-                    print(
-                        f"   Error during detail fetch for {property_data['id']}: {type(e_detail).__name__} - {e_detail}",
-                        file=sys.stderr,
-                    )
-                    detail_fetch_error = f"Fetch error: {type(e_detail).__name__}"  # Store generic error type
-                    # Check if it's a session-killing error
-                    if isinstance(e_detail, WebDriverException) and (
-                        "invalid session id" in str(e_detail).lower()
-                        or "session deleted" in str(e_detail).lower()
-                        or "unable to connect" in str(e_detail).lower()
-                    ):
-                        print(
-                            "!!! FATAL WebDriverException detected. Aborting script.",
-                            file=sys.stderr,
-                        )
-                        print_sse_json(
-                            {"error": f"Fatal WebDriverException: {e_detail}"}
-                        )  # Send fatal error to SSE
-                        is_fatal_error = True  # Set flag
-                        raise  # Re-raise to stop the run method
-                    if isinstance(e_detail, NoSuchWindowException):
-                        new_window = None  # Window is gone
-                finally:
-                    # --- Careful cleanup (same as before) ---
-                    try:
-                        current_handles_before_close = self.driver.window_handles
-                        if new_window and new_window in current_handles_before_close:
-                            self.driver.close()
-                        current_handles_after_close = self.driver.window_handles
-                        if original_window in current_handles_after_close:
-                            self.driver.switch_to.window(original_window)
-                        elif current_handles_after_close:
-                            self.driver.switch_to.window(current_handles_after_close[0])
-                        # Don't raise fatal error here if already handled or window gone
-                    except (NoSuchWindowException, WebDriverException) as e_cleanup:
-                        print(
-                            f"   Non-critical error during window cleanup for {property_data['id']}: {e_cleanup}",
-                            file=sys.stderr,
-                        )
-                        # If session dies here, the outer loop will catch it next iteration
+    def _flush_metric_events(self):
+        """Writes queued metric events; only called from the thread that owns the output."""
+        for event in self.metrics.drain_events():
+            print_sse_json(event)
+
+    def _submit_details_http(self, cards):
+        """Starts HTTP detail fetches; returns {future: card_index}."""
+        if self.http_fetcher is None:
+            load_http_fetcher()
+            self.http_fetcher = HttpDetailFetcher(
+                max_workers=self.http_workers, pacer=self.pacer, metrics=self.metrics
+            )
+        return {
+            self.http_fetcher.submit(property_data): i for i, property_data in cards
+        }
 
-                # --- Print the processed property data to stdout ---
-                # Include error if one occurred during detail fetch for this property
-                if detail_fetch_error:
-                    property_data["fetch_error"] = detail_fetch_error
-                    print(
-                        f"  Processed card {i+1} ({property_data['id']}) with fetch error.",
-                        file=sys.stderr,
-                    )
+    def _drain_detail_futures(self, futures):
+        """Emits each (property_data, error) future as it completes; returns the count."""
+        page_processed_count = 0
+        for future in as_completed(futures):
+            property_data, detail_fetch_error = future.result()
+            self._emit_property(futures[future], property_data, detail_fetch_error)
+            page_processed_count += 1
+        return page_processed_count
+
+    def _fetch_detail_on_worker(self, property_data):
+        """Runs one detail fetch on a pooled worker driver. Never raises."""
+        try:
+            session = self.detail_pool.acquire()
+        except Exception as e:
+            print(
+                f"   No worker driver available for {property_data['id']}: {e}",
+                file=sys.stderr,
+            )
+            return property_data, f"Fetch error: {type(e).__name__}"
+        healthy = True
+        try:
+            detail_fetch_error = self.fetch_details_selenium(
+                property_data, driver=session.driver
+            )
+        except Exception as e:
+            # A dead worker only costs this card; the pool replaces the session.
+            healthy = not is_session_dead_error(e)
+            print(
+                f"   Worker session {session.session_no} failed on {property_data['id']}: {type(e).__name__} - {e}",
+                file=sys.stderr,
+            )
+            detail_fetch_error = f"Fetch error: {type(e).__name__}"
+        finally:
+            self.detail_pool.release(session, healthy=healthy)
+        return property_data, detail_fetch_error
+
+    def _submit_details_parallel(self, cards):
+        """Fans detail pages out to worker drivers; returns {future: card_index}."""
+        if self.detail_pool is None:
+            self.detail_pool = DriverPool(
+                size=self.detail_workers,
+                max_jobs_per_session=None,
+                lean=self.lean_browsing,
+                block_stylesheets=True,
+            )
+            self.detail_pool.start()
+            self.detail_executor = ThreadPoolExecutor(
+                max_workers=self.detail_workers, thread_name_prefix="detail-driver"
+            )
+        return {
+            self.detail_executor.submit(self._fetch_detail_on_worker, property_data): i
+            for i, property_data in cards
+        }
 
-                # Send the data (even if details failed but basic info is present)
-                print_sse_json(property_data)
+    def _fetch_details_sequential(self, cards):
+        """Opens each card's detail page in a new tab of the main driver, one at a time."""
+        page_processed_count = 0
+        position = 0
+        while position < len(cards):
+            i, property_data = cards[position]
+            position += 1
+            try:
+                detail_fetch_error = self.fetch_details_selenium(property_data)
+                self._emit_property(i, property_data, detail_fetch_error)
                 page_processed_count += 1
-                self.processed_properties_count += 1  # Increment global counter
 
             except WebDriverException as e_outer_wd:
+                if is_session_dead_error(e_outer_wd) and self._recover_driver(
+                    f"page {self.current_page}, card index {i}"
+                ):
+                    position -= 1  # Retry the failed card on the new session.
+                    continue
                 # Catch fatal WebDriver errors in the outer loop immediately
                 print(
                     f"!! FATAL WebDriverException processing card index {i}: {e_outer_wd}",
@@ -1380,84 +1925,346 @@ class RightmoveScraper:
                 )
                 traceback.print_exc(file=sys.stderr)
                 # Log error to stderr, but maybe don't send to SSE unless it's fatal
-                # Optionally send a specific error for this card:
-                # print_sse_json({"error": f"Failed processing card {i}: {e_outer}", "card_index": i})
-                # Decide whether to continue or break based on error type if needed
+        return page_processed_count
 
-        print(
-            f"Finished parsing page. Processed {page_processed_count}/{num_properties_to_process} properties.",
-            file=sys.stderr,
-        )
+    def fetch_details_selenium(self, property_data, driver=None):
+        """Fills detail fields from the property page opened in a new tab of `driver`.
+
+        Defaults to the main driver. Returns a non-fatal error string (or None).
+        Re-raises WebDriverExceptions that mean the session is dead.
+        """
+        driver = driver or self.driver
+        # --- Fetch details (same core logic) ---
+        original_window = driver.current_window_handle
+        new_window = None
+        detail_fetch_error = None  # Track non-fatal errors for this property
+
+        try:
+            self.pacer.acquire()
+            request_start = time.time()
+            phase_start = time.perf_counter()
+            # With lean browsing the tab opens blank and navigates only once
+            # its URL blocking is set, since blocking does not carry over tabs.
+            blocking = bool(getattr(driver, "blocked_url_patterns", None))
+            driver.execute_script(
+                "window.open(arguments[0]);",
+                "about:blank" if blocking else property_data["detail_url"],
+            )
+            WebDriverWait(driver, 10).until(
+                EC.number_of_windows_to_be(len(driver.window_handles))
+            )
+            new_window_handle = [
+                w for w in driver.window_handles if w != original_window
+            ]
+            if not new_window_handle:
+                raise Exception("New window did not open.")
+            new_window = new_window_handle[0]
+            driver.switch_to.window(new_window)
+            if blocking:
+                block_resources_in_tab(driver)
+                try:
+                    driver.get(property_data["detail_url"])
+                except TimeoutException:
+                    pass  # The marker wait below decides whether the page is usable.
+            self.metrics.observe(
+                "detail_tab_open",
+                time.perf_counter() - phase_start,
+                property_id=property_data["id"],
+            )
+            phase_start = time.perf_counter()
+
+            detail_page_marker_selector = "._2uQQ3SV0eMHL1P6t5ZDo2q"
+            marker_missing = False
+            try:
+                WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, detail_page_marker_selector)
+                    )
+                )
+            except TimeoutException:
+                marker_missing = True
+                print(
+                    f"   Warning: Detail page marker '{detail_page_marker_selector}' not found for {property_data['id']}.",
+                    file=sys.stderr,
+                )
+            # A missing marker usually means a block/interstitial page: back off.
+            self.pacer.record(time.time() - request_start, error=marker_missing)
+            self.metrics.observe(
+                "detail_marker_wait",
+                time.perf_counter() - phase_start,
+                ok=not marker_missing,
+                property_id=property_data["id"],
+            )
+            self._log_page_weight(driver, "detail")
+            phase_start = time.perf_counter()
+
+            # --- Coordinate Extraction (Primary Goal) ---
+            try:
+                coords = extract_coordinates(driver.page_source)
+                if coords:
+                    property_data["latitude"], property_data["longitude"] = coords
+            except Exception as e_coords:
+                print(
+                    f"    Error extracting coordinates: {e_coords}",
+                    file=sys.stderr,
+                )
+                detail_fetch_error = f"Coord error: {e_coords}"  # Log non-fatal error
+
+            # --- SqFt / Type Extraction (Secondary) ---
+            if (
+                not detail_fetch_error
+            ):  # Only attempt if coordinate extraction didn't already fail critically
+                try:  # SqFt
+                    sqft_element = driver.find_element(By.XPATH, SQFT_XPATH)
+                    property_data["square_footage"] = format_square_footage(
+                        sqft_element.text.strip()
+                    )
+                except NoSuchElementException:
+                    pass
+                except Exception as e_sqft:
+                    print(
+                        f"    Error extracting sqft: {e_sqft}", file=sys.stderr
+                    )  # Log non-fatal
+
+                try:  # Type
+                    try:
+                        prop_elem = driver.find_element(
+                            By.CSS_SELECTOR, f"p.{PROPERTY_TYPE_CLASS}"
+                        )
+                        property_data["property_type"] = prop_elem.text.strip()
+                    except NoSuchElementException:
+                        found_type = None
+                        for tag_name in ["h1", "h2", "div", "p"]:
+                            elements = driver.find_elements(By.TAG_NAME, tag_name)
+                            for elem in elements:
+                                try:
+                                    found_type = match_known_property_type(elem.text)
+                                except Exception:
+                                    continue
+                                if found_type:
+                                    property_data["property_type"] = found_type
+                                    break
+                            if found_type:
+                                break
+                except Exception as e_prop:
+                    print(
+                        f"    Error extracting property type: {e_prop}",
+                        file=sys.stderr,
+                    )  # Log non-fatal
+            self.metrics.observe(
+                "detail_extraction",
+                time.perf_counter() - phase_start,
+                ok=detail_fetch_error is None,
+                property_id=property_data["id"],
+            )
+
+        except (
+            TimeoutException,
+            NoSuchWindowException,
+            WebDriverException,
+            Exception,
+        ) as e_detail:
+            # Handle potentially fatal errors during tab management/loading
+            self.pacer.record(0.0, error=True)
+            print(
+                f"   Error during detail fetch for {property_data['id']}: {type(e_detail).__name__} - {e_detail}",
+                file=sys.stderr,
+            )
+            detail_fetch_error = f"Fetch error: {type(e_detail).__name__}"  # Store generic error type
+            # Check if it's a session-killing error; the caller decides whether
+            # that aborts the run (main driver) or just this card (worker driver).
+            if is_session_dead_error(e_detail):
+                print(
+                    "!!! FATAL WebDriverException detected (session is dead).",
+                    file=sys.stderr,
+                )
+                raise
+            if isinstance(e_detail, NoSuchWindowException):
+                new_window = None  # Window is gone
+        finally:
+            # --- Careful cleanup (same as before) ---
+            try:
+                current_handles_before_close = driver.window_handles
+                if new_window and new_window in current_handles_before_close:
+                    driver.close()
+                current_handles_after_close = driver.window_handles
+                if original_window in current_handles_after_close:
+                    driver.switch_to.window(original_window)
+                elif current_handles_after_close:
+                    driver.switch_to.window(current_handles_after_close[0])
+                # Don't raise fatal error here if already handled or window gone
+            except (NoSuchWindowException, WebDriverException) as e_cleanup:
+                print(
+                    f"   Non-critical error during window cleanup for {property_data['id']}: {e_cleanup}",
+                    file=sys.stderr,
+                )
+                # If session dies here, the outer loop will catch it next iteration
+
+        return detail_fetch_error
+
+    NEXT_BUTTON_LOCATOR = (
+        By.CSS_SELECTOR,
+        "button.pagination-button.pagination-direction.pagination-direction--next",
+    )
+
+    def is_last_page(self, page, timeout=5):
+        """True (and remembered for incremental runs) if page `page` has no usable 'next' button."""
+        try:
+            next_button_present = WebDriverWait(self.driver, timeout).until(
+                EC.presence_of_element_located(self.NEXT_BUTTON_LOCATOR)
+            )
+            if next_button_present.get_attribute(
+                "disabled"
+            ) or "disabled" in next_button_present.get_attribute("class", ""):
+                print("Next button is disabled. Reached end.", file=sys.stderr)
+                self._reached_last_page = True
+                return True
+        except TimeoutException:
+            print(
+                f"No 'next' button found on page {page}. Assuming end.",
+                file=sys.stderr,
+            )
+            self._reached_last_page = True
+            return True
+        return False
+
+    def go_to_next_page(self, page):
+        """Clicks 'next' on results page `page`; False once there is no next page."""
+        next_button_locator = self.NEXT_BUTTON_LOCATOR
+        if self.is_last_page(page):
+            return False
+
+        with self.paced_request(), self.metrics.phase("results_load", page=page + 1):
+            if not self.robust_click(next_button_locator, timeout=10):
+                print(
+                    "Failed to click next button after retries. Assuming end.",
+                    file=sys.stderr,
+                )
+                return False
+
+            results_price_locator = (
+                By.CSS_SELECTOR,
+                ".PropertyPrice_price__VL65t",
+            )
+            WebDriverWait(self.driver, 15).until(
+                EC.presence_of_element_located(results_price_locator)
+            )
+        return True
+
+    def _skip_to_resume_page(self):
+        """On resume, clicks through to the page the checkpoint stopped on; returns the page reached.
+
+        Earlier pages were fully emitted before, so they are not parsed again.
+        """
+        if self.checkpoint is None:
+            return 1
+        target_page = min(self.checkpoint.resume_page(self.search_postcode), self.max_pages)
+        page = 1
+        while page < target_page:
+            if not self.go_to_next_page(page):
+                break
+            page += 1
+        if page > 1:
+            self._skipped_pages = True
+            print(f"Resume: continuing from results page {page}.", file=sys.stderr)
+        return page
 
     # --- Run method MODIFIED for SSE output ---
-    def run(self):
+    def run(self, final_status=True):
+        """Scrapes the search term and streams results.
+
+        Returns the script-level error message, or None. With
+        final_status=False (batch runs) the closing complete/no_results
+        messages are left to the caller.
+        """
         print("Starting scraper run...", file=sys.stderr)
+        if self.checkpoint is not None and self.checkpoint.term_done(self.search_postcode):
+            print(
+                f"Resume: {self.search_postcode} already finished in run {self.checkpoint.run_id}.",
+                file=sys.stderr,
+            )
+            self.close_driver()
+            if final_status:
+                print_sse_json({"status": "complete"})
+            return None
         script_error = None  # For storing script-level errors (navigation, pagination)
         start_time = time.time()
         try:
-            if self.search_by_postcode():
-                print("\nProcessing page 1...", file=sys.stderr)
-                html = self.driver.page_source
-                self.parse(html)  # Prints results as they are found
-
-                max_pages = 1
-                for page in range(1, max_pages):
-                    print(f"\nChecking for page {page + 1}...", file=sys.stderr)
-                    try:
-                        next_button_locator = (
-                            By.CSS_SELECTOR,
-                            "button.pagination-button.pagination-direction.pagination-direction--next",
-                        )
+            search_ok = self.search_by_postcode()
+            if (
+                not search_ok
+                and not is_driver_alive(self.driver)
+                and self._recover_driver("initial search")
+            ):
+                search_ok = self.search_by_postcode()
+            if search_ok:
+                page = self._skip_to_resume_page()
+                self.current_page = page
+                self._remember_results_url()
+                print(f"\nProcessing page {page}...", file=sys.stderr)
+                self._log_page_weight(self.driver, "results")
+                pending = self.start_page(
+                    self._with_recovery(lambda: self.driver.page_source, f"reading page {page}")
+                )
+
+                # Pipelined pagination: while page N's detail fetches are still
+                # running, the main driver already loads page N+1.
+                while pending is not None:
+                    next_page_ready = False
+                    if page < self.max_pages and not self._max_results_reached():
+                        print(f"\nChecking for page {page + 1}...", file=sys.stderr)
                         try:
-                            next_button_present = WebDriverWait(self.driver, 5).until(
-                                EC.presence_of_element_located(next_button_locator)
+                            next_page_ready = self._with_recovery(
+                                lambda: self.go_to_next_page(page),
+                                f"moving to page {page + 1}",
                             )
-                            if next_button_present.get_attribute(
-                                "disabled"
-                            ) or "disabled" in next_button_present.get_attribute(
-                                "class", ""
-                            ):
-                                print(
-                                    "Next button is disabled. Reached end.",
-                                    file=sys.stderr,
-                                )
-                                break
-                        except TimeoutException:
+                            if next_page_ready:
+                                self._remember_results_url()
+                        except Exception as e:
+                            # Store the error, log it, and stop paginating
+                            script_error = f"Error on page {page + 1}: {str(e)}"
                             print(
-                                f"No 'next' button found on page {page + 1}. Assuming end.",
+                                f"Error navigating to page {page + 1}: {e}",
                                 file=sys.stderr,
                             )
-                            break
+                            traceback.print_exc(file=sys.stderr)
+                    elif self.snapshots is not None and not self._max_results_reached():
+                        # Removals are only reported when the crawl covered every page.
+                        try:
+                            self.is_last_page(page, timeout=2)
+                        except Exception as e:
+                            print(f"Could not check for a next page: {e}", file=sys.stderr)
 
-                        if not self.robust_click(next_button_locator, timeout=10):
+                    self.finish_page(pending)
+                    pending = None
+                    if self.checkpoint is not None:
+                        try:
+                            self.checkpoint.flush()
+                        except Exception as e_checkpoint:
                             print(
-                                "Failed to click next button after retries. Assuming end.",
+                                f"Warning: Checkpoint write failed: {e_checkpoint}",
                                 file=sys.stderr,
                             )
-                            break
 
-                        results_price_locator = (
-                            By.CSS_SELECTOR,
-                            ".PropertyPrice_price__VL65t",
-                        )
-                        WebDriverWait(self.driver, 15).until(
-                            EC.presence_of_element_located(results_price_locator)
-                        )
-                        time.sleep(random.uniform(0.7, 1.5))
-
-                        print(f"Processing page {page + 1}...", file=sys.stderr)
-                        html = self.driver.page_source
-                        self.parse(html)  # Prints results as they are found
-
-                    except Exception as e:
-                        # Store the error, log it, and break pagination
-                        script_error = f"Error on page {page + 1}: {str(e)}"
-                        print(
-                            f"Error navigating to or parsing page {page + 1}: {e}",
-                            file=sys.stderr,
-                        )
-                        traceback.print_exc(file=sys.stderr)
-                        break
+                    if next_page_ready and not self._max_results_reached():
+                        page += 1
+                        self.current_page = page
+                        print(f"Processing page {page}...", file=sys.stderr)
+                        try:
+                            self._log_page_weight(self.driver, "results")
+                            pending = self.start_page(
+                                self._with_recovery(
+                                    lambda: self.driver.page_source, f"reading page {page}"
+                                )
+                            )
+                        except WebDriverException:
+                            raise
+                        except Exception as e:
+                            script_error = f"Error on page {page}: {str(e)}"
+                            print(
+                                f"Error parsing page {page}: {e}", file=sys.stderr
+                            )
+                            traceback.print_exc(file=sys.stderr)
             else:
                 script_error = "Failed during initial search setup."
                 print(f"Script Error: {script_error}", file=sys.stderr)
@@ -1482,15 +2289,56 @@ class RightmoveScraper:
         finally:
             run_duration = time.time() - start_time
             print(f"Total run time: {run_duration:.2f} seconds", file=sys.stderr)
+            self.metrics.observe("run_total", run_duration, search_term=self.search_postcode)
+            if self._owns_metrics:
+                print(self.metrics.summary(), file=sys.stderr)
+            if self.detail_cache is not None:
+                print(self.detail_cache.summary(), file=sys.stderr)
+            self.pacer.log_summary()
+            print(self.recovery_summary(), file=sys.stderr)
+            if self.measure_page_weights:
+                print(self.page_weight_summary(), file=sys.stderr)
+            if self.http_fetcher is not None:
+                self.http_fetcher.close()
+            if self.detail_executor is not None:
+                self.detail_executor.shutdown(wait=True)
+            if self.detail_pool is not None:
+                self.detail_pool.close()
+            if self.supervisor is not None:
+                self.supervisor.close()
             self.close_driver()
+            self._flush_metric_events()
+            if self.snapshots is not None:
+                try:
+                    self._finish_incremental(script_error)
+                except Exception as e_snapshot:
+                    print(f"Warning: Incremental summary failed: {e_snapshot}", file=sys.stderr)
+
+            if self.checkpoint is not None and not script_error:
+                try:
+                    self.checkpoint.mark_term_done(self.search_postcode)
+                    if final_status:
+                        self.checkpoint.mark_completed()
+                except Exception as e_checkpoint:
+                    print(f"Warning: Checkpoint write failed: {e_checkpoint}", file=sys.stderr)
+            elif self.checkpoint is not None:
+                try:
+                    self.checkpoint.flush()
+                except Exception as e_checkpoint:
+                    print(f"Warning: Checkpoint write failed: {e_checkpoint}", file=sys.stderr)
+
+            if final_status and self.tile_precision and self.spatial_index is not None:
+                self.emit_tiles()
 
             # --- Final SSE Message ---
-            if script_error:
+            if not final_status:
+                pass
+            elif script_error:
                 # Error message should have been sent when the error occurred
                 print(f"Scraping finished with error: {script_error}", file=sys.stderr)
                 # Optionally send a final 'error-complete' status? For now, rely on the error message itself.
                 # print_sse_json({"status": "error", "message": script_error}) # Example
-            elif self.processed_properties_count == 0:
+            elif self.processed_properties_count == 0 and not self._seen_ids:
                 # No errors, but also no properties found/processed
                 print(
                     "Scraping finished. No properties found or processed.",
@@ -1505,14 +2353,319 @@ class RightmoveScraper:
                     file=sys.stderr,
                 )
                 print_sse_json({"status": "complete"})  # Send completion signal
+        return script_error
+
+
+def emit_tiles(spatial_index, precision, **fields):
+    """Prints the index's grid aggregation as one {"tiles": [...]} record."""
+    tiles = spatial_index.grid(precision)
+    print(
+        f"Aggregated {len(spatial_index)} located listings into {len(tiles)} tiles "
+        f"(geohash precision {precision}).",
+        file=sys.stderr,
+    )
+    print_sse_json({"tiles": tiles, "precision": precision, **fields})
+
+
+def run_batch(postcodes, driver=None, **scraper_options):
+    """Scrapes many postcodes over one shared driver, one search per unique search term.
+
+    Records are tagged with every input postcode they answer ("postcodes"),
+    each search term ends with a "search_term_complete" status, and a single
+    complete/no_results closes the batch. A `driver` passed in (e.g. a daemon
+    pool session) is used but not quit; one started here is.
+    """
+    groups = group_postcodes_by_search_term(postcodes)
+    print(
+        f"Batch of {sum(len(m) for m in groups.values())} postcodes collapsed to "
+        f"{len(groups)} search terms: {', '.join(groups)}",
+        file=sys.stderr,
+    )
+    lean = scraper_options.get("lean_browsing", False)
+    metrics = scraper_options.setdefault("metrics", RunMetrics())
+    tile_precision = scraper_options.get("tile_precision")
+    if tile_precision and scraper_options.get("spatial_index") is None:
+        scraper_options["spatial_index"] = SpatialIndex()
+    owns_driver = driver is None
+    if owns_driver:
+        try:
+            started = time.perf_counter()
+            with metrics.phase("driver_startup"):
+                driver = create_driver(lean=lean)
+            STARTUP_TIMINGS.setdefault("driver_startup", time.perf_counter() - started)
+        except Exception as e:
+            print_sse_json({"error": f"Failed to initialize WebDriver: {str(e)}"})
+            traceback.print_exc(file=sys.stderr)
+            sys.exit(1)
+
+    checkpoint = scraper_options.get("checkpoint")
+    total_processed = 0
+    failed = False
+    try:
+        for search_term, members in groups.items():
+            if not is_driver_alive(driver):
+                print("Shared WebDriver died; starting a new one.", file=sys.stderr)
+                if owns_driver:
+                    quit_driver(driver)
+                with metrics.phase("driver_startup"):
+                    driver = create_driver(lean=lean)
+                owns_driver = True
+            scraper = RightmoveScraper(
+                postcode=members[0], driver=driver, postcodes=members, **scraper_options
+            )
+            script_error = scraper.run(final_status=False)
+            total_processed += scraper.processed_properties_count
+            status = {
+                "status": "search_term_complete",
+                "search_term": search_term,
+                "postcodes": members,
+                "count": scraper.processed_properties_count,
+            }
+            if script_error:
+                failed = True
+                status["failed"] = True
+                status["message"] = script_error
+            print_sse_json(status)
+    finally:
+        if owns_driver:
+            quit_driver(driver)
+
+    if checkpoint is not None and not failed:
+        checkpoint.mark_completed()
+    if tile_precision:
+        emit_tiles(scraper_options["spatial_index"], tile_precision, postcodes=list(groups))
+
+    if total_processed == 0:
+        print_sse_json({"status": "no_results"})
+    print_sse_json({"status": "complete"})
+
+
+def read_postcodes_file(path):
+    """One postcode per line (commas also accepted); blank lines and '#' comments ignored."""
+    postcodes = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            postcodes.extend(p for p in line.split(",") if p.strip())
+    return postcodes
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Scrape Rightmove for a given postcode."
     )
-    parser.add_argument("--postcode", required=True, help="UK postcode to search for.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--postcode", help="UK postcode to search for.")
+    target.add_argument(
+        "--postcodes",
+        nargs="+",
+        metavar="POSTCODE",
+        help="Batch mode: several postcodes, deduplicated by search term.",
+    )
+    target.add_argument(
+        "--postcodes-file",
+        help="Batch mode: file with one postcode per line.",
+    )
+    target.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Continue an interrupted run from its checkpoint (same postcodes and crawl options, no re-fetching).",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default=DEFAULT_CHECKPOINT_DIR,
+        help="Directory holding run checkpoints.",
+    )
+    parser.add_argument(
+        "--detail-engine",
+        choices=["selenium", "http"],
+        default="selenium",
+        help="How to fetch detail pages: browser tabs or pooled HTTP requests.",
+    )
+    parser.add_argument(
+        "--http-workers",
+        type=int,
+        default=8,
+        help="Concurrent detail requests for --detail-engine http.",
+    )
+    parser.add_argument(
+        "--detail-workers",
+        type=int,
+        default=0,
+        help="Extra Chrome sessions fetching detail pages in parallel (selenium engine; 0 = sequential tabs).",
+    )
+    parser.add_argument(
+        "--cache-path",
+        default=DEFAULT_CACHE_PATH,
+        help="SQLite file caching detail fields by property id and search locations.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the detail and location caches.",
+    )
+    parser.add_argument(
+        "--extraction",
+        choices=["auto", "dom"],
+        default="auto",
+        help="'auto' uses the results page's embedded JSON and skips detail pages when it can.",
+    )
+    parser.add_argument(
+        "--pace",
+        choices=sorted(PACING_POLICIES),
+        default=DEFAULT_POLICY,
+        help="Request pacing policy (throughput vs politeness).",
+    )
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        default=1,
+        help="Results pages to crawl (about 25 listings each).",
+    )
+    parser.add_argument(
+        "--max-results",
+        type=int,
+        default=None,
+        help="Stop after this many listings.",
+    )
+    parser.add_argument(
+        "--lean-browsing",
+        action="store_true",
+        help="Eager page loads without images, fonts, media or ad/analytics requests.",
+    )
+    parser.add_argument(
+        "--measure-page-weight",
+        action="store_true",
+        help="Log bytes and load time per page (always on with --lean-browsing).",
+    )
+    parser.add_argument(
+        "--max-recoveries",
+        type=int,
+        default=3,
+        help="Replace a crashed Chrome session up to this many times per search (0 = abort).",
+    )
+    parser.add_argument(
+        "--record-format",
+        choices=["legacy", "typed"],
+        default="legacy",
+        help="'typed' emits numeric price/beds/baths/floor area and float coordinates, null when missing.",
+    )
+    parser.add_argument(
+        "--keep-raw",
+        action="store_true",
+        help="With --record-format typed, also include the original display strings under 'raw'.",
+    )
+    parser.add_argument(
+        "--tiles",
+        type=int,
+        metavar="PRECISION",
+        help="End with pre-aggregated map tiles (count, median price) per geohash cell of this precision (4-6).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Emit only new, price-changed, changed and (after a full crawl) removed listings.",
+    )
+    parser.add_argument(
+        "--no-metric-events",
+        action="store_true",
+        help="Keep phase timings on stderr instead of emitting {\"metric\": ...} records.",
+    )
+    parser.add_argument(
+        "--prometheus-file",
+        metavar="PATH",
+        help="Write phase timing histograms in Prometheus text format ('-' for stderr).",
+    )
     args = parser.parse_args()
 
-    scraper = RightmoveScraper(postcode=args.postcode)
-    scraper.run()
+    if args.resume:
+        try:
+            checkpoint = RunCheckpoint.load(args.resume, args.checkpoint_dir)
+        except FileNotFoundError:
+            print_sse_json(
+                {"error": f"Cannot resume run {args.resume}: no checkpoint (finished or expired)."}
+            )
+            sys.exit(1)
+        except (OSError, ValueError) as e:
+            print_sse_json({"error": f"Cannot resume run {args.resume}: {e}"})
+            sys.exit(1)
+        target = checkpoint.target
+        # The resumed run crawls with the options it was started with.
+        for option, value in checkpoint.options.items():
+            if getattr(args, option) != value:
+                print(f"Resume: using saved {option}={value!r}.", file=sys.stderr)
+                setattr(args, option, value)
+    else:
+        if args.postcode:
+            target = {"postcode": args.postcode}
+        else:
+            target = {"postcodes": args.postcodes or read_postcodes_file(args.postcodes_file)}
+        prune_checkpoints(args.checkpoint_dir)
+        checkpoint = RunCheckpoint(
+            directory=args.checkpoint_dir,
+            target=target,
+            options={option: getattr(args, option) for option in RESUME_OPTIONS},
+        )
+    print(
+        f"Run id: {checkpoint.run_id} (continue with --resume {checkpoint.run_id})",
+        file=sys.stderr,
+    )
+
+    detail_cache = None
+    location_cache = None
+    page_weight_log = None
+    snapshots = None
+    if args.incremental and args.no_cache:
+        parser.error("--incremental keeps its snapshots in the cache; drop --no-cache.")
+    if not args.no_cache:
+        try:
+            detail_cache = ListingCache(args.cache_path)
+            location_cache = LocationCache(args.cache_path)
+            page_weight_log = PageWeightLog(args.cache_path)
+            if args.incremental:
+                snapshots = SnapshotStore(args.cache_path)
+        except Exception as e:
+            print(f"Warning: Scraper caches disabled ({e}).", file=sys.stderr)
+
+    scraper_options = dict(
+        detail_engine=args.detail_engine,
+        http_workers=args.http_workers,
+        detail_workers=args.detail_workers,
+        detail_cache=detail_cache,
+        extraction=args.extraction,
+        location_cache=location_cache,
+        pace=args.pace,
+        max_pages=args.max_pages,
+        max_results=args.max_results,
+        lean_browsing=args.lean_browsing,
+        measure_page_weights=args.measure_page_weight,
+        page_weight_log=page_weight_log,
+        metrics=RunMetrics(emit_events=not args.no_metric_events),
+        snapshots=snapshots,
+        max_recoveries=args.max_recoveries,
+        record_format=args.record_format,
+        keep_raw=args.keep_raw,
+        tile_precision=args.tiles,
+    )
+    scraper_options["checkpoint"] = checkpoint
+
+    with sse_output(checkpoint=checkpoint):
+        if checkpoint.completed:
+            print(f"Run {checkpoint.run_id} already completed.", file=sys.stderr)
+            print_sse_json({"status": "complete"})
+        elif target.get("postcode"):
+            scraper = RightmoveScraper(postcode=target["postcode"], **scraper_options)
+            scraper.run()
+        else:
+            run_batch(target.get("postcodes", []), **scraper_options)
+
+    metrics = scraper_options["metrics"]
+    print(metrics.summary(), file=sys.stderr)
+    if args.prometheus_file:
+        try:
+            metrics.write_prometheus(args.prometheus_file)
+        except OSError as e:
+            print(f"Warning: Could not write metrics file: {e}", file=sys.stderr)
+    for cache in (detail_cache, location_cache, page_weight_log, snapshots):
+        if cache is not None:
+            cache.close()
@@ -0,0 +1,312 @@
+# /server/scrapers/scrape_daemon.py
+# Long-lived scraper process. Keeps a pool of pre-warmed Chrome sessions so a
+# postcode job no longer pays for chromedriver resolution and a cold browser.
+#
+# Protocol (JSON lines, same records scrape.py prints for SSE):
+#   in:  {"id": "job-1", "postcode": "TS178BT", "detail_engine": "http"}
+#        {"id": "job-2", "resume": "<run_id>"}  (continue an interrupted run)
+#        {"op": "ping"} | {"op": "shutdown"}
+#        {"op": "radius", "lat": 54.56, "lon": -1.31, "km": 2}
+#        {"op": "bbox", "south": .., "west": .., "north": .., "east": ..}
+#        {"op": "grid", "precision": 5, "bbox": [s, w, n, e]}  (bbox optional)
+#   out: every record scrape.py would print, with "job_id" added. A job ends
+#        with its {"status": "complete"} / {"status": "no_results"} line, or
+#        an {"error": ...} line if the scrape could not run. Queries run over
+#        every listing scraped since start and answer {"query": op, ...}.
+#
+# Jobs are read from stdin by default, or from TCP connections with --listen.
+
+from concurrent.futures import ThreadPoolExecutor
+from driver_pool import DriverPool, is_driver_alive
+from listing_cache import (
+    DEFAULT_CACHE_PATH,
+    ListingCache,
+    LocationCache,
+    PageWeightLog,
+    SnapshotStore,
+)
+from rate_limiter import DEFAULT_POLICY
+from run_checkpoint import (
+    DEFAULT_CHECKPOINT_DIR,
+    RESUME_OPTIONS,
+    RunCheckpoint,
+    prune_checkpoints,
+)
+from scrape import RightmoveScraper, print_sse_json, run_batch, sse_output
+from spatial_index import SpatialIndex
+import argparse
+import itertools
+import json
+import socketserver
+import sys
+import threading
+import traceback
+
+_job_counter = itertools.count(1)
+# Every listing any job has emitted, for the radius/bbox/grid query ops.
+listing_index = SpatialIndex()
+
+
+def run_job(pool, job, stream=None):
+    """Runs one postcode job on a pooled session, writing its records to `stream`.
+
+    A resumed run crawls the checkpoint's target, which may be a CLI batch.
+    """
+    job_id = job.get("id") or f"job-{next(_job_counter)}"
+    checkpoint_dir = job.get("checkpoint_dir") or DEFAULT_CHECKPOINT_DIR
+    try:
+        if job.get("resume"):
+            checkpoint = RunCheckpoint.load(job["resume"], checkpoint_dir)
+            # Crawl with the options the run was started with.
+            job = {**job, **checkpoint.options}
+        else:
+            prune_checkpoints(checkpoint_dir)
+            checkpoint = RunCheckpoint(
+                directory=checkpoint_dir,
+                target={"postcode": job.get("postcode")},
+                options={option: job[option] for option in RESUME_OPTIONS if option in job},
+            )
+    except FileNotFoundError:
+        with sse_output(stream=stream, job_id=job_id):
+            print_sse_json(
+                {"error": f"Cannot resume run {job['resume']}: no checkpoint (finished or expired)."}
+            )
+        return
+    except (OSError, ValueError) as e:
+        with sse_output(stream=stream, job_id=job_id):
+            print_sse_json({"error": f"Cannot resume run {job['resume']}: {e}"})
+        return
+    postcode = checkpoint.target.get("postcode")
+    batch = checkpoint.target.get("postcodes")
+    with sse_output(stream=stream, job_id=job_id, checkpoint=checkpoint):
+        if not postcode and not batch:
+            print_sse_json({"error": "Job is missing 'postcode'."})
+            return
+        try:
+            session = pool.acquire()
+        except Exception as e:
+            print_sse_json({"error": f"No WebDriver session available: {e}"})
+            traceback.print_exc(file=sys.stderr)
+            return
+
+        detail_cache = None
+        location_cache = None
+        page_weight_log = None
+        snapshots = None
+        try:
+            if job.get("cache", True):
+                cache_path = job.get("cache_path") or DEFAULT_CACHE_PATH
+                detail_cache = ListingCache(cache_path)
+                location_cache = LocationCache(cache_path)
+                page_weight_log = PageWeightLog(cache_path)
+                if job.get("incremental"):
+                    snapshots = SnapshotStore(cache_path)
+            print(
+                f"[{job_id}] Running on pool session {session.session_no} "
+                f"(job {session.jobs_done + 1}/{pool.max_jobs_per_session}).",
+                file=sys.stderr,
+            )
+            scraper_options = dict(
+                detail_engine=job.get("detail_engine", "selenium"),
+                http_workers=job.get("http_workers", 8),
+                detail_workers=job.get("detail_workers", 0),
+                detail_cache=detail_cache,
+                extraction=job.get("extraction", "auto"),
+                location_cache=location_cache,
+                pace=job.get("pace", DEFAULT_POLICY),
+                max_pages=job.get("max_pages", 1),
+                max_results=job.get("max_results"),
+                lean_browsing=pool.lean,
+                measure_page_weights=job.get("measure_page_weight", False),
+                page_weight_log=page_weight_log,
+                checkpoint=checkpoint,
+                metric_events=job.get("metric_events", True),
+                snapshots=snapshots,
+                max_recoveries=job.get("max_recoveries", 3),
+                record_format=job.get("record_format", "legacy"),
+                keep_raw=job.get("keep_raw", False),
+                tile_precision=job.get("tiles"),
+                shared_index=listing_index,
+            )
+            if batch:
+                run_batch(batch, driver=session.driver, **scraper_options)
+            else:
+                RightmoveScraper(postcode=postcode, driver=session.driver, **scraper_options).run()
+        except Exception as e:
+            print_sse_json({"error": f"Scrape job failed: {e}"})
+            traceback.print_exc(file=sys.stderr)
+        finally:
+            for cache in (detail_cache, location_cache, page_weight_log, snapshots):
+                if cache is not None:
+                    cache.close()
+            pool.release(session, healthy=is_driver_alive(session.driver))
+
+
+def run_query(job):
+    """Answers a radius/bbox/grid query from listing_index."""
+    op = job["op"]
+    try:
+        if op == "radius":
+            results = listing_index.radius(
+                float(job["lat"]), float(job["lon"]), float(job.get("km", 1.0))
+            )
+            return {"query": op, "count": len(results), "results": results}
+        if op == "bbox":
+            results = listing_index.bbox(
+                float(job["south"]), float(job["west"]), float(job["north"]), float(job["east"])
+            )
+            return {"query": op, "count": len(results), "results": results}
+        precision = int(job.get("precision", 5))
+        bbox = job.get("bbox")
+        tiles = listing_index.grid(precision, [float(v) for v in bbox] if bbox else None)
+        return {"query": op, "precision": precision, "tiles": tiles}
+    except (KeyError, TypeError, ValueError) as e:
+        return {"error": f"Bad {op} query: {type(e).__name__} - {e}"}
+
+
+def handle_line(line, pool, executor, stream=None):
+    """Dispatches one input line. Returns False when the daemon should stop."""
+    line = line.strip()
+    if not line:
+        return True
+    try:
+        job = json.loads(line)
+        if not isinstance(job, dict):
+            raise ValueError("expected a JSON object")
+    except ValueError as e:
+        with sse_output(stream=stream):
+            print_sse_json({"error": f"Invalid job line: {e}"})
+        return True
+
+    op = job.get("op", "scrape")
+    if op == "ping":
+        with sse_output(stream=stream, job_id=job.get("id")):
+            print_sse_json({"status": "pong"})
+        return True
+    if op == "shutdown":
+        return False
+    if op in ("radius", "bbox", "grid"):
+        with sse_output(stream=stream, job_id=job.get("id")):
+            print_sse_json(run_query(job))
+        return True
+    if op != "scrape":
+        with sse_output(stream=stream, job_id=job.get("id")):
+            print_sse_json({"error": f"Unknown op: {op}"})
+        return True
+
+    executor.submit(run_job, pool, job, stream)
+    return True
+
+
+def serve_stdin(pool, executor):
+    print("Scraper daemon reading jobs from stdin.", file=sys.stderr)
+    print_sse_json({"status": "ready"})
+    for line in sys.stdin:
+        if not handle_line(line, pool, executor):
+            break
+
+
+def serve_socket(pool, executor, host, port):
+    stop = threading.Event()
+
+    class JobHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            stream = _SocketTextWriter(self.wfile)
+            with sse_output(stream=stream):
+                print_sse_json({"status": "ready"})
+            futures = []
+            for raw in self.rfile:
+                line = raw.decode("utf-8", errors="replace")
+                if not line.strip():
+                    continue
+                # Run jobs of one connection through the shared executor and
+                # keep the connection open until all of them have finished.
+                try:
+                    job = json.loads(line)
+                except ValueError:
+                    job = None
+                if isinstance(job, dict) and job.get("op", "scrape") == "scrape":
+                    futures.append(executor.submit(run_job, pool, job, stream))
+                elif not handle_line(line, pool, executor, stream):
+                    stop.set()
+                    break
+            for future in futures:
+                future.result()
+
+    class Server(socketserver.ThreadingTCPServer):
+        allow_reuse_address = True
+        daemon_threads = True
+
+    with Server((host, port), JobHandler) as server:
+        print(f"Scraper daemon listening on {host}:{port}.", file=sys.stderr)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            stop.wait()
+        except KeyboardInterrupt:
+            pass
+        server.shutdown()
+
+
+class _SocketTextWriter:
+    """Minimal text stream over a socket's binary write file for print()."""
+
+    def __init__(self, wfile):
+        self._wfile = wfile
+
+    def write(self, text):
+        self._wfile.write(text.encode("utf-8"))
+        return len(text)
+
+    def flush(self):
+        self._wfile.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run the Rightmove scraper as a long-lived daemon with pre-warmed browsers."
+    )
+    parser.add_argument(
+        "--pool-size", type=int, default=2, help="Number of Chrome sessions to keep warm."
+    )
+    parser.add_argument(
+        "--max-jobs-per-session",
+        type=int,
+        default=20,
+        help="Recycle a Chrome session after this many jobs.",
+    )
+    parser.add_argument(
+        "--listen",
+        metavar="HOST:PORT",
+        help="Accept jobs over TCP instead of stdin (e.g. 127.0.0.1:8765).",
+    )
+    parser.add_argument(
+        "--lean-browsing",
+        action="store_true",
+        help="Pooled sessions load pages eagerly without images, fonts, media or trackers.",
+    )
+    args = parser.parse_args()
+
+    pool = DriverPool(
+        size=args.pool_size,
+        max_jobs_per_session=args.max_jobs_per_session,
+        lean=args.lean_browsing,
+    )
+    try:
+        pool.start()
+    except Exception as e:
+        print_sse_json({"error": f"Failed to start driver pool: {e}"})
+        traceback.print_exc(file=sys.stderr)
+        sys.exit(1)
+
+    executor = ThreadPoolExecutor(max_workers=args.pool_size)
+    try:
+        if args.listen:
+            host, _, port = args.listen.rpartition(":")
+            serve_socket(pool, executor, host or "127.0.0.1", int(port))
+        else:
+            serve_stdin(pool, executor)
+    finally:
+        executor.shutdown(wait=True)
+        pool.close()
+        print("Scraper daemon stopped.", file=sys.stderr)
@@ -0,0 +1,203 @@
+# /server/scrapers/spatial_index.py
+# In-memory spatial index over scraped listings: geohash buckets answering
+# radius and bounding-box queries, and grid aggregation (count and median
+# price per geohash cell) so clients can draw heatmaps from tiles instead of
+# every raw point.
+
+from records import parse_coordinate, parse_price
+import math
+import statistics
+import threading
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_BASE32_INDEX = {char: index for index, char in enumerate(_BASE32)}
+EARTH_RADIUS_KM = 6371.0088
+
+
+def geohash_encode(lat, lon, precision):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # Geohash interleaves bits, starting with longitude.
+    while len(chars) < precision:
+        value_range, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            value_range[0] = mid
+        else:
+            value_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def geohash_bounds(geohash):
+    """Returns (south, west, north, east) of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _BASE32_INDEX[char]
+        for shift in range(4, -1, -1):
+            value_range = lon_range if even else lat_range
+            mid = (value_range[0] + value_range[1]) / 2
+            if (value >> shift) & 1:
+                value_range[0] = mid
+            else:
+                value_range[1] = mid
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a geohash cell at `precision`."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SpatialIndex:
+    """Listings bucketed by geohash. Thread-safe; re-adding an id replaces it.
+
+    Accepts legacy (display-string) and typed records; listings without
+    coordinates are ignored. Only id, position and numeric price are kept.
+    """
+
+    def __init__(self, precision=6):
+        self.precision = precision
+        self._buckets = {}  # geohash -> {property_id: (lat, lon, price)}
+        self._cell_of = {}  # property_id -> geohash
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cell_of)
+
+    def add(self, listing):
+        """Indexes one listing; returns False if it has no usable coordinates."""
+        lat = parse_coordinate(listing.get("latitude"))
+        lon = parse_coordinate(listing.get("longitude"))
+        property_id = listing.get("id")
+        if lat is None or lon is None or not property_id:
+            return False
+        price = parse_price(listing.get("price"))
+        cell = geohash_encode(lat, lon, self.precision)
+        with self._lock:
+            old_cell = self._cell_of.get(property_id)
+            if old_cell is not None:
+                self._buckets[old_cell].pop(property_id, None)
+            self._buckets.setdefault(cell, {})[property_id] = (lat, lon, price)
+            self._cell_of[property_id] = cell
+        return True
+
+    def _cells_covering(self, south, west, north, east):
+        height, width = cell_size(self.precision)
+        cells = set()
+        lat = south
+        while True:
+            lon = west
+            while True:
+                cells.add(geohash_encode(min(lat, 90.0), min(lon, 180.0), self.precision))
+                if lon >= east:
+                    break
+                lon = min(lon + width, east)
+            if lat >= north:
+                break
+            lat = min(lat + height, north)
+        return cells
+
+    def _entries_in(self, south, west, north, east):
+        """(id, lat, lon, price) for every listing in the box, as a list built under the lock."""
+        height, width = cell_size(self.precision)
+        cells_in_box = ((north - south) / height + 2) * ((east - west) / width + 2)
+        with self._lock:
+            if cells_in_box > len(self._buckets):
+                # Big box, few listings: scanning every bucket is cheaper.
+                buckets = list(self._buckets.values())
+            else:
+                covering = self._cells_covering(south, west, north, east)
+                buckets = [self._buckets[cell] for cell in covering if cell in self._buckets]
+            return [
+                (property_id, lat, lon, price)
+                for bucket in buckets
+                for property_id, (lat, lon, price) in bucket.items()
+                if south <= lat <= north and west <= lon <= east
+            ]
+
+    @staticmethod
+    def _as_dict(property_id, lat, lon, price):
+        return {"id": property_id, "latitude": lat, "longitude": lon, "price": price}
+
+    def bbox(self, south, west, north, east):
+        """Listings inside the box, as {"id", "latitude", "longitude", "price"} dicts."""
+        return [self._as_dict(*entry) for entry in self._entries_in(south, west, north, east)]
+
+    def radius(self, lat, lon, radius_km):
+        """Listings within `radius_km`, nearest first, each with "distance_km"."""
+        d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+        d_lon = min(180.0, d_lat / cos_lat)
+        results = []
+        for property_id, p_lat, p_lon, price in self._entries_in(
+            lat - d_lat, lon - d_lon, lat + d_lat, lon + d_lon
+        ):
+            distance = haversine_km(lat, lon, p_lat, p_lon)
+            if distance <= radius_km:
+                listing = self._as_dict(property_id, p_lat, p_lon, price)
+                listing["distance_km"] = round(distance, 3)
+                results.append(listing)
+        results.sort(key=lambda listing: listing["distance_km"])
+        return results
+
+    def grid(self, precision=5, bbox=None):
+        """Aggregates listings into geohash cells of `precision` (at most the index's).
+
+        Returns one tile per non-empty cell: geohash, centre, bounds
+        [south, west, north, east], count and median price (None if no prices).
+        """
+        precision = min(precision, self.precision)
+        cells = {}
+        if bbox is None:
+            with self._lock:
+                entries = [
+                    (lat, lon, price)
+                    for bucket in self._buckets.values()
+                    for lat, lon, price in bucket.values()
+                ]
+        else:
+            entries = [(lat, lon, price) for _, lat, lon, price in self._entries_in(*bbox)]
+        for lat, lon, price in entries:
+            cell = cells.setdefault(geohash_encode(lat, lon, precision), [0, []])
+            cell[0] += 1
+            if price is not None:
+                cell[1].append(price)
+        tiles = []
+        for geohash, (count, prices) in sorted(cells.items()):
+            south, west, north, east = geohash_bounds(geohash)
+            tiles.append(
+                {
+                    "geohash": geohash,
+                    "latitude": round((south + north) / 2, 6),
+                    "longitude": round((west + east) / 2, 6),
+                    "bounds": [south, west, north, east],
+                    "count": count,
+                    "median_price": statistics.median(prices) if prices else None,
+                }
+            )
+        return tiles
@@ -0,0 +1,93 @@
+# /server/scrapers/tests/test_extractors.py
+# The embedded-JSON results-page paths of extractors.py. The recorded results
+# page has no embedded JSON, so these use small inline pages.
+#
+#   python -m unittest discover server/scrapers/tests
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors import _find_property_list, extract_json_model_cards  # noqa: E402
+
+LISTING = {
+    "id": 123456,
+    "location": {"latitude": 54.567, "longitude": -1.234},
+    "price": {"displayPrices": [{"displayPrice": "£250,000"}]},
+    "displayAddress": "High Street, Middlesbrough",
+    "summary": "A detached house.",
+    "bedrooms": 3,
+    "bathrooms": 2,
+    "displaySize": "1,076 sq ft",
+    "propertySubType": "Detached",
+    "propertyUrl": "/properties/123456#/?channel=RES_BUY",
+}
+STATE = {"props": {"pageProps": {"searchResults": {"properties": [LISTING]}}}}
+
+
+class JsonModelCardsTest(unittest.TestCase):
+    def check_record(self, records):
+        self.assertEqual(len(records), 1)
+        record = records[0]
+        self.assertEqual(record["id"], "rm_123456")
+        self.assertEqual(record["price"], "£250,000")
+        self.assertEqual(record["bedrooms"], "3")
+        self.assertEqual(record["square_footage"], "1076 sq ft")
+        self.assertEqual((record["latitude"], record["longitude"]), ("54.567", "-1.234"))
+        self.assertEqual(
+            record["detail_url"],
+            "https://www.rightmove.co.uk/properties/123456#/?channel=RES_BUY",
+        )
+
+    def test_next_data(self):
+        page = (
+            '<html><body><script id="__NEXT_DATA__" type="application/json">'
+            f"{json.dumps(STATE)}</script></body></html>"
+        )
+        self.check_record(extract_json_model_cards(page))
+
+    def test_window_json_model(self):
+        model = {"properties": [LISTING], "pagination": {"total": 1}}
+        page = f"<script>window.jsonModel = {json.dumps(model)};var x = 1;</script>"
+        self.check_record(extract_json_model_cards(page))
+
+    def test_missing_fields_become_na(self):
+        model = {"properties": [{"id": 7, "location": {}}]}
+        page = f"<script>window.jsonModel = {json.dumps(model)}</script>"
+        record = extract_json_model_cards(page)[0]
+        self.assertEqual(record["id"], "rm_7")
+        self.assertEqual(record["latitude"], "N/A")
+        self.assertEqual(record["detail_url"], "N/A")
+
+    def test_no_usable_model(self):
+        self.assertIsNone(extract_json_model_cards("<html><body>No model</body></html>"))
+        self.assertIsNone(extract_json_model_cards("<script>window.jsonModel = {broken</script>"))
+        page = f"<script>window.jsonModel = {json.dumps({'properties': []})}</script>"
+        self.assertIsNone(extract_json_model_cards(page))
+
+
+class FindPropertyListTest(unittest.TestCase):
+    def test_finds_nested_list(self):
+        self.assertEqual(_find_property_list(STATE), [LISTING])
+        self.assertEqual(_find_property_list([{"a": STATE}]), [LISTING])
+
+    def test_skips_lists_that_are_not_listings(self):
+        state = {
+            "filters": {"properties": [{"id": "type", "label": "Detached"}]},
+            "results": {"properties": [LISTING]},
+        }
+        self.assertEqual(_find_property_list(state), [LISTING])
+        self.assertIsNone(_find_property_list({"properties": ["rm_1", "rm_2"]}))
+
+    def test_depth_limit(self):
+        node = {"properties": [LISTING]}
+        for _ in range(13):
+            node = {"child": node}
+        self.assertIsNone(_find_property_list(node))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# /server/scrapers/tests/test_incremental_resume.py
+# Regression test: --incremental combined with --resume must not report the
+# listings emitted before the resume as removed. Offline, on the recorded
+# results page used by the benchmarks.
+#
+#   python -m unittest discover server/scrapers/tests
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+SCRAPERS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRAPERS_DIR)
+sys.path.insert(0, os.path.join(SCRAPERS_DIR, "benchmarks"))
+
+from bench_scraper import FixtureSession, load_fixtures  # noqa: E402
+from detail_fetcher import HttpDetailFetcher  # noqa: E402
+from listing_cache import SnapshotStore  # noqa: E402
+from run_checkpoint import RunCheckpoint  # noqa: E402
+from scrape import RightmoveScraper, sse_output  # noqa: E402
+
+
+class IncrementalResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.results_page, self.detail_pages = load_fixtures()
+        self.snapshots = SnapshotStore(os.path.join(self.tmp.name, "cache.sqlite"))
+
+    def tearDown(self):
+        self.snapshots.close()
+        self.tmp.cleanup()
+
+    def crawl(self, checkpoint, resume_to_page=None):
+        """One incremental crawl of the fixture page (treated as the last page)."""
+        out = io.StringIO()
+        with sse_output(stream=out, checkpoint=checkpoint), contextlib.redirect_stderr(io.StringIO()):
+            scraper = RightmoveScraper(
+                postcode="TS178BT",
+                driver=object(),
+                detail_engine="http",
+                extraction="dom",
+                metric_events=False,
+                checkpoint=checkpoint,
+                snapshots=self.snapshots,
+            )
+            scraper.http_fetcher = HttpDetailFetcher(
+                max_workers=2, session=FixtureSession(self.detail_pages)
+            )
+            try:
+                if resume_to_page is not None:
+                    scraper.go_to_next_page = lambda page: True
+                    scraper.max_pages = resume_to_page
+                    scraper._skip_to_resume_page()
+                scraper.parse(self.results_page)
+                scraper._reached_last_page = True
+                scraper._finish_incremental(None)
+            finally:
+                scraper.http_fetcher.close()
+        return [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def deltas(self, records):
+        return [r["delta"] for r in records if "delta" in r]
+
+    def test_resume_does_not_remove_listings_emitted_before(self):
+        checkpoint = RunCheckpoint(directory=self.tmp.name, target={"postcode": "TS178BT"})
+        first = self.crawl(checkpoint)
+        self.assertEqual(self.deltas(first), ["new"] * 25)
+
+        # The run died before completing; resume it from its checkpoint.
+        resumed = self.crawl(RunCheckpoint.load(checkpoint.run_id, self.tmp.name))
+        self.assertEqual(self.deltas(resumed), [])
+        self.assertEqual(len(self.snapshots.load("TS1")), 25)
+
+    def test_resume_past_first_page_reports_no_removals(self):
+        checkpoint = RunCheckpoint(directory=self.tmp.name, target={"postcode": "TS178BT"})
+        self.crawl(checkpoint)
+        # A later crawl died on page 2: page 1's listings are never parsed again.
+        checkpoint.mark_page("TS1", 2)
+        resumed = self.crawl(
+            RunCheckpoint.load(checkpoint.run_id, self.tmp.name), resume_to_page=2
+        )
+        self.assertNotIn("removed", self.deltas(resumed))
+        summary = [r for r in resumed if r.get("status") == "incremental_summary"][0]
+        self.assertFalse(summary["complete_crawl"])
+        self.assertEqual(len(self.snapshots.load("TS1")), 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
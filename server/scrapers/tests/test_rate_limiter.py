@@ -0,0 +1,48 @@
+# /server/scrapers/tests/test_rate_limiter.py
+# Additive-increase/multiplicative-decrease pacing of rate_limiter.py.
+#
+#   python -m unittest discover server/scrapers/tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import PACING_POLICIES, AdaptiveRateLimiter  # noqa: E402
+
+
+class AdaptiveRateLimiterTest(unittest.TestCase):
+    def test_fast_responses_increase_rate_up_to_max(self):
+        limiter = AdaptiveRateLimiter(rate=1.0, max_rate=1.25, increase_step=0.1)
+        limiter.record(0.2)
+        self.assertAlmostEqual(limiter.rate, 1.1)
+        for _ in range(5):
+            limiter.record(0.2)
+        self.assertEqual(limiter.rate, 1.25)
+
+    def test_errors_and_slow_responses_halve_rate_down_to_min(self):
+        limiter = AdaptiveRateLimiter(rate=2.0, min_rate=0.3, slow_response=5.0)
+        limiter.record(0.2, error=True)
+        self.assertEqual(limiter.rate, 1.0)
+        limiter.record(6.0)
+        self.assertEqual(limiter.rate, 0.5)
+        limiter.record(0.2, error=True)
+        self.assertEqual(limiter.rate, 0.3)
+        self.assertEqual(limiter.errors, 2)
+
+    def test_burst_goes_out_without_waiting(self):
+        limiter = AdaptiveRateLimiter(rate=10.0, burst=3, jitter=0)
+        self.assertEqual([limiter.acquire() for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertGreater(limiter.acquire(), 0.0)
+        self.assertEqual(limiter.requests, 4)
+
+    def test_policies(self):
+        limiter = AdaptiveRateLimiter.from_policy("polite")
+        self.assertEqual(limiter.rate, PACING_POLICIES["polite"]["rate"])
+        with self.assertRaises(ValueError):
+            AdaptiveRateLimiter.from_policy("reckless")
+
+
+if __name__ == "__main__":
+    unittest.main()
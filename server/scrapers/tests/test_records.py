@@ -0,0 +1,39 @@
+# /server/scrapers/tests/test_records.py
+# Display-string parsers of records.py.
+#
+#   python -m unittest discover server/scrapers/tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import parse_count, parse_floor_area, parse_price  # noqa: E402
+
+
+class ParsersTest(unittest.TestCase):
+    def test_parse_price(self):
+        self.assertEqual(parse_price("£350,000"), 350000)
+        self.assertEqual(parse_price("Offers over £1,250,000"), 1250000)
+        self.assertEqual(parse_price(275000.0), 275000)
+        for value in ("POA", "N/A", "", None):
+            self.assertIsNone(parse_price(value))
+
+    def test_parse_count(self):
+        self.assertEqual(parse_count("3"), 3)
+        self.assertEqual(parse_count("4 bedrooms"), 4)
+        self.assertEqual(parse_count(2), 2)
+        self.assertIsNone(parse_count("N/A"))
+        self.assertIsNone(parse_count("Studio"))
+
+    def test_parse_floor_area(self):
+        self.assertEqual(parse_floor_area("1,076 sq ft"), (100.0, 1076))
+        self.assertEqual(parse_floor_area("850 sq ft (from 79 m²)"), (79.0, 850))
+        self.assertEqual(parse_floor_area("79 sqm"), (79.0, 850))
+        self.assertEqual(parse_floor_area("N/A"), (None, None))
+        self.assertEqual(parse_floor_area("Ask agent"), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
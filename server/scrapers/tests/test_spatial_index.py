@@ -0,0 +1,63 @@
+# /server/scrapers/tests/test_spatial_index.py
+# Geohash encoding and the radius/bbox/grid queries of spatial_index.py.
+#
+#   python -m unittest discover server/scrapers/tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spatial_index import SpatialIndex, geohash_bounds, geohash_encode  # noqa: E402
+
+
+class GeohashTest(unittest.TestCase):
+    def test_encode(self):
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 5), "u4pru")
+
+    def test_bounds_contain_point(self):
+        south, west, north, east = geohash_bounds(geohash_encode(54.5, -1.3, 6))
+        self.assertTrue(south <= 54.5 <= north and west <= -1.3 <= east)
+
+
+class SpatialIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = SpatialIndex()
+        listings = [
+            ("rm_1", "54.5700", "-1.2400", "£200,000"),  # centre
+            ("rm_2", "54.5790", "-1.2400", "£300,000"),  # ~1 km north
+            ("rm_3", "54.6200", "-1.2400", "POA"),  # ~5.6 km north
+        ]
+        for property_id, lat, lon, price in listings:
+            self.index.add({"id": property_id, "latitude": lat, "longitude": lon, "price": price})
+
+    def test_skips_listings_without_coordinates(self):
+        self.assertFalse(self.index.add({"id": "rm_4", "latitude": "N/A", "longitude": "N/A"}))
+        self.assertEqual(len(self.index), 3)
+
+    def test_radius_nearest_first(self):
+        results = self.index.radius(54.57, -1.24, 2)
+        self.assertEqual([r["id"] for r in results], ["rm_1", "rm_2"])
+        self.assertAlmostEqual(results[1]["distance_km"], 1.0, places=1)
+        self.assertEqual(len(self.index.radius(54.57, -1.24, 10)), 3)
+
+    def test_bbox(self):
+        ids = {r["id"] for r in self.index.bbox(54.56, -1.25, 54.60, -1.23)}
+        self.assertEqual(ids, {"rm_1", "rm_2"})
+        self.assertEqual(self.index.bbox(50.0, 0.0, 51.0, 1.0), [])
+
+    def test_readd_moves_listing(self):
+        self.index.add({"id": "rm_3", "latitude": "54.5701", "longitude": "-1.2401"})
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(len(self.index.radius(54.57, -1.24, 0.5)), 2)
+
+    def test_grid(self):
+        tiles = self.index.grid(precision=4)
+        self.assertEqual(sum(tile["count"] for tile in tiles), 3)
+        self.assertIn(250000, [tile["median_price"] for tile in tiles])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -342,11 +342,27 @@ app.get("/api/scrape-listings", (req, res) => {
                 parsedData.error
               );
               res.write(`event: error\ndata: ${line}\n\n`); // Send error event
+            } else if (parsedData.delta === "removed") {
+              // Incremental runs: a listing from the last snapshot is no longer listed
+              console.log(`[Proxy Scrape SSE] Forwarding removed listing ${parsedData.id}`);
+              res.write(`event: removed\ndata: ${line}\n\n`); // Send removed event
+            } else if (parsedData.tiles) {
+              // Pre-aggregated heatmap cells: {"tiles": [{geohash, count, median_price, ...}]}
+              console.log(
+                `[Proxy Scrape SSE] Forwarding ${parsedData.tiles.length} map tiles`
+              );
+              res.write(`event: tiles\ndata: ${line}\n\n`); // Send tiles event
+            } else if (parsedData.metric) {
+              // Phase timing ({"metric": "results_load", "seconds": ...}); not logged, too chatty
+              res.write(`event: metric\ndata: ${line}\n\n`); // Send metric event
             } else if (parsedData.status === "complete") {
               console.log("[Proxy Scrape SSE] Forwarding complete event");
               res.write(`event: complete\ndata: ${line}\n\n`); // Send complete event
-            } else if (parsedData.status === "no_results") {
-              console.log("[Proxy Scrape SSE] Forwarding no_results status");
+            } else if (parsedData.status) {
+              // no_results and any other progress status (e.g. search_term_complete)
+              console.log(
+                `[Proxy Scrape SSE] Forwarding ${parsedData.status} status`
+              );
               res.write(`event: status\ndata: ${line}\n\n`); // Send custom status event
             } else {
               // Assume it's property data